@@ -1,3 +1,29 @@
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for BarcodeProcessor.decode_batch
+    np = None
+
+
+def _build_module_table(modules: dict[str, str], reverse: bool = False) -> tuple:
+    """Given a module -> digit mapping, build a 128-entry lookup table indexed by
+    the 7-bit integer value of a module.
+
+    Args:
+        modules (dict[str, str]): The module patterns and their digits.
+        reverse (bool, optional): Index by the bit-reversed pattern, for modules
+            read from an upside-down scan. Defaults to False.
+    Returns:
+        tuple: The digit for each 7-bit value, None for unknown patterns.
+    """
+
+    table = [None] * 128
+    for pattern, digit in modules.items():
+        if reverse:
+            pattern = pattern[::-1]
+        table[int(pattern, 2)] = digit
+    return tuple(table)
+
+
 class BarcodeProcessor:
     LEFT_SIDE_MODULES = {
         "0001101": "0",
@@ -33,6 +59,27 @@ class BarcodeProcessor:
     MODULE_WIDTH = 7
     CENTER_GUARD_LENGTH = 5
 
+    # Status codes returned by decode()
+    DECODE_OK = 0
+    DECODE_WRONG_LENGTH = 1
+    DECODE_WRONG_GUARD = 2
+    DECODE_WRONG_PARITY = 3
+    DECODE_WRONG_MODULE = 4
+
+    # 128-entry tables indexed by the integer value of a 7-bit module. In an
+    # upside-down scan the left half holds the right modules bit-reversed and
+    # vice versa.
+    LEFT_TABLE = _build_module_table(LEFT_SIDE_MODULES)
+    RIGHT_TABLE = _build_module_table(RIGHT_SIDE_MODULES)
+    REVERSED_LEFT_TABLE = _build_module_table(RIGHT_SIDE_MODULES, reverse=True)
+    REVERSED_RIGHT_TABLE = _build_module_table(LEFT_SIDE_MODULES, reverse=True)
+    ODD_PARITY = tuple(bin(value).count("1") % 2 == 1 for value in range(128))
+
+    # Bit offsets (from the least significant bit) of each module once the
+    # 95-character scan is read as a base-2 integer
+    LEFT_SHIFTS = tuple(85 - 7 * i for i in range(6))
+    RIGHT_SHIFTS = tuple(38 - 7 * i for i in range(6))
+
     def invert_barcode(self, binary_barcode: str) -> str:
         """Given a barcode (length 95 string), invert it.
 
@@ -160,6 +207,82 @@ class BarcodeProcessor:
             raise ValueError("Wrong binary combination")
         return "".join([self.LEFT_SIDE_MODULES[module] for module in left] + [self.RIGHT_SIDE_MODULES[module] for module in right])
 
+    def decode(self, binary_barcode: str) -> tuple[str, int]:
+        """Given a barcode (length 95 string) in either orientation, decode it
+        to 12 digits in a single pass without raising.
+
+        The scan is read into an integer once and every module is looked up in
+        the precomputed 128-entry tables. The parity of the first module tells
+        the orientation: left modules have an odd number of ones, so an even
+        first module means the scan is upside down.
+
+        Args:
+            binary_barcode (str): The barcode to decode.
+        Returns:
+            tuple[str, int]: The 12 digits (None on failure) and a DECODE_*
+            status code.
+        """
+
+        if len(binary_barcode) != self.BARCODE_LENGTH:
+            return None, self.DECODE_WRONG_LENGTH
+        if binary_barcode.count("1") + binary_barcode.count("0") != self.BARCODE_LENGTH:
+            return None, self.DECODE_WRONG_MODULE
+        bits = int(binary_barcode, 2)
+        # The guards are palindromes, so they read the same in both orientations
+        if bits >> 92 != 0b101 or bits & 0b111 != 0b101 or (bits >> 45) & 0b11111 != 0b01010:
+            return None, self.DECODE_WRONG_GUARD
+
+        reversed_scan = not self.ODD_PARITY[(bits >> 85) & 0x7F]
+        if reversed_scan:
+            left_table, right_table = self.REVERSED_LEFT_TABLE, self.REVERSED_RIGHT_TABLE
+        else:
+            left_table, right_table = self.LEFT_TABLE, self.RIGHT_TABLE
+
+        digits = []
+        for shift in self.LEFT_SHIFTS:
+            digit = left_table[(bits >> shift) & 0x7F]
+            if digit is None:
+                return None, self._module_failure(bits, self.LEFT_SHIFTS, not reversed_scan)
+            digits.append(digit)
+        for shift in self.RIGHT_SHIFTS:
+            digit = right_table[(bits >> shift) & 0x7F]
+            if digit is None:
+                return None, self._module_failure(bits, self.RIGHT_SHIFTS, reversed_scan)
+            digits.append(digit)
+        if reversed_scan:
+            digits.reverse()
+        return "".join(digits), self.DECODE_OK
+
+    def _module_failure(self, bits: int, shifts: tuple, odd_parity: bool) -> int:
+        """Given the integer scan and the module offsets of the half that failed
+        to decode, tell a parity error from an unknown module pattern.
+
+        Args:
+            bits (int): The scan read as an integer.
+            shifts (tuple): The bit offsets of the modules in the failing half.
+            odd_parity (bool): Whether the modules of that half should have an odd number of ones.
+        Returns:
+            int: DECODE_WRONG_PARITY or DECODE_WRONG_MODULE.
+        """
+
+        if any(self.ODD_PARITY[(bits >> shift) & 0x7F] != odd_parity for shift in shifts):
+            return self.DECODE_WRONG_PARITY
+        return self.DECODE_WRONG_MODULE
+
+    def is_valid_check_digit(self, numeric_barcode: str) -> bool:
+        """Given a numeric barcode (length 12 string), run the modulo check
+        without raising. See modulo_check for the algorithm.
+
+        Args:
+            numeric_barcode (str): The barcode to check.
+        Returns:
+            bool: True if the check digit matches, False otherwise.
+        """
+
+        odd_sum = sum([int(numeric_barcode[loc]) for loc in range(0,11,2)])
+        even_sum = sum([int(numeric_barcode[loc]) for loc in range(1,11,2)])
+        return (10 - (odd_sum * 3 + even_sum) % 10) % 10 == int(numeric_barcode[-1])
+
     def modulo_check(self, numeric_barcode: str) -> bool:
         """Given a numeric barcode (length 12 string), check through the modulo check if it's read in properly.
         The modulo check is as follows:
@@ -177,12 +300,7 @@ class BarcodeProcessor:
             bool: True if the barcode is valid, Raising an error otherwise.
         """
 
-        odd_sum = sum([int(numeric_barcode[loc]) for loc in range(0,11,2)])
-        product_odd = odd_sum * 3
-        even_sum = sum([int(numeric_barcode[loc]) for loc in range(1,11,2)])
-        total_sum = product_odd + even_sum
-        module_first = total_sum % 10
-        if (10 - module_first) % 10 != int(numeric_barcode[-1]):
+        if not self.is_valid_check_digit(numeric_barcode):
             raise ValueError("Security check failed")
         return True
     
@@ -196,4 +314,78 @@ class BarcodeProcessor:
         self._validate_modules(binary_barcode, module="RIGHT")
         return True
 
-            
\ No newline at end of file
+    def decode_batch(self, scans) -> tuple:
+        """Given N scans, decode and check all of them at once with numpy.
+
+        Guard checks, module lookup, the upside-down fallback and the modulo
+        check are all vectorized, so archived scan files can be replayed without
+        a Python-level loop per scan.
+
+        Args:
+            scans: An N x 95 uint8 array of 0/1 bits, or a bytes buffer holding
+                N scans of 95 ASCII '0'/'1' characters, each optionally
+                terminated by a newline (the scan_*_binary.txt format).
+        Raises:
+            ImportError: numpy is not installed.
+            ValueError: The input is not made of 95-bit scans.
+        Returns:
+            tuple: An N x 12 uint8 array of digits (zeroed where invalid) and a
+            length N boolean validity mask.
+        """
+
+        if np is None:
+            raise ImportError("decode_batch requires numpy")
+        bits = self._as_bit_array(scans)
+        binary = np.all(bits <= 1, axis=1)
+        bits = np.minimum(bits, 1)
+
+        guards = (
+            np.all(bits[:, :3] == (1, 0, 1), axis=1)
+            & np.all(bits[:, 45:50] == (0, 1, 0, 1, 0), axis=1)
+            & np.all(bits[:, -3:] == (1, 0, 1), axis=1)
+        )
+        left_table = self._numpy_table(self.LEFT_TABLE)
+        right_table = self._numpy_table(self.RIGHT_TABLE)
+        forward = self._lookup_batch(bits, left_table, right_table)
+        backward = self._lookup_batch(bits[:, ::-1], left_table, right_table)
+        forward_ok = np.all(forward >= 0, axis=1)
+        backward_ok = np.all(backward >= 0, axis=1)
+
+        digits = np.where(forward_ok[:, None], forward, backward).astype(np.int16)
+        total = 3 * digits[:, 0:11:2].sum(axis=1) + digits[:, 1:11:2].sum(axis=1)
+        check = (10 - total % 10) % 10 == digits[:, 11]
+
+        valid = binary & guards & (forward_ok | backward_ok) & check
+        digits[~valid] = 0
+        return digits.astype(np.uint8), valid
+
+    def _as_bit_array(self, scans):
+        """Given the input of decode_batch, return it as an N x 95 uint8 array."""
+
+        if isinstance(scans, (bytes, bytearray, memoryview)):
+            raw = np.frombuffer(scans, dtype=np.uint8)
+            width = self.BARCODE_LENGTH
+            if raw.size > width and raw[width] == ord("\n"):
+                width += 1
+                if raw.size % width == self.BARCODE_LENGTH:
+                    raw = np.append(raw, np.uint8(ord("\n")))
+            if raw.size % width:
+                raise ValueError("Wrong length")
+            return raw.reshape(-1, width)[:, :self.BARCODE_LENGTH] - np.uint8(ord("0"))
+        bits = np.asarray(scans, dtype=np.uint8)
+        if bits.ndim != 2 or bits.shape[1] != self.BARCODE_LENGTH:
+            raise ValueError("Wrong length")
+        return bits
+
+    def _numpy_table(self, table: tuple):
+        """Given a 128-entry module table, return it as an int8 array with -1 for unknown patterns."""
+
+        return np.array([-1 if digit is None else int(digit) for digit in table], dtype=np.int8)
+
+    def _lookup_batch(self, bits, left_table, right_table):
+        """Given N x 95 bits read left to right, return the N x 12 digits, -1 where a module is unknown."""
+
+        weights = 1 << np.arange(self.MODULE_WIDTH - 1, -1, -1)
+        left = bits[:, 3:45].reshape(-1, self.NUMBER_OF_MODULES, self.MODULE_WIDTH) @ weights
+        right = bits[:, 50:92].reshape(-1, self.NUMBER_OF_MODULES, self.MODULE_WIDTH) @ weights
+        return np.concatenate([left_table[left], right_table[right]], axis=1)
@@ -0,0 +1,240 @@
+"""Micro and macro benchmarks for the POS hot paths.
+
+Run from the project root:
+
+    python benchmarks/bench_pos.py --output bench.json
+    python benchmarks/bench_pos.py --catalog-sizes 10 1000 --cart-sizes 10 100 --compare bench.json
+
+Every benchmark reports the best and median time per operation over several
+repeats; the database constructors also report their peak traced memory.
+Results are written as JSON so runs can be diffed, and --compare exits with
+status 1 when a benchmark got slower than the threshold.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from barcode import BarcodeProcessor
+from database import ProductDatabase, MemberDatabase, CouponDatabase
+from columnar import ColumnarProductDatabase, ColumnarMemberDatabase
+from lazy_catalog import LazyProductDatabase
+from pos import POSSystem
+from decode_cache import DecodeCache
+from datagen import BarcodeSequence, barcode_to_binary, generate, write_scan_files
+
+CATALOG_SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+CART_SIZES = [1, 10, 100, 1_000, 10_000]
+
+
+def measure(function, repeats: int, min_time: float = 0.05) -> dict:
+    """Time a zero-argument function, calling it enough times per repeat to last min_time seconds."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        if time.perf_counter() - start >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+    timings = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(number):
+                function()
+            timings.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return {"best_seconds": min(timings), "median_seconds": statistics.median(timings), "loops": number}
+
+
+def measure_once(function, repeats: int, setup=None) -> dict:
+    """Time a function that is too slow (or stateful) to loop, and trace its peak memory (and the memory
+    still held by its result) on the first call. setup, if given, is called untimed before every call."""
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    result = function()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    timings = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {"best_seconds": min(timings), "median_seconds": statistics.median(timings), "loops": 1,
+            "peak_memory_bytes": peak, "retained_memory_bytes": retained}
+
+
+def bench_barcode(repeats: int, seed: int) -> list[dict]:
+    """Benchmark the per-scan barcode steps; these do not depend on the catalog size."""
+    scanner = BarcodeProcessor()
+    numeric = BarcodeSequence("product", seed)[12345]
+    binary = barcode_to_binary(numeric)
+    upside_down = binary[::-1]
+    decode_cache = DecodeCache()
+    decode_cache.lookup(binary, scanner.decode)
+    cases = {
+        "validate_barcode": lambda: scanner.validate_barcode(binary),
+        "convert_to_12_digits": lambda: scanner.convert_to_12_digits(binary),
+        "modulo_check": lambda: scanner.modulo_check(numeric),
+        "decode": lambda: scanner.decode(binary),
+        "decode_upside_down": lambda: scanner.decode(upside_down),
+        "decode_cache_hit": lambda: decode_cache.lookup(binary, scanner.decode),
+    }
+    return [{"name": name, **measure(function, repeats)} for name, function in cases.items()]
+
+
+def bench_catalog(catalog_size: int, cart_sizes: list[int], repeats: int, seed: int) -> list[dict]:
+    """Benchmark the database constructors and the lane operations on a synthetic catalog of catalog_size rows."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        paths = generate(directory, catalog_size, catalog_size, catalog_size, seed=seed)
+        inventory_path, membership_path, coupon_path = paths["inventory"], paths["memberships"], paths["coupons"]
+        constructors = {
+            "ProductDatabase": lambda: ProductDatabase(inventory_path),
+            "MemberDatabase": lambda: MemberDatabase(membership_path),
+            "CouponDatabase": lambda: CouponDatabase(coupon_path),
+            "ColumnarProductDatabase": lambda: ColumnarProductDatabase(inventory_path),
+            "ColumnarMemberDatabase": lambda: ColumnarMemberDatabase(membership_path),
+            "LazyProductDatabase": lambda: LazyProductDatabase(inventory_path),
+        }
+        for name, function in constructors.items():
+            result = {"name": name, "catalog_size": catalog_size, **measure_once(function, repeats)}
+            result["bytes_per_record"] = result["retained_memory_bytes"] / max(catalog_size, 1)
+            results.append(result)
+
+        save_paths = ProductDatabase.SAVE_PATH, MemberDatabase.SAVE_PATH
+        ProductDatabase.SAVE_PATH = os.path.join(directory, "updated_inventory.csv")
+        MemberDatabase.SAVE_PATH = os.path.join(directory, "updated_memberships.csv")
+        try:
+            results.extend(bench_lanes(inventory_path, membership_path, coupon_path, directory,
+                                       catalog_size, cart_sizes, repeats, seed))
+        finally:
+            ProductDatabase.SAVE_PATH, MemberDatabase.SAVE_PATH = save_paths
+    return results
+
+
+def bench_lanes(inventory_path, membership_path, coupon_path, directory, catalog_size, cart_sizes, repeats, seed):
+    """Benchmark scanning, totalling and checking out carts of each size against one catalog. Carts
+    hold distinct products, so cart sizes larger than the catalog are skipped."""
+    results = []
+    pos = POSSystem(inventory_path, membership_path, coupon_path)
+    for cart_size in cart_sizes:
+        if cart_size > catalog_size:
+            continue
+        scan_path, = write_scan_files(os.path.join(directory, f"carts_{cart_size}"), 1, catalog_size, catalog_size,
+                                      catalog_size, basket_sizes=f"fixed:{cart_size}", member_ratio=1.0,
+                                      coupon_ratio=1.0, seed=seed)
+
+        def process():
+            pos.start_new_cart()
+            pos.process_barcodes(scan_path)
+
+        results.append({"name": "process_barcodes", "catalog_size": catalog_size, "cart_size": cart_size,
+                        **measure_once(process, repeats)})
+
+        cart = pos.get_current_cart()
+        results.append({"name": "calculate_total", "catalog_size": catalog_size, "cart_size": cart_size,
+                        **measure(cart.calculate_total, repeats)})
+        product = pos.store_backend.get_product(BarcodeSequence("product", seed)[0])
+
+        def rescan_and_total():
+            cart.add_item(product)
+            cart.calculate_total()
+            cart.remove_item(product.get_barcode())
+
+        results.append({"name": "add_item+calculate_total", "catalog_size": catalog_size, "cart_size": cart_size,
+                        **measure(rescan_and_total, repeats)})
+        # Each checkout gets a freshly scanned cart and the stock and points it started with, so
+        # repeats do not drain the catalog; none of this is timed
+        stock = {line_item.get_product(): line_item.get_product().get_quantity() for line_item in cart.get_line_items()}
+        membership = cart.get_membership()
+        points_cents = membership.get_points_cents() if membership else None
+
+        def restock_and_process():
+            for stocked, quantity in stock.items():
+                stocked.quantity = quantity
+            if membership:
+                membership.points_cents = points_cents
+            process()
+
+        results.append({"name": "checkout", "catalog_size": catalog_size, "cart_size": cart_size,
+                        **measure_once(pos.checkout, repeats, setup=restock_and_process)})
+    return results
+
+
+def compare(results: list[dict], baseline_path: str, threshold: float) -> list[str]:
+    """Given fresh results and a baseline JSON file, list the benchmarks that got slower than threshold times."""
+    def key(result):
+        return result["name"], result.get("catalog_size"), result.get("cart_size")
+
+    with open(baseline_path) as f:
+        baseline = {key(result): result for result in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        old = baseline.get(key(result))
+        if old and result["best_seconds"] > old["best_seconds"] * threshold:
+            ratio = result["best_seconds"] / old["best_seconds"]
+            regressions.append(f"{key(result)}: {ratio:.2f}x slower")
+    return regressions
+
+
+def run(catalog_sizes: list[int], cart_sizes: list[int], repeats: int = 5, seed: int = 0) -> dict:
+    """Run every benchmark and return the JSON-serializable report."""
+    results = bench_barcode(repeats, seed)
+    for catalog_size in catalog_sizes:
+        results.extend(bench_catalog(catalog_size, cart_sizes, repeats, seed))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeats": repeats,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--catalog-sizes", type=int, nargs="+", default=CATALOG_SIZES)
+    parser.add_argument("--cart-sizes", type=int, nargs="+", default=CART_SIZES)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="Baseline JSON report to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio counted as a regression")
+    args = parser.parse_args()
+
+    report = run(args.catalog_sizes, args.cart_sizes, args.repeats, args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        regressions = compare(report["results"], args.compare, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
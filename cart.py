@@ -1,31 +1,126 @@
 from product import Product
 from member import Member, SilverMember, GoldMember, PlatinumMember
 from coupon import Coupon, FixedDiscountCoupon, PercentDiscountCoupon
+from coupon_engine import CouponEngine
+from money import from_cents, apply_rate
+from datetime import datetime
+
+
+class LineItem:
+    """A product in the cart and the number of units scanned."""
+
+    def __init__(self, product: Product, quantity: int = 0):
+        self.product = product
+        self.quantity = quantity
+
+    def get_product(self) -> Product:
+        """Get the product of the line item.
+
+        Returns:
+            Product: The product of the line item.
+        """
+        return self.product
+
+    def get_quantity(self) -> int:
+        """Get the number of units of the product in the cart.
+
+        Returns:
+            int: The number of units in the cart.
+        """
+        return self.quantity
 
 
 class ShoppingCart:
-    def __init__(self):
-        self.products = []
+    def __init__(self, clock=None, stacking: str = "all", max_coupons: int = None):
+        """
+        Args:
+            clock (optional): Callable returning the current datetime. The cart
+                reads it once, when the transaction starts, and prices every
+                coupon against that time. Defaults to datetime.now.
+            stacking (str, optional): Coupon stacking rule, see CouponEngine. Defaults to "all".
+            max_coupons (int, optional): Most coupons applied to the cart. Defaults to None (no limit).
+        """
+        self.line_items = {}
+        self.item_count = 0
+        self.subtotal_cents = 0
         self.membership = None
         self.coupons = {}
-        
+        self.coupon_engine = CouponEngine(stacking, max_coupons)
+        self.clock = clock or datetime.now
+        self.transaction_time = None
+        # Cached result of get_discount_breakdown, reset whenever the subtotal,
+        # coupons or membership change
+        self._discounts = None
+
+    def get_transaction_time(self) -> datetime:
+        """Get the time the transaction started (fixed on first use).
 
-    def add_item(self, item: Product):
+        Returns:
+            datetime: The transaction time.
+        """
+        if self.transaction_time is None:
+            self.transaction_time = self.clock()
+        return self.transaction_time
+
+    def add_item(self, item: Product, quantity: int = 1):
         """Add the specified item to the cart.
 
         Args:
             item (Product): The item to add to the cart.
+            quantity (int, optional): The number of units to add. Defaults to 1.
         """
-        self.products.append(item)
+        self.get_transaction_time()
+        line_item = self.line_items.get(item.get_barcode())
+        if line_item is None:
+            line_item = self.line_items[item.get_barcode()] = LineItem(item)
+        line_item.quantity += quantity
+        self.item_count += quantity
+        self.subtotal_cents += item.get_price_cents() * quantity
+        self._discounts = None
         return
 
+    def remove_item(self, numeric_barcode: str, quantity: int = 1):
+        """Void units of a product from the cart. The line item is dropped once
+        none are left; voiding a product that is not in the cart does nothing.
+
+        Args:
+            numeric_barcode (str): The barcode of the product to void.
+            quantity (int, optional): The number of units to void. Defaults to 1.
+        """
+        line_item = self.line_items.get(numeric_barcode)
+        if line_item is None:
+            return
+        quantity = min(quantity, line_item.quantity)
+        line_item.quantity -= quantity
+        self.item_count -= quantity
+        self.subtotal_cents -= line_item.product.get_price_cents() * quantity
+        self._discounts = None
+        if line_item.quantity == 0:
+            del self.line_items[numeric_barcode]
+        return
+
+    def get_quantity(self, numeric_barcode: str) -> int:
+        """Get the number of units of a product in the cart.
+
+        Args:
+            numeric_barcode (str): The barcode of the product.
+        Returns:
+            int: The number of units in the cart (0 if not in the cart).
+        """
+        line_item = self.line_items.get(numeric_barcode)
+        if line_item is None:
+            return 0
+        return line_item.quantity
+
     def add_membership(self, membership: Member):
         """Add a membership to the cart.
 
         Args:
             membership (Member): The membership to add to the cart.
         """
+        self.get_transaction_time()
         self.membership = membership
+        self._discounts = None
         return
 
     def add_coupon(self, coupon: Coupon):
@@ -36,15 +131,34 @@ class ShoppingCart:
         """
         if coupon.numeric_barcode in self.coupons:
             return
+        self.get_transaction_time()
         self.coupons[coupon.numeric_barcode] = coupon
+        self.coupon_engine.add(coupon)
+        self._discounts = None
 
     def get_items(self) -> list[Product]:
-        """Get the items in the cart.
+        """Get the items in the cart, one entry per unit.
 
         Returns:
             list[Product]: The items in the cart.
         """
-        return self.products
+        return [line_item.product for line_item in self.line_items.values() for _ in range(line_item.quantity)]
+
+    def get_line_items(self) -> list[LineItem]:
+        """Get the line items in the cart, one per product.
+
+        Returns:
+            list[LineItem]: The line items in the cart.
+        """
+        return list(self.line_items.values())
+
+    def get_item_count(self) -> int:
+        """Get the total number of units in the cart.
+
+        Returns:
+            int: The number of units in the cart.
+        """
+        return self.item_count
 
     def get_membership(self) -> Member:
         """Get the membership in the cart.
@@ -63,12 +177,36 @@ class ShoppingCart:
         return list(self.coupons.values())
 
     def calculate_subtotal(self) -> float:
-        """Calculate the price of all items in the cart.
+        """Get the price of all items in the cart, kept up to date as items are added and removed.
 
         Returns:
             float: The subtotal of the cart.
         """
-        return sum([float(item.get_price()) for item in self.products])
+        return from_cents(self.subtotal_cents)
+
+    def calculate_subtotal_cents(self) -> int:
+        """Get the price of all items in the cart in cents.
+
+        Returns:
+            int: The subtotal of the cart in cents.
+        """
+        return self.subtotal_cents
+
+    def get_discount_breakdown(self) -> dict[str, int]:
+        """Get the discount in cents given by each coupon (keyed by barcode) and
+        by the membership (keyed by "membership"), as of the transaction time.
+        The breakdown is cached until the cart changes.
+
+        Returns:
+            dict[str, int]: The discount amount of each coupon and the membership in cents.
+        """
+        if self._discounts is not None:
+            return self._discounts
+        discounts = self.coupon_engine.evaluate(self.subtotal_cents, self.get_transaction_time())
+        if self.membership:
+            discounts["membership"] = apply_rate(self.subtotal_cents, self.membership.get_discount_basis_points())
+        self._discounts = discounts
+        return discounts
 
     def calculate_total(self) -> float:
         """Calculate the total price of the cart, with coupon applied and membership applicable
@@ -76,12 +214,13 @@ class ShoppingCart:
         Returns:
             float: The total price of the cart.
         """
-        subtotal = self.calculate_subtotal()
-        total_coupon_discount = sum([coupon.discount_amount(subtotal) for coupon in self.coupons.values()])
-        if self.membership:
-            membership_discount = subtotal * self.membership.get_discount_rate()
-        else:
-            membership_discount = 0
-        sum_discount = total_coupon_discount + membership_discount
-        total = max(subtotal - sum_discount, 0.0)
-        return total
\ No newline at end of file
+        return from_cents(self.calculate_total_cents())
+
+    def calculate_total_cents(self) -> int:
+        """Calculate the total price of the cart in cents, with coupon applied and membership applicable
+
+        Returns:
+            int: The total price of the cart in cents.
+        """
+        sum_discount = sum(self.get_discount_breakdown().values())
+        return max(self.subtotal_cents - sum_discount, 0)
@@ -0,0 +1,339 @@
+import os
+import threading
+from array import array
+from bisect import bisect_left
+
+from product import Product
+from member import Member, SilverMember, GoldMember, PlatinumMember
+from money import to_cents, format_cents
+from locking import LockStripes
+from csv_ingest import read_rows, writer
+
+
+class _BarcodeIndex:
+    """Sorted barcode -> row index over 12 digit numeric barcodes (16 bytes per row)."""
+
+    def __init__(self, barcodes: array):
+        # Stable sort, so the last of several rows with one barcode wins, as in ProductDatabase
+        order = sorted(range(len(barcodes)), key=barcodes.__getitem__)
+        self._keys = array("q", [barcodes[i] for i in order])
+        self._rows = array("q", order)
+        for position in range(len(self._keys) - 1, 0, -1):
+            if self._keys[position - 1] == self._keys[position]:
+                self._rows[position - 1] = self._rows[position]
+
+    def row_of(self, numeric_barcode: str) -> int:
+        """Given a barcode, return its row (None if not indexed)."""
+        if not numeric_barcode.isdigit():
+            return None
+        key = int(numeric_barcode)
+        position = bisect_left(self._keys, key)
+        if position == len(self._keys) or self._keys[position] != key:
+            return None
+        return self._rows[position]
+
+    def resolved_rows(self) -> list[int]:
+        """Return the rows that some barcode resolves to, in row order; rows
+        shadowed by a later row with the same barcode are left out."""
+        return sorted(set(self._rows))
+
+
+def _parse_barcode(barcode: str) -> int:
+    if len(barcode) != 12 or not barcode.isdigit():
+        raise ValueError(f"Invalid barcode: {barcode}")
+    return int(barcode)
+
+
+class _NamePool:
+    """Stores each distinct name once, UTF-8 encoded in one buffer; rows keep a
+    4-byte id into the pool instead of their own str object.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("q", [0])
+        # Only needed to spot repeated names while loading, see freeze()
+        self.ids = {}
+
+    def add(self, name: str) -> int:
+        name_id = self.ids.get(name)
+        if name_id is None:
+            name_id = self.ids[name] = len(self.offsets) - 1
+            self.data += name.encode()
+            self.offsets.append(len(self.data))
+        return name_id
+
+    def freeze(self):
+        """Drop the lookup table once loading is done."""
+        self.ids = {}
+
+    def get(self, name_id: int) -> str:
+        return self.data[self.offsets[name_id]:self.offsets[name_id + 1]].decode()
+
+
+class ProductView(Product):
+    """A Product whose fields live in a ColumnarProductDatabase row.
+
+    Views are created on lookup and hold only the row number, so every
+    getter (and decrease_quantity) reads and writes the columns directly.
+    """
+
+    __slots__ = ("_columns", "_row")
+
+    def __init__(self, columns: "ColumnarProductDatabase", row: int):
+        self._columns = columns
+        self._row = row
+
+    @property
+    def numeric_barcode(self) -> str:
+        return f"{self._columns.barcodes[self._row]:012d}"
+
+    @property
+    def name(self) -> str:
+        return self._columns.name_pool.get(self._columns.name_ids[self._row])
+
+    @property
+    def price_cents(self) -> int:
+        return self._columns.price_cents[self._row]
+
+    @property
+    def quantity(self) -> int:
+        return self._columns.quantities[self._row]
+
+    @quantity.setter
+    def quantity(self, quantity: int):
+        self._columns.quantities[self._row] = quantity
+
+
+class ColumnarProductDatabase:
+    """Product database storing the catalog as parallel arrays.
+
+    Each row costs a barcode (8 bytes), a name id (4), a price in cents (8) and
+    a quantity (8) plus its share of the barcode index (16), instead of a
+    Product object with its own strings; names are pooled, so repeated names
+    are stored once. get_product returns a ProductView onto the row.
+    """
+
+    SAVE_PATH = "db-data/updated_inventory.csv"
+
+    def __init__(self, inventory_path: str):
+        """
+        Args:
+            inventory_path (str): The inventory CSV.
+
+        Rows that cannot be parsed (including barcodes that are not 12 digits)
+        are listed in malformed_rows, as in ProductDatabase.
+        """
+        self.inventory_path = inventory_path
+        self.barcodes = array("q")
+        self.name_ids = array("I")
+        self.price_cents = array("q")
+        self.quantities = array("q")
+        self.name_pool = _NamePool()
+        self._locks = LockStripes()
+        self._save_lock = threading.Lock()
+        self.malformed_rows = []
+        for line_number, row in read_rows(inventory_path, malformed=self.malformed_rows):
+            try:
+                if len(row) != 4:
+                    raise ValueError(f"Expected 4 fields, got {len(row)}")
+                barcode, name, price, quantity = _parse_barcode(row[0]), row[1], to_cents(row[2]), int(row[3])
+            except ValueError as error:
+                self.malformed_rows.append((line_number, row, str(error)))
+                continue
+            self.barcodes.append(barcode)
+            self.name_ids.append(self.name_pool.add(name))
+            self.price_cents.append(price)
+            self.quantities.append(quantity)
+        self.name_pool.freeze()
+        self.index = _BarcodeIndex(self.barcodes)
+
+    def __len__(self) -> int:
+        return len(self.barcodes)
+
+    def get_product(self, numeric_barcode: str) -> Product:
+        """Given a barcode, return a view of the product associated with that\
+        barcode.
+
+        Args:
+            numeric_barcode (str): 12 digit numeric barcode
+        Returns:
+            Product with barcode (None if not found)
+        """
+        row = self.index.row_of(numeric_barcode)
+        if row is None:
+            return None
+        return ProductView(self, row)
+
+    def decrement_inventory(self, numeric_barcode: str, quantity: int):
+        """Given a barcode and a quantity to decrease by, decrement the inventory of the product associated with that barcode by the quantity.
+
+        Args:
+            numeric_barcode (str): 12 digit numeric barcode
+            quantity (int): The quantity to decrease by.
+        """
+        row = self.index.row_of(numeric_barcode)
+        if row is None:
+            return
+        with self._locks.lock_for(numeric_barcode):
+            self.quantities[row] -= quantity
+
+    def save_inventory(self, fsync: bool = False):
+        """Save the inventory to a CSV file, one row per barcode (the row it
+        resolves to, as in ProductDatabase).
+
+        Args:
+            fsync (bool, optional): Force the write to disk before returning. Defaults to False.
+        """
+        names = self.name_pool
+        with self._save_lock, open(self.SAVE_PATH, "w") as f:
+            rows = writer(f)
+            rows.writerow(("numeric_barcode", "name", "price", "quantity"))
+            rows.writerows(
+                (f"{self.barcodes[row]:012d}", names.get(self.name_ids[row]), format_cents(self.price_cents[row]),
+                 self.quantities[row])
+                for row in self.index.resolved_rows()
+            )
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+
+class MemberView(Member):
+    """A Member whose fields live in a ColumnarMemberDatabase row. See ProductView."""
+
+    __slots__ = ("_columns", "_row")
+
+    def __init__(self, columns: "ColumnarMemberDatabase", row: int):
+        self._columns = columns
+        self._row = row
+
+    @property
+    def barcode(self) -> str:
+        return f"{self._columns.barcodes[self._row]:012d}"
+
+    @property
+    def name(self) -> str:
+        return self._columns.name_pool.get(self._columns.name_ids[self._row])
+
+    @property
+    def points_cents(self) -> int:
+        return self._columns.points_cents[self._row]
+
+    @points_cents.setter
+    def points_cents(self, points_cents: int):
+        self._columns.points_cents[self._row] = points_cents
+
+
+class SilverMemberView(MemberView, SilverMember):
+    __slots__ = ()
+
+
+class GoldMemberView(MemberView, GoldMember):
+    __slots__ = ()
+
+
+class PlatinumMemberView(MemberView, PlatinumMember):
+    __slots__ = ()
+
+
+class ColumnarMemberDatabase:
+    """Member database storing the memberships as parallel arrays, with the
+    tier as a 1-byte code. get_member returns a view of the tier's class, so
+    the tier-specific multipliers and discount rates still apply.
+    """
+
+    SAVE_PATH = "db-data/updated_memberships.csv"
+    TIERS = ("Silver", "Gold", "Platinum")
+    VIEWS = (SilverMemberView, GoldMemberView, PlatinumMemberView)
+
+    def __init__(self, membership_path: str):
+        """
+        Args:
+            membership_path (str): The membership CSV.
+
+        Malformed rows are listed in malformed_rows, as in MemberDatabase.
+        """
+        self.membership_path = membership_path
+        self.barcodes = array("q")
+        self.name_ids = array("I")
+        self.tiers = array("b")
+        self.points_cents = array("q")
+        self.name_pool = _NamePool()
+        self._locks = LockStripes()
+        self._save_lock = threading.Lock()
+        tier_codes = {tier: code for code, tier in enumerate(self.TIERS)}
+        self.malformed_rows = []
+        for line_number, row in read_rows(membership_path, malformed=self.malformed_rows):
+            try:
+                if len(row) != 4:
+                    raise ValueError(f"Expected 4 fields, got {len(row)}")
+                if row[2] not in tier_codes:
+                    raise ValueError(f"Unknown tier: {row[2]}")
+                barcode, name, tier, points = _parse_barcode(row[0]), row[1], tier_codes[row[2]], to_cents(row[3])
+            except ValueError as error:
+                self.malformed_rows.append((line_number, row, str(error)))
+                continue
+            self.barcodes.append(barcode)
+            self.name_ids.append(self.name_pool.add(name))
+            self.tiers.append(tier)
+            self.points_cents.append(points)
+        self.name_pool.freeze()
+        self.index = _BarcodeIndex(self.barcodes)
+
+    def __len__(self) -> int:
+        return len(self.barcodes)
+
+    def get_member(self, numeric_barcode: str) -> Member:
+        """Given a barcode, return a view of the member associated with that barcode.
+
+        Args:
+            numeric_barcode (str): The barcode of the member to check.
+        Returns:
+            Member: The member (None if not associated with a member)
+        """
+        row = self.index.row_of(numeric_barcode)
+        if row is None:
+            return None
+        return self.VIEWS[self.tiers[row]](self, row)
+
+    def add_points(self, numeric_barcode: str, points: float):
+        """Given a barcode, add the specified number of points to the member associated with that barcode.
+
+        Args:
+            numeric_barcode (str): The barcode of the member to add points to.
+            points (float): The number of points to add.
+        """
+        self.add_points_cents(numeric_barcode, to_cents(points))
+
+    def add_points_cents(self, numeric_barcode: str, points_cents: int):
+        """Given a barcode, add the specified number of hundredths of a point to the member associated with that barcode.
+
+        Args:
+            numeric_barcode (str): The barcode of the member to add points to.
+            points_cents (int): The number of hundredths of a point to add.
+        """
+        row = self.index.row_of(numeric_barcode)
+        if row is None:
+            return
+        with self._locks.lock_for(numeric_barcode):
+            self.points_cents[row] += points_cents
+
+    def save_memberships(self, fsync: bool = False):
+        """Save the current membership list to a CSV file
+
+        Args:
+            fsync (bool, optional): Force the write to disk before returning. Defaults to False.
+        """
+        names = self.name_pool
+        with self._save_lock, open(self.SAVE_PATH, "w") as f:
+            rows = writer(f)
+            rows.writerow(("numeric_barcode", "name", "tier", "points"))
+            rows.writerows(
+                (f"{self.barcodes[row]:012d}", names.get(self.name_ids[row]), self.TIERS[self.tiers[row]],
+                 format_cents(self.points_cents[row]))
+                for row in self.index.resolved_rows()
+            )
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
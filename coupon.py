@@ -1,5 +1,7 @@
 from datetime import datetime
 
+from money import to_cents, from_cents, percent_to_basis_points, apply_rate
+
 
 class Coupon:
     def __init__(
@@ -8,29 +10,68 @@ class Coupon:
         expiration_date: datetime,
         min_purchase: float,
         description: str,
+        activation_date: datetime = None,
     ):
         self.numeric_barcode = numeric_barcode
         self.expiration_date = expiration_date
-        self.min_purchase = min_purchase
+        self.min_purchase_cents = to_cents(min_purchase)
         self.description = description
+        self.activation_date = activation_date
+
+    @property
+    def min_purchase(self) -> float:
+        """The minimum purchase in dollars, derived from min_purchase_cents."""
+        return from_cents(self.min_purchase_cents)
 
-    def _is_expired(self) -> bool:
-        """Check if the coupon is expired by comparing to current datetime.now()
+    def _is_expired(self, now: datetime = None) -> bool:
+        """Check if the coupon is expired by comparing to now
 
+        Args:
+            now (datetime, optional): The transaction time. Defaults to datetime.now().
         Returns:
             bool: True if the coupon is expired, False otherwise.
         """
-        return datetime.now() > self.expiration_date
+        if now is None:
+            now = datetime.now()
+        return now > self.expiration_date
 
-    def discount_amount(self, subtotal: float) -> float:
+    def is_active(self, now: datetime = None) -> bool:
+        """Check if the coupon can be used at now: on or after its activation
+        date (if it has one) and not expired.
+
+        Args:
+            now (datetime, optional): The transaction time. Defaults to datetime.now().
+        Returns:
+            bool: True if the coupon is active, False otherwise.
+        """
+        if now is None:
+            now = datetime.now()
+        if self.activation_date is not None and now < self.activation_date:
+            return False
+        return not self._is_expired(now)
+
+    def discount_amount(self, subtotal: float, now: datetime = None) -> float:
         """Calculate the discount amount for the coupon.
-        This is a placeholder for the actual discount amount. The actual discount amount is implemented in the subclasses.
 
         Args:
             subtotal (float): The subtotal of the cart.
+            now (datetime, optional): The transaction time. Defaults to datetime.now().
+        Returns:
+            float: The discount amount
         """
 
-        pass
+        return from_cents(self.discount_cents(to_cents(subtotal), now))
+
+    def discount_cents(self, subtotal_cents: int, now: datetime = None) -> int:
+        """Calculate the discount amount for the coupon in cents.
+        This is a placeholder for the actual discount amount. The actual discount amount is implemented in the subclasses.
+
+        Args:
+            subtotal_cents (int): The subtotal of the cart in cents.
+            now (datetime, optional): The transaction time. Defaults to datetime.now().
+        """
+
+        return 0
 
 
 class PercentDiscountCoupon(Coupon):
@@ -42,22 +83,29 @@ class PercentDiscountCoupon(Coupon):
         min_purchase: float,
         description: str,
         percent_value: float,
+        activation_date: datetime = None,
     ):
         super().__init__(numeric_barcode, expiration_date, min_purchase,\
- description)
-        self.percent_value = percent_value
+ description, activation_date)
+        self.percent_basis_points = percent_to_basis_points(percent_value)
+
+    @property
+    def percent_value(self) -> float:
+        """The discount in percent, derived from percent_basis_points."""
+        return self.percent_basis_points / 100
 
-    def discount_amount(self, subtotal: float) -> float:
+    def discount_cents(self, subtotal_cents: int, now: datetime = None) -> int:
         """Calculates the percentage discount to subtract from the subtotal based on the coupon
         Args:
-            subtotal (float): The subtotal of the cart
+            subtotal_cents (int): The subtotal of the cart in cents
+            now (datetime, optional): The transaction time. Defaults to datetime.now().
         Returns:
-            float: The discount amount
+            int: The discount amount in cents
         """
 
-        if super()._is_expired() or subtotal < self.min_purchase:
+        if not super().is_active(now) or subtotal_cents < self.min_purchase_cents:
             return 0
-        return min(subtotal * (self.percent_value / 100), subtotal)
+        return min(apply_rate(subtotal_cents, self.percent_basis_points), subtotal_cents)
 
 class FixedDiscountCoupon(Coupon):
 
@@ -68,20 +116,27 @@ class FixedDiscountCoupon(Coupon):
         min_purchase: float,
         description: str,
         fixed_value: float,
+        activation_date: datetime = None,
     ):
         super().__init__(
-            numeric_barcode, expiration_date, min_purchase, description
+            numeric_barcode, expiration_date, min_purchase, description, activation_date
         )
-        self.fixed_value = fixed_value
+        self.fixed_value_cents = to_cents(fixed_value)
 
-    def discount_amount(self, subtotal: float) -> float:
+    @property
+    def fixed_value(self) -> float:
+        """The discount in dollars, derived from fixed_value_cents."""
+        return from_cents(self.fixed_value_cents)
+
+    def discount_cents(self, subtotal_cents: int, now: datetime = None) -> int:
         """Calculates the fixed amount to subtract from the subtotal based on the coupon
 
         Args:
-            subtotal (float): The subtotal of the cart
+            subtotal_cents (int): The subtotal of the cart in cents
+            now (datetime, optional): The transaction time. Defaults to datetime.now().
         Returns:
-            float: The discount amount
+            int: The discount amount in cents
         """
-        if super()._is_expired() or subtotal < self.min_purchase:
+        if not super().is_active(now) or subtotal_cents < self.min_purchase_cents:
             return 0
-        return min(self.fixed_value, subtotal)
\ No newline at end of file
+        return min(self.fixed_value_cents, subtotal_cents)
@@ -0,0 +1,77 @@
+from bisect import bisect_right
+from datetime import datetime
+
+from coupon import Coupon, PercentDiscountCoupon
+
+STACKING_RULES = ("all", "best", "best_per_type")
+
+
+class CouponEngine:
+    """Prices a cart's coupons in one pass.
+
+    Coupons are kept sorted by minimum purchase, so the coupons a subtotal
+    qualifies for are a prefix found by bisect; only those are checked for
+    expiry (against the transaction's fixed "now") and priced. The stacking
+    rule then picks which discounts apply:
+        all            every eligible coupon stacks
+        best           only the single largest discount
+        best_per_type  the largest percent and the largest fixed discount
+    max_coupons further limits how many of the chosen discounts apply,
+    largest first.
+    """
+
+    def __init__(self, stacking: str = "all", max_coupons: int = None):
+        """
+        Args:
+            stacking (str, optional): all, best or best_per_type. Defaults to "all".
+            max_coupons (int, optional): Most coupons applied to one cart. Defaults to None (no limit).
+
+        Raises:
+            ValueError: If the stacking rule is not valid.
+        """
+        if stacking not in STACKING_RULES:
+            raise ValueError(f"Invalid stacking rule: {stacking}, must be one of {', '.join(STACKING_RULES)}")
+        self.stacking = stacking
+        self.max_coupons = max_coupons
+        self.coupons = []
+        self.min_purchases = []
+
+    def add(self, coupon: Coupon):
+        """Index a coupon by its minimum purchase.
+
+        Args:
+            coupon (Coupon): The coupon to add.
+        """
+        position = bisect_right(self.min_purchases, coupon.min_purchase_cents)
+        self.min_purchases.insert(position, coupon.min_purchase_cents)
+        self.coupons.insert(position, coupon)
+
+    def evaluate(self, subtotal_cents: int, now: datetime) -> dict[str, int]:
+        """Given a subtotal and the transaction time, return the discount in
+        cents given by each coupon (0 for coupons that are expired, not
+        reached, or left out by the stacking rule).
+
+        Args:
+            subtotal_cents (int): The subtotal of the cart in cents.
+            now (datetime): The transaction time.
+        Returns:
+            dict[str, int]: The discount of each coupon in cents, keyed by barcode.
+        """
+        discounts = dict.fromkeys((coupon.numeric_barcode for coupon in self.coupons), 0)
+        eligible = self.coupons[:bisect_right(self.min_purchases, subtotal_cents)]
+        priced = [(coupon.discount_cents(subtotal_cents, now), coupon) for coupon in eligible]
+        priced = [(discount, coupon) for discount, coupon in priced if discount > 0]
+        if self.stacking == "best":
+            priced = [max(priced, key=lambda entry: entry[0])] if priced else []
+        elif self.stacking == "best_per_type":
+            best = {}
+            for discount, coupon in priced:
+                kind = isinstance(coupon, PercentDiscountCoupon)
+                if kind not in best or discount > best[kind][0]:
+                    best[kind] = (discount, coupon)
+            priced = list(best.values())
+        if self.max_coupons is not None and len(priced) > self.max_coupons:
+            priced = sorted(priced, key=lambda entry: entry[0], reverse=True)[:self.max_coupons]
+        for discount, coupon in priced:
+            discounts[coupon.numeric_barcode] = discount
+        return discounts
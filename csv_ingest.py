@@ -0,0 +1,285 @@
+import argparse
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Iterator
+
+from product import Product
+from member import SilverMember, GoldMember, PlatinumMember
+from coupon import PercentDiscountCoupon, FixedDiscountCoupon
+
+MEMBER_TIERS = {"Silver": SilverMember, "Gold": GoldMember, "Platinum": PlatinumMember}
+TIER_NAMES = {member_class: tier for tier, member_class in MEMBER_TIERS.items()}
+CHUNK_BYTES = 8 << 20
+READ_BYTES = 1 << 20
+PARALLEL_MIN_BYTES = 32 << 20
+
+
+def read_rows(path: str, start: int = 0, end: int = None, malformed: list = None) -> Iterator[tuple[int, list[str]]]:
+    """Stream the CSV rows whose lines start in the byte range [start, end),
+    skipping the header, with csv quoting rules (quoted fields may contain
+    commas; they may not contain line breaks, so any byte range can be split
+    at the next newline).
+
+    Args:
+        path (str): The CSV file.
+        start (int, optional): First byte of the range. Defaults to 0.
+        end (int, optional): End of the range. Defaults to the end of the file.
+        malformed (list, optional): Skip lines that are not valid UTF-8 and
+            append a (line number, fields, reason) tuple for each to this list.
+            Defaults to None (raise instead).
+    Yields:
+        tuple[int, list[str]]: The line number (1-based, counted from start)
+        and the stripped fields of each non-blank row.
+    Raises:
+        ValueError: If a line is not valid UTF-8 and malformed is None.
+    """
+    with open(path, "rb") as f:
+        if start > 0:
+            # Finish the line that straddles start; it belongs to the previous range
+            f.seek(start - 1)
+        position = start + len(f.readline()) - (start > 0)
+        line_number = 1 if start == 0 else 0
+        while end is None or position < end:
+            # Decode a block of whole lines at a time; only a block with bad bytes is decoded line by line
+            block = f.read(READ_BYTES)
+            if not block:
+                return
+            block += f.readline()
+            if end is not None and position + len(block) > end:
+                # Keep the lines starting before end
+                block = block[:block.find(b"\n", end - position - 1) + 1 or len(block)]
+            position += len(block)
+            try:
+                lines = block.decode("utf-8").split("\n")
+            except UnicodeDecodeError:
+                lines = block.split(b"\n")
+            if not lines[-1]:
+                lines.pop()
+            for line in lines:
+                line_number += 1
+                if isinstance(line, bytes):
+                    try:
+                        line = line.decode("utf-8")
+                    except UnicodeDecodeError as error:
+                        if malformed is None:
+                            raise ValueError(f"Line {line_number}: invalid UTF-8")
+                        row = parse_line(line.decode("utf-8", errors="replace"))
+                        malformed.append((line_number, row, f"Invalid UTF-8: {error.reason}"))
+                        continue
+                if '"' in line:
+                    # One reader per line, so an unbalanced quote cannot swallow the rows after it
+                    row = parse_line(line)
+                else:
+                    row = [field.strip() for field in line.split(",")]
+                if any(row):
+                    yield line_number, row
+
+
+def _fields(row: list[str], count: int) -> list[str]:
+    if len(row) != count:
+        raise ValueError(f"Expected {count} fields, got {len(row)}")
+    if not row[0]:
+        raise ValueError("Missing barcode")
+    return row
+
+
+def parse_product(row: list[str]) -> tuple[str, Product]:
+    """Given the fields of an inventory row, return its barcode and Product.
+
+    Raises:
+        ValueError: The row is malformed.
+    """
+    barcode, name, price, quantity = _fields(row, 4)
+    return barcode, Product(numeric_barcode = barcode, name = name, price = price, quantity = int(quantity))
+
+
+def parse_member(row: list[str]) -> tuple[str, object]:
+    """Given the fields of a membership row, return its barcode and Member.
+
+    Raises:
+        ValueError: The row is malformed or the tier is unknown.
+    """
+    barcode, name, tier, points = _fields(row, 4)
+    if tier not in MEMBER_TIERS:
+        raise ValueError(f"Unknown tier: {tier}")
+    return barcode, MEMBER_TIERS[tier](numeric_barcode = barcode, name = name, points = points)
+
+
+def parse_coupon(row: list[str]) -> tuple[str, object]:
+    """Given the fields of a coupon row, return its barcode and Coupon. An
+    optional seventh field holds the date the coupon becomes active.
+
+    Raises:
+        ValueError: The row is malformed or the discount type is unknown.
+    """
+    fields = _fields(row, 7) if len(row) == 7 else _fields(row, 6) + [""]
+    barcode, expiration_date, discount_type, discount, min_purchase, description, activation_date = fields
+    expiration_date = datetime.strptime(expiration_date, "%Y-%m-%d")
+    activation_date = datetime.strptime(activation_date, "%Y-%m-%d") if activation_date else None
+    if discount_type.lower() == "percent":
+        return barcode, PercentDiscountCoupon(
+            numeric_barcode = barcode,
+            expiration_date = expiration_date,
+            min_purchase = min_purchase,
+            description = description,
+            percent_value = discount,
+            activation_date = activation_date
+        )
+    if discount_type.lower() == "fixed":
+        return barcode, FixedDiscountCoupon(
+            numeric_barcode = barcode,
+            expiration_date = expiration_date,
+            min_purchase = min_purchase,
+            description = description,
+            fixed_value = discount,
+            activation_date = activation_date
+        )
+    raise ValueError(f"Unknown discount type: {discount_type}")
+
+
+PARSERS = {"inventory": parse_product, "memberships": parse_member, "coupons": parse_coupon}
+
+
+def _pack_product(product: Product) -> tuple:
+    return product.numeric_barcode, product.name, product.price_cents, product.quantity
+
+
+def _unpack_product(fields: tuple) -> Product:
+    barcode, name, price_cents, quantity = fields
+    product = Product(numeric_barcode = barcode, name = name, price = 0, quantity = quantity)
+    product.price_cents = price_cents
+    return product
+
+
+def _pack_member(member) -> tuple:
+    return member.barcode, member.name, member.points_cents, TIER_NAMES[type(member)]
+
+
+def _unpack_member(fields: tuple):
+    barcode, name, points_cents, tier = fields
+    member = MEMBER_TIERS[tier](numeric_barcode = barcode, name = name, points = 0)
+    member.points_cents = points_cents
+    return member
+
+
+# Workers send records back as plain tuples starting with the barcode, which pickle far smaller
+# and faster than the objects
+PACKERS = {
+    "inventory": (_pack_product, _unpack_product),
+    "memberships": (_pack_member, _unpack_member),
+}
+
+
+def _parse_range(path: str, kind: str, start: int, end: int, pack: bool = False) -> tuple:
+    """Parse one byte range; returns the records and the malformed rows (with
+    range-relative line numbers). With pack, the records are returned as a
+    list of packed tuples instead of a dict, see PACKERS."""
+    parse = PARSERS[kind]
+    records, malformed = {}, []
+    for line_number, row in read_rows(path, start, end, malformed):
+        try:
+            barcode, record = parse(row)
+        except ValueError as error:
+            malformed.append((line_number, row, str(error)))
+            continue
+        records[barcode] = record
+    if pack and kind in PACKERS:
+        return list(map(PACKERS[kind][0], records.values())), malformed
+    return records, malformed
+
+
+def _split_ranges(path: str, chunk_bytes: int) -> list[tuple[int, int]]:
+    """Split a file into byte ranges that each end just after a newline."""
+    size = os.path.getsize(path)
+    boundaries = [0]
+    with open(path, "rb") as f:
+        while boundaries[-1] + chunk_bytes < size:
+            f.seek(boundaries[-1] + chunk_bytes)
+            f.readline()
+            if f.tell() >= size:
+                break
+            boundaries.append(f.tell())
+    boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def _count_lines(path: str, start: int, end: int) -> int:
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(end - start).count(b"\n")
+
+
+def ingest(path: str, kind: str, processes: int = 1, chunk_bytes: int = CHUNK_BYTES) -> tuple[dict, list]:
+    """Parse an inventory, memberships or coupons CSV into a barcode -> record
+    dict, optionally in byte-range chunks across worker processes.
+
+    Rows that fail to parse (including lines that are not valid UTF-8) are
+    not loaded; they are returned instead, so the caller can report them.
+    Files smaller than PARALLEL_MIN_BYTES are always parsed in this process,
+    where starting the workers would cost more than it saves.
+
+    Args:
+        path (str): The CSV file.
+        kind (str): inventory, memberships or coupons.
+        processes (int, optional): Worker processes; 1 parses in this process. Defaults to 1.
+        chunk_bytes (int, optional): Approximate bytes per chunk. Defaults to 8 MiB.
+    Returns:
+        tuple[dict, list]: The records by barcode (the last row wins for a
+        repeated barcode), and a (line number, fields, reason) tuple per
+        malformed row.
+    Raises:
+        ValueError: If the kind is not valid.
+    """
+    if kind not in PARSERS:
+        raise ValueError(f"Invalid kind: {kind}, must be inventory, memberships, or coupons")
+    ranges = _split_ranges(path, chunk_bytes)
+    if processes == 1 or len(ranges) == 1 or os.path.getsize(path) < PARALLEL_MIN_BYTES:
+        return _parse_range(path, kind, 0, None)
+
+    unpack = PACKERS[kind][1] if kind in PACKERS else None
+    records, malformed, lines_before = {}, [], 0
+    with ProcessPoolExecutor(max_workers=min(processes, len(ranges))) as executor:
+        futures = [executor.submit(_parse_range, path, kind, start, end, True) for start, end in ranges]
+        for (start, end), future in zip(ranges, futures):
+            chunk_records, chunk_malformed = future.result()
+            if unpack is None:
+                records.update(chunk_records)
+            else:
+                for fields in chunk_records:
+                    records[fields[0]] = unpack(fields)
+            malformed.extend((lines_before + line_number, row, reason) for line_number, row, reason in chunk_malformed)
+            lines_before += _count_lines(path, start, end)
+    return records, malformed
+
+
+def writer(f):
+    """Return a csv writer producing the same format the loaders read (fields
+    with commas or quotes are quoted)."""
+    return csv.writer(f, lineterminator="\n")
+
+
+def parse_line(line: str) -> list[str]:
+    """Given one CSV line, return its stripped fields."""
+    return [field.strip() for field in next(csv.reader((line,), skipinitialspace=True), [])]
+
+
+def format_row(fields) -> str:
+    """Given the fields of a row, return it as one CSV line (with its newline)."""
+    buffer = io.StringIO()
+    writer(buffer).writerow(fields)
+    return buffer.getvalue()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse a store CSV and report malformed rows.")
+    parser.add_argument("kind", choices=sorted(PARSERS))
+    parser.add_argument("path")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    records, malformed = ingest(args.path, args.kind, args.processes)
+    for line_number, row, reason in malformed:
+        print(f"line {line_number}: {reason}: {','.join(row)}")
+    print(f"Loaded {len(records)} rows, {len(malformed)} malformed")
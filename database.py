@@ -1,27 +1,70 @@
 from product import Product
-from member import Member, SilverMember, GoldMember, PlatinumMember
-from coupon import Coupon, PercentDiscountCoupon, FixedDiscountCoupon
+from member import Member
+from coupon import Coupon
+from money import format_cents
+from journal import InventoryJournal, file_checksum
+from locking import LockStripes
+from snapshot import source_key, load_snapshot, save_snapshot, RecordColumns
+from csv_ingest import ingest, writer
 from datetime import datetime
+import heapq
+import os
+import threading
 
 
 class ProductDatabase:
     SAVE_PATH = "db-data/updated_inventory.csv"
 
-    def __init__(self, inventory_path: str):
-        # TODO: Implement this method
-        self.inventory_path = inventory_path
-        self.products = {}
-        with open(inventory_path, "r") as f:
-            lines = f.readlines()
-            for line in lines[1:]:
-                line = line.strip()
-                if not line:
-                    continue
-                line = line.split(",")
-                barcode, name, price, quantity = line[0].strip(), line[1].strip(), line[2].strip(), line[3].strip()
-                product = Product(numeric_barcode = barcode, name = name, price = float(price), quantity = int(quantity))
-                self.products[barcode] = product
+    def __init__(
+        self,
+        inventory_path: str,
+        journal_path: str = None,
+        compact_every: int = 1000,
+        snapshot_path: str = None,
+        processes: int = 1,
+    ):
+        """Load the inventory snapshot.
+
+        Args:
+            inventory_path (str): The inventory CSV.
+            journal_path (str, optional): Journal mode: replay this journal of
+                quantity deltas over the snapshot, and have save_inventory append
+                to it instead of rewriting the catalog. Defaults to None.
+            compact_every (int, optional): In journal mode, fold the journal into
+                a new snapshot at inventory_path once it holds this many records.
+                Defaults to 1000.
+            snapshot_path (str, optional): Cache the parsed inventory in this
+                binary snapshot, and load it instead of parsing the CSV while
+                the CSV is unchanged. The snapshot holds flat columns (see
+                snapshot.RecordColumns), and each Product is only built when it
+                is first looked up. Defaults to None.
+            processes (int, optional): Parse the CSV in chunks across this many
+                worker processes. Defaults to 1.
 
+        Rows that cannot be parsed are not loaded; they are listed in
+        malformed_rows as (line number, fields, reason) tuples.
+        """
+        self.inventory_path = inventory_path
+        cached = load_snapshot(snapshot_path, inventory_path) if snapshot_path else None
+        self.products, self.malformed_rows = cached or (None, None)
+        self.journal = None
+        self.compact_every = compact_every
+        self._pending_deltas = {}
+        # Lanes sharing the database update different SKUs under different
+        # stripes; saves are serialized and may run on a background flusher
+        self._locks = LockStripes()
+        self._save_lock = threading.Lock()
+        if self.products is None:
+            key = source_key(inventory_path) if snapshot_path else None
+            self.products, self.malformed_rows = ingest(inventory_path, "inventory", processes)
+            if snapshot_path:
+                # Cache the CSV as parsed; journal deltas are replayed on top on every start
+                save_snapshot(snapshot_path, key, (RecordColumns("inventory", self.products), self.malformed_rows))
+        if journal_path is not None:
+            self.journal = InventoryJournal(journal_path, file_checksum(inventory_path))
+            for barcode, delta in self.journal.replay():
+                if barcode in self.products:
+                    self.products[barcode].decrease_quantity(-delta)
 
     def get_product(self, numeric_barcode: str) -> Product:
         """Given a barcode, return the Product object associated with that\
@@ -46,51 +89,119 @@ class ProductDatabase:
         """
         if numeric_barcode not in self.products:
             return
-        self.products[numeric_barcode].decrease_quantity(quantity)
+        with self._locks.lock_for(numeric_barcode):
+            self.products[numeric_barcode].decrease_quantity(quantity)
+            if self.journal is not None:
+                self._pending_deltas[numeric_barcode] = self._pending_deltas.get(numeric_barcode, 0) - quantity
         return
 
-    def save_inventory(self):
-        """Save the inventory to a CSV file"""
-        with open(self.SAVE_PATH, 'w') as f:
-            f.write('numeric_barcode,name,price,quantity\n')
-            for product in self.products.values():
-                f.write(f"{product.get_barcode()},{product.get_name()},{product.get_price()},{product.get_quantity()}\n")
+    def save_inventory(self, fsync: bool = False):
+        """Save the inventory to a CSV file. In journal mode, only append the
+        changes since the last save to the journal, compacting it when it grows
+        past compact_every records.
+
+        Args:
+            fsync (bool, optional): Force the write to disk before returning. Defaults to False.
+        """
+        with self._save_lock:
+            if self.journal is None:
+                with open(self.SAVE_PATH, 'w') as f:
+                    self._write_inventory(f)
+                    if fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+                return
+            with self._locks.all():
+                pending, self._pending_deltas = self._pending_deltas, {}
+                # The snapshot must hold exactly the deltas journaled so far: later
+                # decrements stay pending for the next save, on top of it
+                rows = None
+                if self.journal.record_count() + len(pending) >= self.compact_every:
+                    rows = self._inventory_rows()
+            self.journal.append(pending, fsync=fsync)
+            if rows is not None:
+                self._compact(rows)
+
+    def compact(self):
+        """Write the current inventory as the new snapshot at inventory_path and start an empty journal."""
+        with self._save_lock:
+            with self._locks.all():
+                pending, self._pending_deltas = self._pending_deltas, {}
+                rows = self._inventory_rows()
+            self.journal.append(pending, fsync=True)
+            self._compact(rows)
+
+    def _compact(self, rows: list[tuple]):
+        """Write the rows as the new snapshot and start an empty journal, with the save lock held.
+
+        Malformed rows were never loaded, so their original lines are copied
+        from the old snapshot to the end of the new one rather than lost.
+        """
+        malformed_rows = sorted(self.malformed_rows, key=lambda row: row[0])
+        malformed_lines = self._read_lines({line_number for line_number, _, _ in malformed_rows})
+        temporary_path = self.inventory_path + ".tmp"
+        with open(temporary_path, 'w') as f:
+            self._write_inventory(f, rows)
+            f.flush()
+            f.buffer.write(b"".join(
+                line if line.endswith(b"\n") else line + b"\n" for line in malformed_lines
+            ))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, self.inventory_path)
+        self.malformed_rows = [
+            (len(rows) + 2 + index, fields, reason) for index, (_, fields, reason) in enumerate(malformed_rows)
+        ]
+        self.journal.reset(file_checksum(self.inventory_path))
+
+    def _read_lines(self, line_numbers: set) -> list[bytes]:
+        """Given line numbers (1 is the header), return those raw lines of the inventory CSV in file order."""
+        if not line_numbers:
+            return []
+        with open(self.inventory_path, 'rb') as f:
+            return [line for line_number, line in enumerate(f, 1) if line_number in line_numbers]
+
+    def _inventory_rows(self) -> list[tuple]:
+        """Get every product as an inventory CSV row."""
+        return [
+            (product.get_barcode(), product.get_name(), format_cents(product.get_price_cents()), product.get_quantity())
+            for product in self.products.values()
+        ]
+
+    def _write_inventory(self, f, rows: list[tuple] = None):
+        """Write the rows (every product by default) as inventory CSV rows to an open file."""
+        rows_writer = writer(f)
+        rows_writer.writerow(("numeric_barcode", "name", "price", "quantity"))
+        if rows is None:
+            rows = (
+                (product.get_barcode(), product.get_name(), format_cents(product.get_price_cents()), product.get_quantity())
+                for product in self.products.values()
+            )
+        rows_writer.writerows(rows)
 
 class MemberDatabase:
     SAVE_PATH = "db-data/updated_memberships.csv"
 
-    def __init__(self, membership_path: str):
+    def __init__(self, membership_path: str, snapshot_path: str = None, processes: int = 1):
+        """Load the memberships. Malformed rows (including unknown tiers) are
+        listed in malformed_rows, see ProductDatabase.
+
+        Args:
+            membership_path (str): The membership CSV.
+            snapshot_path (str, optional): Binary snapshot caching the parsed
+                memberships, see ProductDatabase. Defaults to None.
+            processes (int, optional): Worker processes for parsing. Defaults to 1.
+        """
         self.membership_path = membership_path
-        self.membership = {}
-        with open(membership_path, 'r') as f:
-            lines = f.readlines()
-            for line in lines[1:]:
-                line = line.strip()
-                if not line:
-                    continue
-                line = line.split(',')
-                barcode, name, tier, points = line[0].strip(), line[1].strip(), line[2].strip(), line[3].strip()
-                if tier == "Silver":
-                    member = SilverMember(
-                        numeric_barcode = barcode,
-                        name = name,
-                        points = points
-                    )
-                elif tier == "Gold":
-                    member = GoldMember(
-                        numeric_barcode = barcode,
-                        name = name,
-                        points = points
-                    )
-                elif tier == "Platinum":
-                    member = PlatinumMember(
-                        numeric_barcode = barcode,
-                        name = name,
-                        points = points
-                    )
-                else:
-                    continue
-                self.membership[barcode] = member
+        cached = load_snapshot(snapshot_path, membership_path) if snapshot_path else None
+        self.membership, self.malformed_rows = cached or (None, None)
+        self._locks = LockStripes()
+        self._save_lock = threading.Lock()
+        if self.membership is None:
+            key = source_key(membership_path) if snapshot_path else None
+            self.membership, self.malformed_rows = ingest(membership_path, "memberships", processes)
+            if snapshot_path:
+                save_snapshot(snapshot_path, key, (RecordColumns("memberships", self.membership), self.malformed_rows))
 
     def get_member(self, numeric_barcode: str) -> Member:
         """Given a barcode, assert that the member is registered, and if so, return the Member object associated with that barcode.
@@ -114,53 +225,105 @@ class MemberDatabase:
         """
         if numeric_barcode not in self.membership:
             return
-        self.membership[numeric_barcode].add_points(float(points))
+        with self._locks.lock_for(numeric_barcode):
+            self.membership[numeric_barcode].add_points(points)
+
+    def add_points_cents(self, numeric_barcode: str, points_cents: int):
+        """Given a barcode, add the specified number of hundredths of a point to the member associated with that barcode.
+
+        Args:
+            numeric_barcode (str): The barcode of the member to add points to.
+            points_cents (int): The number of hundredths of a point to add.
+        """
+        if numeric_barcode not in self.membership:
+            return
+        with self._locks.lock_for(numeric_barcode):
+            self.membership[numeric_barcode].add_points_cents(points_cents)
 
-    def save_memberships(self):
-        """Save the current membership list to a CSV file"""
-        with open(self.SAVE_PATH, "w") as f:
-            f.write('numeric_barcode,name,tier,points\n')
-            for member in self.membership.values():
-                f.write(f"{member.get_barcode()},{member.get_name()},{member.return_membership_type()},{member.get_points()}\n")
+    def save_memberships(self, fsync: bool = False):
+        """Save the current membership list to a CSV file
+
+        Args:
+            fsync (bool, optional): Force the write to disk before returning. Defaults to False.
+        """
+        with self._save_lock, open(self.SAVE_PATH, "w") as f:
+            rows = writer(f)
+            rows.writerow(("numeric_barcode", "name", "tier", "points"))
+            rows.writerows(
+                (member.get_barcode(), member.get_name(), member.return_membership_type(), format_cents(member.get_points_cents()))
+                for member in self.membership.values()
+            )
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
 
 
 class CouponDatabase:
-    def __init__(self, coupon_path: str):
-        self.coupon = {}
-        with open(coupon_path, 'r') as f:
-            lines = f.readlines()
-            for line in lines[1:]:
-                line = line.strip()
-                if not line:
-                    continue
-                line = line.split(',')
-                barcode, expiration_date, discount_type, discount, min_purchase, description\
-                 = line[0].strip(), line[1].strip(), line[2].strip(), line[3].strip(), line[4].strip(), line[5].strip()
-                expiration_date = datetime.strptime(expiration_date, "%Y-%m-%d")
-                discount = float(discount)
-                min_purchase = float(min_purchase)
-                if discount_type.lower() == "percent":
-                    coupon_object = PercentDiscountCoupon(
-                        numeric_barcode = barcode,
-                        expiration_date = expiration_date,
-                        min_purchase = min_purchase,
-                        description = description,
-                        percent_value = discount
-                    )
-                elif discount_type.lower() == "fixed":
-                    coupon_object = FixedDiscountCoupon(
-                        numeric_barcode = barcode,
-                        expiration_date = expiration_date,
-                        min_purchase = min_purchase,
-                        description = description,
-                        fixed_value = discount
-                    )
-                else:
-                    continue
-                self.coupon[barcode] = coupon_object
-
-    def get_coupon(self, numeric_barcode: str) -> Coupon:
-        """Given a barcode, return the Coupon object associated with that barcode."""
-        if numeric_barcode in self.coupon:
-            return self.coupon[numeric_barcode]
-        return None
+    def __init__(self, coupon_path: str, snapshot_path: str = None, processes: int = 1, clock=None):
+        """Load the coupons. Malformed rows (including unknown discount types
+        and bad dates) are listed in malformed_rows, see ProductDatabase.
+
+        Coupons are also indexed in a heap ordered by expiration date, so
+        expired coupons are dropped from memory as soon as the clock passes
+        them, without scanning the table. Coupons already expired at load
+        time are never kept. A transaction time passed to get_coupon only
+        decides whether the coupon is active for that transaction.
+
+        Args:
+            coupon_path (str): The coupon CSV.
+            snapshot_path (str, optional): Binary snapshot caching the parsed
+                coupons, see ProductDatabase. Defaults to None.
+            processes (int, optional): Worker processes for parsing. Defaults to 1.
+            clock (optional): Callable returning the current datetime, used
+                when no time is given. Defaults to datetime.now.
+        """
+        cached = load_snapshot(snapshot_path, coupon_path) if snapshot_path else None
+        self.coupon, self.malformed_rows = cached or (None, None)
+        if self.coupon is None:
+            key = source_key(coupon_path) if snapshot_path else None
+            self.coupon, self.malformed_rows = ingest(coupon_path, "coupons", processes)
+            if snapshot_path:
+                save_snapshot(snapshot_path, key, (self.coupon, self.malformed_rows))
+        self.clock = clock or datetime.now
+        self.evicted = 0
+        self._expiry_lock = threading.Lock()
+        self._expiry_heap = [(coupon.expiration_date, barcode) for barcode, coupon in self.coupon.items()]
+        heapq.heapify(self._expiry_heap)
+        self.evict_expired()
+
+    def evict_expired(self) -> int:
+        """Drop every coupon that has expired by the database clock.
+
+        Returns:
+            int: The number of coupons dropped.
+        """
+        now = self.clock()
+        heap = self._expiry_heap
+        if not heap or heap[0][0] >= now:
+            return 0
+        evicted = 0
+        with self._expiry_lock:
+            while heap and heap[0][0] < now:
+                _, barcode = heapq.heappop(heap)
+                del self.coupon[barcode]
+                evicted += 1
+            self.evicted += evicted
+        return evicted
+
+    def get_coupon(self, numeric_barcode: str, now: datetime = None) -> Coupon:
+        """Given a barcode, return the Coupon object associated with that barcode.
+
+        Args:
+            numeric_barcode (str): The barcode of the coupon.
+            now (datetime, optional): The transaction time. Defaults to the clock.
+        Returns:
+            Coupon: The coupon (None if unknown, expired, or not active yet).
+        """
+        # Only the clock evicts; a transaction time ahead of it must not drop coupons for other lanes
+        self.evict_expired()
+        if now is None:
+            now = self.clock()
+        coupon = self.coupon.get(numeric_barcode)
+        if coupon is None or not coupon.is_active(now):
+            return None
+        return coupon
@@ -0,0 +1,306 @@
+import argparse
+import math
+import os
+import random
+from datetime import date, timedelta
+
+from tester_student import LEFT_DIGITS2MODULES, RIGHT_DIGITS2MODULES, GUARDS
+
+ITEM_PREFIXES = {"product": "0", "coupon": "1", "membership": "2"}
+MEMBER_TIERS = (("Silver", 60), ("Gold", 30), ("Platinum", 10))
+BARCODE_SPACE = 10 ** 10
+HALF_SPACE = 10 ** 5
+
+# UPC-A weighted digit sums of the high and low five digits of the 10 digits
+# after the prefix, so a check digit costs two list lookups instead of a
+# per-digit loop (built on first use)
+_HIGH_SUMS = None
+_LOW_SUMS = None
+
+
+def _weighted_sums(weights: tuple) -> list[int]:
+    sums = [0]
+    for weight in weights:
+        sums = [total + weight * digit for total in sums for digit in range(10)]
+    return sums
+
+
+class BarcodeSequence:
+    """Deterministic sequence of unique, valid UPC-A barcodes for one item type.
+
+    Row i maps to the 10 digits (start + i * step) mod 10^10 after the type
+    prefix. step is coprime to 10^10, so the first 10^10 rows never repeat a
+    barcode, and any row's barcode can be recomputed from its index without
+    keeping the whole catalog in memory.
+    """
+
+    def __init__(self, item_type: str, seed: int = 0):
+        """
+        Args:
+            item_type (str): product, coupon, or membership.
+            seed (int, optional): Seed for the start and step. Defaults to 0.
+
+        Raises:
+            ValueError: If the item type is not valid.
+        """
+        if item_type not in ITEM_PREFIXES:
+            raise ValueError(f"Invalid item type: {item_type}, must be product, coupon, or membership")
+        self.prefix = ITEM_PREFIXES[item_type]
+        rng = random.Random(f"{seed}-{item_type}-barcodes")
+        self.start = rng.randrange(BARCODE_SPACE)
+        step = rng.randrange(BARCODE_SPACE // 3, BARCODE_SPACE)
+        while math.gcd(step, BARCODE_SPACE) != 1:
+            step += 1
+        self.step = step
+        global _HIGH_SUMS, _LOW_SUMS
+        if _HIGH_SUMS is None:
+            _HIGH_SUMS = _weighted_sums((1, 3, 1, 3, 1))
+            _LOW_SUMS = _weighted_sums((3, 1, 3, 1, 3))
+        self._prefix_sum = 3 * int(self.prefix)
+
+    def __getitem__(self, index: int) -> str:
+        """Given a row index, return that row's 12 digit numeric barcode."""
+        digits = (self.start + index * self.step) % BARCODE_SPACE
+        high, low = divmod(digits, HALF_SPACE)
+        check_digit = -(self._prefix_sum + _HIGH_SUMS[high] + _LOW_SUMS[low]) % 10
+        return f"{self.prefix}{digits:010d}{check_digit}"
+
+
+def barcode_to_binary(barcode_12: str) -> str:
+    """Given a 12 digit numeric barcode, return its 95-bit scan.
+
+    Same encoding as tester_student.barcode_digits2binary, without the
+    per-call validation, for writing millions of scans.
+    """
+    return (
+        GUARDS["LEFT"]
+        + "".join([LEFT_DIGITS2MODULES[digit] for digit in barcode_12[:6]])
+        + GUARDS["CENTER"]
+        + "".join([RIGHT_DIGITS2MODULES[digit] for digit in barcode_12[6:]])
+        + GUARDS["RIGHT"]
+    )
+
+
+def parse_basket_sizes(spec: str):
+    """Given a basket-size distribution, return a function drawing a size from a Random.
+
+    Supported specs:
+        fixed:N         every basket has N items
+        uniform:A:B     between A and B items, inclusive
+        geometric:MEAN  mostly small baskets with a long tail, mean about MEAN
+        lognormal:MU:SIGMA  log of the size is normal(MU, SIGMA)
+
+    Args:
+        spec (str): The distribution spec.
+    Returns:
+        Callable[[random.Random], int]: Draws a basket size (at least 1).
+    Raises:
+        ValueError: If the spec is not recognised.
+    """
+    kind, _, args = spec.partition(":")
+    try:
+        values = [float(value) for value in args.split(":")] if args else []
+    except ValueError:
+        raise ValueError(f"Invalid basket size distribution: {spec}")
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: max(1, int(values[0]))
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: max(1, rng.randint(int(values[0]), int(values[1])))
+    if kind == "geometric" and len(values) == 1 and values[0] >= 1:
+        # Number of trials until the first success, with success probability 1/mean
+        log_failure = math.log1p(-1 / values[0]) if values[0] > 1 else None
+        if log_failure is None:
+            return lambda rng: 1
+        return lambda rng: 1 + int(math.log(1.0 - rng.random()) / log_failure)
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: max(1, round(rng.lognormvariate(values[0], values[1])))
+    raise ValueError(f"Invalid basket size distribution: {spec}")
+
+
+def write_inventory(path: str, count: int, seed: int = 0, chunk_size: int = 10_000):
+    """Write an inventory CSV with count products.
+
+    Args:
+        path (str): The inventory CSV to write.
+        count (int): The number of products.
+        seed (int, optional): The seed. Defaults to 0.
+        chunk_size (int, optional): Rows formatted per write. Defaults to 10,000.
+    """
+    barcodes = BarcodeSequence("product", seed)
+    rng = random.Random(f"{seed}-inventory")
+    random_float = rng.random
+    with open(path, "w") as f:
+        f.write("numeric_barcode,name,price,quantity\n")
+        for chunk_start in range(0, count, chunk_size):
+            f.write("".join([
+                f"{barcodes[i]},Product {i},{int(19 + random_float() * 9981) / 100:.2f},{int(random_float() * 501)}\n"
+                for i in range(chunk_start, min(chunk_start + chunk_size, count))
+            ]))
+
+
+def write_memberships(path: str, count: int, seed: int = 0, chunk_size: int = 10_000):
+    """Write a membership CSV with count members, tiers weighted 60/30/10 Silver/Gold/Platinum.
+
+    Args:
+        path (str): The membership CSV to write.
+        count (int): The number of members.
+        seed (int, optional): The seed. Defaults to 0.
+        chunk_size (int, optional): Rows formatted per write. Defaults to 10,000.
+    """
+    barcodes = BarcodeSequence("membership", seed)
+    rng = random.Random(f"{seed}-memberships")
+    tiers = [tier for tier, _ in MEMBER_TIERS]
+    weights = [weight for _, weight in MEMBER_TIERS]
+    random_float = rng.random
+    with open(path, "w") as f:
+        f.write("numeric_barcode,name,tier,points\n")
+        for chunk_start in range(0, count, chunk_size):
+            rows = min(chunk_size, count - chunk_start)
+            chunk_tiers = rng.choices(tiers, weights, k=rows)
+            f.write("".join([
+                f"{barcodes[chunk_start + i]},Member {chunk_start + i},{chunk_tiers[i]},{int(random_float() * 10001)}\n"
+                for i in range(rows)
+            ]))
+
+
+def write_coupons(path: str, count: int, seed: int = 0, start_date: date = date(2025, 1, 1), chunk_size: int = 10_000):
+    """Write a coupon CSV with count coupons, half percent and half fixed, expiring
+    within ten years of start_date.
+
+    Args:
+        path (str): The coupon CSV to write.
+        count (int): The number of coupons.
+        seed (int, optional): The seed. Defaults to 0.
+        start_date (date, optional): The earliest expiration date. Defaults to 2025-01-01.
+        chunk_size (int, optional): Rows formatted per write. Defaults to 10,000.
+    """
+    barcodes = BarcodeSequence("coupon", seed)
+    rng = random.Random(f"{seed}-coupons")
+    with open(path, "w") as f:
+        f.write("numeric_barcode,expiration_date,discount_type,discount_value,min_purchase,description\n")
+        for chunk_start in range(0, count, chunk_size):
+            rows = []
+            for i in range(chunk_start, min(chunk_start + chunk_size, count)):
+                expiration_date = start_date + timedelta(days=rng.randrange(3650))
+                min_purchase = rng.choice((0, 10, 20, 30, 50, 100))
+                if rng.random() < 0.5:
+                    value = rng.choice((5, 10, 15, 20, 25))
+                    rows.append(f"{barcodes[i]},{expiration_date},percent,{value}.0,{min_purchase}.00,{value}% off on orders over ${min_purchase}\n")
+                else:
+                    value = rng.choice((1, 2, 5, 10))
+                    rows.append(f"{barcodes[i]},{expiration_date},fixed,{value}.00,{min_purchase}.00,${value} off on orders over ${min_purchase}\n")
+            f.write("".join(rows))
+
+
+def write_scan_files(
+    directory: str,
+    carts: int,
+    products: int,
+    members: int = 0,
+    coupons: int = 0,
+    basket_sizes: str = "geometric:12",
+    reversed_ratio: float = 0.0,
+    noise_ratio: float = 0.0,
+    member_ratio: float = 0.5,
+    coupon_ratio: float = 0.2,
+    seed: int = 0,
+) -> list[str]:
+    """Write one binary scan file per cart, drawing items from a catalog written with the same seed.
+
+    Args:
+        directory (str): Where to write scan_<n>_binary.txt files.
+        carts (int): The number of carts.
+        products (int): The catalog size to draw products from.
+        members (int, optional): The membership table size; 0 for no membership scans. Defaults to 0.
+        coupons (int, optional): The coupon table size; 0 for no coupon scans. Defaults to 0.
+        basket_sizes (str, optional): Basket-size distribution, see parse_basket_sizes. Defaults to "geometric:12".
+        reversed_ratio (float, optional): Share of scans read upside down. Defaults to 0.0.
+        noise_ratio (float, optional): Share of scans with one flipped bit. Defaults to 0.0.
+        member_ratio (float, optional): Share of carts that scan a membership. Defaults to 0.5.
+        coupon_ratio (float, optional): Share of carts that scan a coupon. Defaults to 0.2.
+        seed (int, optional): The seed. Defaults to 0.
+    Returns:
+        list[str]: The scan file paths, in cart order.
+    """
+    product_barcodes = BarcodeSequence("product", seed)
+    member_barcodes = BarcodeSequence("membership", seed)
+    coupon_barcodes = BarcodeSequence("coupon", seed)
+    draw_basket_size = parse_basket_sizes(basket_sizes)
+    rng = random.Random(f"{seed}-scans")
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for cart in range(1, carts + 1):
+        barcodes = [product_barcodes[rng.randrange(products)] for _ in range(draw_basket_size(rng))]
+        if members and rng.random() < member_ratio:
+            barcodes.insert(rng.randrange(len(barcodes) + 1), member_barcodes[rng.randrange(members)])
+        if coupons and rng.random() < coupon_ratio:
+            barcodes.insert(rng.randrange(len(barcodes) + 1), coupon_barcodes[rng.randrange(coupons)])
+        scans = []
+        for barcode in barcodes:
+            scan = barcode_to_binary(barcode)
+            if rng.random() < reversed_ratio:
+                scan = scan[::-1]
+            if rng.random() < noise_ratio:
+                bit = rng.randrange(95)
+                scan = scan[:bit] + ("1" if scan[bit] == "0" else "0") + scan[bit + 1:]
+            scans.append(scan)
+        path = os.path.join(directory, f"scan_{cart}_binary.txt")
+        with open(path, "w") as f:
+            f.write("\n".join(scans))
+        paths.append(path)
+    return paths
+
+
+def generate(
+    output_dir: str,
+    products: int,
+    members: int,
+    coupons: int,
+    carts: int = 0,
+    seed: int = 0,
+    **scan_options,
+) -> dict:
+    """Write a full synthetic store (inventory, memberships, coupons and scan files) to output_dir.
+
+    Args:
+        output_dir (str): The directory to write to.
+        products (int): The number of products.
+        members (int): The number of members.
+        coupons (int): The number of coupons.
+        carts (int, optional): The number of scan files. Defaults to 0.
+        seed (int, optional): The seed. Defaults to 0.
+        **scan_options: Passed to write_scan_files.
+    Returns:
+        dict: The paths written (inventory, memberships, coupons, scans).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {
+        "inventory": os.path.join(output_dir, "inventory.csv"),
+        "memberships": os.path.join(output_dir, "memberships.csv"),
+        "coupons": os.path.join(output_dir, "coupons.csv"),
+    }
+    write_inventory(paths["inventory"], products, seed)
+    write_memberships(paths["memberships"], members, seed)
+    write_coupons(paths["coupons"], coupons, seed)
+    paths["scans"] = write_scan_files(
+        os.path.join(output_dir, "cart-data"), carts, products, members, coupons, seed=seed, **scan_options
+    )
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic store for load testing.")
+    parser.add_argument("output_dir")
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--members", type=int, default=100_000)
+    parser.add_argument("--coupons", type=int, default=10_000)
+    parser.add_argument("--carts", type=int, default=1_000)
+    parser.add_argument("--basket-sizes", default="geometric:12", help="fixed:N, uniform:A:B, geometric:MEAN or lognormal:MU:SIGMA")
+    parser.add_argument("--reversed-ratio", type=float, default=0.1)
+    parser.add_argument("--noise-ratio", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate(
+        args.output_dir, args.products, args.members, args.coupons, args.carts, args.seed,
+        basket_sizes=args.basket_sizes, reversed_ratio=args.reversed_ratio, noise_ratio=args.noise_ratio,
+    )
@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+
+class DecodeCache:
+    """Bounded LRU of raw scan -> decode result, safe to share across lanes.
+
+    A store scans the same few thousand SKUs over and over, so the result of
+    decoding, checking and classifying a 95-bit scan is kept under the scan
+    string itself. A product scanned upside down is a different string and
+    gets its own entry. Rejected scans are cached too, so a scanner that
+    keeps misreading the same label is rejected just as cheaply.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        """
+        Args:
+            capacity (int, optional): Scans kept at most. Defaults to 4096.
+
+        Raises:
+            ValueError: If the capacity is not positive.
+        """
+        if capacity < 1:
+            raise ValueError(f"Invalid capacity: {capacity}, must be at least 1")
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, scan: str, decode: Callable[[str], tuple]) -> tuple:
+        """Given a raw scan, return its cached result, calling decode(scan) on a miss.
+
+        decode runs outside the lock, so lanes missing at the same time do not
+        wait on each other; if two of them decode the same scan, the result is
+        the same and the later one simply replaces the entry.
+
+        Args:
+            scan (str): The raw scan string.
+            decode (Callable[[str], tuple]): Computes the result of a scan.
+        Returns:
+            tuple: The result of decode(scan).
+        """
+        with self._lock:
+            result = self.entries.get(scan)
+            if result is not None:
+                self.entries.move_to_end(scan)
+                self.hits += 1
+                return result
+            self.misses += 1
+        result = decode(scan)
+        with self._lock:
+            self.entries[scan] = result
+            self.entries.move_to_end(scan)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def clear(self):
+        """Drop every entry (the statistics are kept)."""
+        with self._lock:
+            self.entries.clear()
+
+    def get_stats(self) -> dict:
+        """Get the cache statistics.
+
+        Returns:
+            dict: hits, misses, evictions, size (scans cached), capacity and
+            hit_rate (hits over lookups, 0.0 before the first lookup).
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self.entries),
+                "capacity": self.capacity,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
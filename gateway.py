@@ -0,0 +1,144 @@
+import argparse
+import asyncio
+
+from pos import POSSystem
+from store_backend import StoreBackend
+from decode_cache import DecodeCache
+from scan_telemetry import ScanTelemetry
+from latency import LatencyRecorder
+from sales_ledger import SalesLedger
+from money import format_cents, to_cents
+
+
+class ScannerGateway:
+    """asyncio server that lets many scanner clients share one StoreBackend.
+
+    Each connection is a lane with its own POSSystem and cart. Clients send one
+    command per line:
+        <95-bit binary scan>  -> "TOTAL <running total>"
+        CHECKOUT              -> "PAID <total>", and the lane starts a new cart
+    A command that fails is answered with "ERROR <reason>" and the lane keeps
+    serving; after a failed checkout the lane also starts a new cart, since
+    the sale may have been partly recorded.
+    Scans are read into a bounded queue per lane; when a lane floods scans
+    faster than they are processed, the reader stops reading from that socket
+    until the queue drains, pushing the backpressure back to the scanner.
+    All lanes share one ScanTelemetry, in which connections are numbered
+    lane-1, lane-2, ..., and the decode cache, LatencyRecorder and
+    SalesLedger, when given.
+    """
+
+    def __init__(
+        self,
+        store_backend: StoreBackend,
+        queue_size: int = 64,
+        decode_cache: DecodeCache = None,
+        latency: LatencyRecorder = None,
+        ledger: SalesLedger = None,
+    ):
+        self.store_backend = store_backend
+        self.queue_size = queue_size
+        self.decode_cache = decode_cache
+        self.latency = latency
+        self.ledger = ledger
+        self.telemetry = ScanTelemetry()
+        self.lanes = 0
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        """Listen on a local TCP port (0 picks a free one)."""
+        return await asyncio.start_server(self._handle_lane, host, port)
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        """Listen on a Unix domain socket."""
+        return await asyncio.start_unix_server(self._handle_lane, path)
+
+    async def _handle_lane(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.lanes += 1
+        pos = POSSystem(store_backend=self.store_backend, decode_cache=self.decode_cache,
+                        lane=f"lane-{self.lanes}", telemetry=self.telemetry, latency=self.latency,
+                        ledger=self.ledger)
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        worker = asyncio.create_task(self._run_lane(pos, queue, writer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                await queue.put(line)
+        except ConnectionError:
+            pass
+        finally:
+            await queue.put(None)
+            await worker
+            writer.close()
+
+    async def _run_lane(self, pos: POSSystem, queue: asyncio.Queue, writer: asyncio.StreamWriter):
+        connected = True
+        while True:
+            line = await queue.get()
+            if line is None:
+                return
+            command = line.decode(errors="replace").strip()
+            if not command:
+                continue
+            try:
+                if command == "CHECKOUT":
+                    try:
+                        # Persisting the sale does file I/O, so keep it off the event loop
+                        total = await asyncio.to_thread(pos.checkout)
+                    finally:
+                        pos.start_new_cart()
+                    reply = f"PAID {format_cents(to_cents(total))}\n"
+                else:
+                    pos.process_scan(command)
+                    reply = f"TOTAL {format_cents(pos.get_current_cart().calculate_total_cents())}\n"
+            except Exception as error:
+                reply = f"ERROR {error}\n"
+            if not connected:
+                # Keep draining the queue so the reader never blocks on a dead lane
+                continue
+            writer.write(reply.encode())
+            try:
+                await writer.drain()
+            except ConnectionError:
+                connected = False
+
+
+async def _serve(args):
+    store_backend = StoreBackend(args.inventory, args.memberships, args.coupons, snapshot_dir=args.snapshot_dir)
+    decode_cache = DecodeCache(args.decode_cache_size) if args.decode_cache_size else None
+    latency = None
+    if args.latency_dump:
+        latency = LatencyRecorder()
+        latency.start_dump(args.latency_dump, args.latency_interval)
+    ledger = SalesLedger(args.ledger_dir) if args.ledger_dir else None
+    gateway = ScannerGateway(store_backend, args.queue_size, decode_cache, latency, ledger)
+    if args.unix:
+        server = await gateway.start_unix(args.unix)
+    else:
+        server = await gateway.start_tcp(args.host, args.port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if latency is not None:
+            latency.stop_dump()
+        if ledger is not None:
+            ledger.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve scanner lanes over TCP or a Unix socket.")
+    parser.add_argument("--inventory", default="db-data/inventory.csv")
+    parser.add_argument("--memberships", default="db-data/memberships.csv")
+    parser.add_argument("--coupons", default="db-data/coupons.csv")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--unix", help="Unix socket path (overrides --host/--port)")
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--snapshot-dir", help="Cache parsed CSVs here for fast restarts")
+    parser.add_argument("--decode-cache-size", type=int, default=4096, help="Decoded scans cached across lanes (0 disables)")
+    parser.add_argument("--latency-dump", help="Time each scan and checkout stage, writing p50/p99/max to this JSON file")
+    parser.add_argument("--latency-interval", type=float, default=10.0, help="Seconds between latency dumps")
+    parser.add_argument("--ledger-dir", help="Record every checkout in a sales ledger in this directory")
+    asyncio.run(_serve(parser.parse_args()))
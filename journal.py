@@ -0,0 +1,105 @@
+import os
+import zlib
+from typing import Iterator
+
+
+def file_checksum(path: str) -> int:
+    """Given a path, return the CRC-32 of the file contents.
+
+    Args:
+        path (str): The file to checksum.
+    Returns:
+        int: The CRC-32 of the file.
+    """
+
+    checksum = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            checksum = zlib.crc32(chunk, checksum)
+    return checksum
+
+
+class InventoryJournal:
+    """Append-only log of inventory quantity deltas recorded on top of an
+    inventory snapshot.
+
+    The first line names the snapshot the deltas apply to ("#snapshot <crc32>"),
+    then each line is one "numeric_barcode,delta" record. A journal whose
+    header does not match the current snapshot has already been folded into
+    it by a compaction and is discarded, so a crash between writing a new
+    snapshot and resetting the journal never applies the deltas twice.
+    """
+
+    HEADER_PREFIX = "#snapshot "
+
+    def __init__(self, journal_path: str, snapshot_checksum: int):
+        self.journal_path = journal_path
+        self.snapshot_checksum = snapshot_checksum
+        self.records = []
+        self._load()
+
+    def _load(self):
+        """Read the complete records of the journal, dropping a torn final line
+        and starting a new journal if it belongs to another snapshot."""
+
+        if not os.path.exists(self.journal_path):
+            self.reset(self.snapshot_checksum)
+            return
+        with open(self.journal_path, "rb") as f:
+            data = f.read()
+        lines = data.split(b"\n")
+        if lines[0].decode() != f"{self.HEADER_PREFIX}{self.snapshot_checksum:08x}":
+            self.reset(self.snapshot_checksum)
+            return
+        for line in lines[1:-1]:
+            barcode, delta = line.decode().split(",")
+            self.records.append((barcode, int(delta)))
+        complete = len(data) - len(lines[-1])
+        if complete < len(data):
+            # A crash in the middle of an append left a partial record behind
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(complete)
+
+    def replay(self) -> Iterator[tuple[str, int]]:
+        """Yield every (numeric_barcode, delta) record in the journal, oldest first."""
+
+        return iter(self.records)
+
+    def record_count(self) -> int:
+        """Get the number of records appended since the last snapshot.
+
+        Returns:
+            int: The number of records in the journal.
+        """
+        return len(self.records)
+
+    def append(self, deltas: dict[str, int], fsync: bool = False):
+        """Append the quantity deltas of one checkout in a single write.
+
+        Args:
+            deltas (dict[str, int]): The quantity change of each barcode.
+            fsync (bool, optional): Force the records to disk before returning. Defaults to False.
+        """
+        if not deltas:
+            return
+        with open(self.journal_path, "a") as f:
+            f.write("".join(f"{barcode},{delta}\n" for barcode, delta in deltas.items()))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        self.records.extend(deltas.items())
+
+    def reset(self, snapshot_checksum: int):
+        """Atomically replace the journal with an empty one for a new snapshot.
+
+        Args:
+            snapshot_checksum (int): The CRC-32 of the snapshot the new journal applies to.
+        """
+        temporary_path = self.journal_path + ".tmp"
+        with open(temporary_path, "w") as f:
+            f.write(f"{self.HEADER_PREFIX}{snapshot_checksum:08x}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, self.journal_path)
+        self.snapshot_checksum = snapshot_checksum
+        self.records = []
@@ -0,0 +1,218 @@
+import json
+import math
+import os
+import threading
+import time
+from array import array
+
+# Stages timed by POSSystem when given a LatencyRecorder
+SCAN_STAGES = ("scan.decode", "scan.check_digit", "scan.lookup", "scan.cart")
+CHECKOUT_STAGES = (
+    "checkout.total", "checkout.inventory", "checkout.points",
+    "checkout.save_inventory", "checkout.save_memberships", "checkout.ledger",
+    "checkout.sync",
+)
+
+
+class LatencyHistogram:
+    """Fixed-memory histogram of durations in nanoseconds.
+
+    Buckets are log-linear: exact below 32 ns, then 16 buckets per power of
+    two, so any percentile is reported within about 6% of the true value.
+    Durations of 2^40 ns (about 18 minutes) or more share the last bucket; the
+    maximum is kept exactly.
+    """
+
+    SUB_BUCKETS = 16
+    MAX_VALUE = (1 << 40) - 1
+    BUCKETS = (MAX_VALUE.bit_length() - 3) * SUB_BUCKETS
+
+    def __init__(self):
+        self.counts = array("q", bytes(8 * self.BUCKETS))
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _bucket(cls, value: int) -> int:
+        if value < 2 * cls.SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - 5
+        return shift * cls.SUB_BUCKETS + (value >> shift)
+
+    @classmethod
+    def _upper_bound(cls, bucket: int) -> int:
+        if bucket < 2 * cls.SUB_BUCKETS:
+            return bucket
+        shift = bucket // cls.SUB_BUCKETS - 1
+        return ((bucket - shift * cls.SUB_BUCKETS + 1) << shift) - 1
+
+    def record(self, nanoseconds: int):
+        """Add one duration.
+
+        Args:
+            nanoseconds (int): The duration in nanoseconds.
+        """
+        bucket = self._bucket(min(max(nanoseconds, 0), self.MAX_VALUE))
+        with self._lock:
+            self.counts[bucket] += 1
+            self.count += 1
+            self.total += nanoseconds
+            if nanoseconds > self.max:
+                self.max = nanoseconds
+
+    def percentile(self, fraction: float) -> int:
+        """Given a fraction (e.g. 0.99), return that percentile in nanoseconds.
+
+        Args:
+            fraction (float): The percentile as a fraction between 0 and 1.
+        Returns:
+            int: The upper bound of the bucket holding the percentile, capped
+            at the maximum (0 if nothing was recorded).
+        """
+        with self._lock:
+            return self._percentile(fraction)
+
+    def _percentile(self, fraction: float) -> int:
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(fraction * self.count))
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                if bucket == self.BUCKETS - 1:
+                    return self.max
+                return min(self._upper_bound(bucket), self.max)
+        return self.max
+
+    def get_summary(self) -> dict:
+        """Get the histogram summary.
+
+        Returns:
+            dict: count, and the p50, p99, max and mean durations in nanoseconds.
+        """
+        with self._lock:
+            return {
+                "count": self.count,
+                "p50_ns": self._percentile(0.5),
+                "p99_ns": self._percentile(0.99),
+                "max_ns": self.max,
+                "mean_ns": self.total // self.count if self.count else 0,
+            }
+
+
+class StageTimer:
+    """Times consecutive stages of one scan or checkout: each lap() records the
+    time since the previous lap (or since the timer was created)."""
+
+    __slots__ = ("recorder", "start")
+
+    def __init__(self, recorder: "LatencyRecorder"):
+        self.recorder = recorder
+        self.start = time.perf_counter_ns()
+
+    def lap(self, stage: str):
+        """Record the time since the last lap for a stage, and start the next one.
+
+        Args:
+            stage (str): The stage that just ended.
+        """
+        now = time.perf_counter_ns()
+        self.recorder.record(stage, now - self.start)
+        self.start = now
+
+
+class _NullStageTimer:
+    """A StageTimer that records nothing, for lanes without a LatencyRecorder."""
+
+    __slots__ = ()
+
+    def lap(self, stage: str):
+        pass
+
+
+NULL_STAGE_TIMER = _NullStageTimer()
+
+
+class LatencyRecorder:
+    """A LatencyHistogram per named stage, optionally dumped to a JSON file
+    every few seconds by a background thread.
+
+    Timing is opt-in: a POSSystem without a recorder times its stages with
+    NULL_STAGE_TIMER, whose laps do nothing. One recorder may be shared by
+    several lanes.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, stage: str, nanoseconds: int):
+        """Add one duration to a stage's histogram.
+
+        Args:
+            stage (str): The stage name.
+            nanoseconds (int): The duration in nanoseconds.
+        """
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, LatencyHistogram())
+        histogram.record(nanoseconds)
+
+    def timer(self) -> "StageTimer":
+        """Return a StageTimer recording into this recorder, started now."""
+        return StageTimer(self)
+
+    def get_summary(self) -> dict[str, dict]:
+        """Get the summary of every stage, see LatencyHistogram.get_summary.
+
+        Returns:
+            dict[str, dict]: The summaries keyed by stage name.
+        """
+        return {stage: histogram.get_summary() for stage, histogram in sorted(self.histograms.items())}
+
+    def dump(self, path: str):
+        """Atomically write the summary to a JSON file.
+
+        Args:
+            path (str): The file to write.
+        """
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "w") as f:
+            json.dump({"time": time.time(), "stages": self.get_summary()}, f, indent=2)
+        os.replace(temporary_path, path)
+
+    def start_dump(self, path: str, interval: float = 10.0):
+        """Dump the summary to path every interval seconds until stop_dump().
+
+        Args:
+            path (str): The file to write.
+            interval (float, optional): Seconds between dumps. Defaults to 10.
+
+        Raises:
+            RuntimeError: If a dump thread is already running.
+        """
+        if self._thread is not None:
+            raise RuntimeError("Latency dump is already running")
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                self.dump(path)
+            self.dump(path)
+
+        self._thread = threading.Thread(target=run, name="latency-dump", daemon=True)
+        self._thread.start()
+
+    def stop_dump(self):
+        """Stop the dump thread, after one last dump."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
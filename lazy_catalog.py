@@ -0,0 +1,242 @@
+import os
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+
+from product import Product
+from money import format_cents
+from locking import LockStripes
+from csv_ingest import parse_line, parse_product, format_row
+from columnar import _parse_barcode
+
+
+class LazyProductDatabase:
+    """Product database that indexes inventory.csv instead of loading it.
+
+    Startup only records each row's barcode and byte offset, in two sorted
+    arrays (16 bytes per row). A row is parsed the first time get_product asks
+    for it and kept in a bounded LRU of hot SKUs; products modified by
+    decrement_inventory are pinned in memory until the next save, so an
+    eviction never loses a change. save_inventory streams the catalog to
+    SAVE_PATH, rewriting only the modified rows, and then serves reads from
+    the saved file so pinned rows can be released.
+
+    Rows that cannot be parsed are not served; as in ProductDatabase they are
+    listed in malformed_rows as (line number, fields, reason) tuples. Rows whose
+    barcode is not 12 digits are found at startup, other malformed rows the
+    first time they are read.
+    """
+
+    SAVE_PATH = "db-data/updated_inventory.csv"
+
+    def __init__(self, inventory_path: str, cache_size: int = 10_000):
+        """
+        Args:
+            inventory_path (str): The inventory CSV.
+            cache_size (int, optional): Unmodified products kept in memory at most. Defaults to 10,000.
+        """
+        self.cache_size = cache_size
+        self.products = OrderedDict()
+        self.modified = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._locks = LockStripes()
+        # Guards the LRU order, the statistics and the shared file position
+        self._cache_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        # Rows found malformed when read, by line number; a save keeps every row on its line
+        self._unreadable = {}
+        self._open(inventory_path)
+
+    def _open(self, inventory_path: str):
+        """Index the barcodes and row offsets of an inventory CSV and read rows from it from now on."""
+        barcodes, offsets = array("q"), array("q")
+        malformed_rows, unreadable_offsets = [], set()
+        with open(inventory_path, "rb") as f:
+            offset, line_number = len(f.readline()), 1
+            for line in f:
+                line_number += 1
+                barcode = line.split(b",", 1)[0].strip().strip(b'"')
+                if barcode:
+                    try:
+                        # Keys are only unique for 12-digit barcodes ("012..." and "12..." would collide)
+                        key = _parse_barcode(barcode.decode("ascii", errors="replace"))
+                    except ValueError:
+                        row = parse_line(line.decode(errors="replace"))
+                        malformed_rows.append((line_number, row, f"Invalid barcode: {row[0]}"))
+                    else:
+                        barcodes.append(key)
+                        offsets.append(offset)
+                        if line_number in self._unreadable:
+                            unreadable_offsets.add(offset)
+                offset += len(line)
+        # Stable sort, so the last of several rows with one barcode wins, as in ProductDatabase
+        order = sorted(range(len(barcodes)), key=barcodes.__getitem__)
+        index_barcodes = array("q", [barcodes[i] for i in order])
+        index_offsets = array("q", [offsets[i] for i in order])
+        previous_file = getattr(self, "_file", None)
+        self.inventory_path = inventory_path
+        self._barcodes, self._offsets = index_barcodes, index_offsets
+        self._unreadable_offsets = unreadable_offsets
+        self.malformed_rows = sorted(malformed_rows + list(self._unreadable.values()), key=lambda row: row[0])
+        self._file = open(inventory_path, "rb")
+        if previous_file is not None:
+            previous_file.close()
+
+    def _offset_of(self, numeric_barcode: str) -> int:
+        """Given a barcode, return the byte offset of its last readable row (None
+        if not in the catalog)."""
+        if not numeric_barcode.isascii():
+            return None
+        try:
+            key = _parse_barcode(numeric_barcode)
+        except ValueError:
+            return None
+        position = bisect_right(self._barcodes, key) - 1
+        while position >= 0 and self._barcodes[position] == key:
+            if self._offsets[position] not in self._unreadable_offsets:
+                return self._offsets[position]
+            position -= 1
+        return None
+
+    def _read_row(self, offset: int) -> Product:
+        """Parse the row at an offset, recording it in malformed_rows if it
+        cannot be parsed (None then)."""
+        self._file.seek(offset)
+        line = self._file.readline()
+        try:
+            return parse_product(parse_line(line.decode()))[1]
+        except ValueError as error:
+            row = parse_line(line.decode(errors="replace"))
+            malformed_row = (self._line_number(offset), row, str(error))
+            self._unreadable[malformed_row[0]] = malformed_row
+            self._unreadable_offsets.add(offset)
+            self.malformed_rows.append(malformed_row)
+            return None
+
+    def _line_number(self, offset: int) -> int:
+        """Given the offset of a row, return its line number by counting the lines before it."""
+        self._file.seek(0)
+        line_number, remaining = 1, offset
+        while remaining > 0:
+            chunk = self._file.read(min(remaining, 1 << 20))
+            if not chunk:
+                break
+            line_number += chunk.count(b"\n")
+            remaining -= len(chunk)
+        return line_number
+
+    def get_product(self, numeric_barcode: str) -> Product:
+        """Given a barcode, return the Product object associated with that\
+        barcode, parsing its row on a cache miss.
+
+        Args:
+            numeric_barcode (str): 12 digit numeric barcode
+        Returns:
+            Product with barcode (None if not found)
+        """
+        with self._cache_lock:
+            return self._lookup(numeric_barcode)
+
+    def _lookup(self, numeric_barcode: str) -> Product:
+        """get_product, with the cache lock already held."""
+        product = self.modified.get(numeric_barcode)
+        if product is not None:
+            self.hits += 1
+            return product
+        product = self.products.get(numeric_barcode)
+        if product is not None:
+            self.products.move_to_end(numeric_barcode)
+            self.hits += 1
+            return product
+        product = None
+        while product is None:
+            offset = self._offset_of(numeric_barcode)
+            if offset is None:
+                return None
+            # A malformed row is skipped, falling back to an earlier row with the barcode
+            product = self._read_row(offset)
+        self.misses += 1
+        self.products[numeric_barcode] = product
+        self._evict()
+        return product
+
+    def _evict(self):
+        while len(self.products) > self.cache_size:
+            self.products.popitem(last=False)
+            self.evictions += 1
+
+    def decrement_inventory(self, numeric_barcode: str, quantity: int):
+        """Given a barcode and a quantity to decrease by, decrement the inventory
+        of the product and pin it in memory until the next save.
+
+        Args:
+            numeric_barcode (str): 12 digit numeric barcode
+            quantity (int): The quantity to decrease by.
+        """
+        with self._locks.lock_for(numeric_barcode):
+            with self._cache_lock:
+                product = self._lookup(numeric_barcode)
+                if product is None:
+                    return
+                # Pin before changing it, so the row is never evicted and re-read stale
+                self.modified[numeric_barcode] = product
+                self.products.pop(numeric_barcode, None)
+            product.decrease_quantity(quantity)
+
+    def save_inventory(self, fsync: bool = False):
+        """Stream the inventory to SAVE_PATH with the modified rows rewritten,
+        then read from SAVE_PATH and release the pinned products.
+
+        Args:
+            fsync (bool, optional): Force the write to disk before returning. Defaults to False.
+        """
+        with self._save_lock:
+            with self._locks.all(), self._cache_lock:
+                modified = dict(self.modified)
+                quantities = {barcode: product.get_quantity() for barcode, product in modified.items()}
+            temporary_path = self.SAVE_PATH + ".tmp"
+            with open(self.inventory_path, "rb") as source, open(temporary_path, "wb") as target:
+                target.write(source.readline())
+                for line in source:
+                    barcode = line.split(b",", 1)[0].strip().strip(b'"').decode()
+                    product = modified.get(barcode)
+                    if product is not None:
+                        line = format_row((barcode, product.get_name(), format_cents(product.get_price_cents()),
+                                           quantities[barcode])).encode()
+                    target.write(line)
+                target.flush()
+                if fsync:
+                    os.fsync(target.fileno())
+            os.replace(temporary_path, self.SAVE_PATH)
+            with self._locks.all(), self._cache_lock:
+                self._open(self.SAVE_PATH)
+                for barcode, product in modified.items():
+                    if product.get_quantity() == quantities[barcode]:
+                        # Saved and untouched since; back to an ordinary, evictable cache entry
+                        del self.modified[barcode]
+                        self.products[barcode] = product
+                self._evict()
+
+    def get_cache_stats(self) -> dict:
+        """Get the hot-SKU cache statistics.
+
+        Returns:
+            dict: hits, misses, evictions, cached (unmodified products in memory),
+            pinned (modified products awaiting a save) and catalog (rows indexed).
+        """
+        with self._cache_lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "cached": len(self.products),
+                "pinned": len(self.modified),
+                "catalog": len(self._barcodes),
+            }
+
+    def close(self):
+        """Close the inventory file."""
+        self._file.close()
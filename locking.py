@@ -0,0 +1,36 @@
+import threading
+from contextlib import contextmanager
+
+
+class LockStripes:
+    """A fixed pool of locks shared by keys hashed onto them.
+
+    Updates to different barcodes almost always take different locks, so lanes
+    sharing one database do not contend unless they touch the same SKU or
+    member (or happen to hash onto the same stripe).
+    """
+
+    def __init__(self, count: int = 64):
+        self._locks = [threading.Lock() for _ in range(count)]
+
+    def lock_for(self, key: str) -> threading.Lock:
+        """Given a key, return the lock guarding it.
+
+        Args:
+            key (str): The key, e.g. a numeric barcode.
+        Returns:
+            threading.Lock: The stripe lock for the key.
+        """
+        return self._locks[hash(key) % len(self._locks)]
+
+    @contextmanager
+    def all(self):
+        """Hold every stripe (acquired in a fixed order), for operations that
+        must not interleave with any keyed update."""
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(self._locks):
+                lock.release()
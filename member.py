@@ -1,13 +1,25 @@
+from money import to_cents, from_cents, to_basis_points
+
+
 class Member:
     """A member of the store."""
 
+    __slots__ = ("barcode", "name", "points_cents")
     points_multiplier = 1  # 1 point per dollar
     discount_rate = 0  # no discount
+    points_multiplier_basis_points = to_basis_points(points_multiplier)
+    discount_basis_points = to_basis_points(discount_rate)
 
     def __init__(self, numeric_barcode: str, name: str, points: float):
         self.barcode = numeric_barcode
         self.name = name
-        self.points = float(points)
+        # Points are fixed-point with two decimals, like money
+        self.points_cents = to_cents(points)
+
+    @property
+    def points(self) -> float:
+        """The member's points, derived from points_cents."""
+        return from_cents(self.points_cents)
 
     def add_points(self, points: float):
         """Add the specified number of points to the member.
@@ -15,7 +27,15 @@ class Member:
         Args:
             points (int): The number of points to add.
         """
-        self.points += points
+        self.points_cents += to_cents(points)
+
+    def add_points_cents(self, points_cents: int):
+        """Add the specified number of hundredths of a point to the member.
+
+        Args:
+            points_cents (int): The number of hundredths of a point to add.
+        """
+        self.points_cents += points_cents
 
     def get_name(self) -> str:
         """Get the name of the member.
@@ -31,7 +51,15 @@ class Member:
         Returns:
             int: The number of points the member has.
         """
-        return self.points
+        return from_cents(self.points_cents)
+
+    def get_points_cents(self) -> int:
+        """Get the number of hundredths of a point the member has.
+
+        Returns:
+            int: The number of hundredths of a point the member has.
+        """
+        return self.points_cents
 
     def get_barcode(self) -> str:
         """Get the barcode of the member.
@@ -49,6 +77,14 @@ class Member:
         """
         return self.points_multiplier
 
+    def get_points_multiplier_basis_points(self) -> int:
+        """Get the points multiplier for the member in basis points.
+
+        Returns:
+            int: The points multiplier for the member, e.g. 15000 for 1.5.
+        """
+        return self.points_multiplier_basis_points
+
     def get_discount_rate(self) -> float:
         """Get the discount rate for the member.
 
@@ -57,6 +93,14 @@ class Member:
         """
         return self.discount_rate
 
+    def get_discount_basis_points(self) -> int:
+        """Get the discount rate for the member in basis points.
+
+        Returns:
+            int: The discount rate for the member, e.g. 500 for 5%.
+        """
+        return self.discount_basis_points
+
     def return_membership_type(self) -> str:
         """Return the membership type of the member.
 
@@ -68,8 +112,11 @@ class Member:
 
 class SilverMember(Member):
     """A standard member of the store."""
+    __slots__ = ()
     points_multiplier = 1.1 
     discount_rate = 0.01
+    points_multiplier_basis_points = to_basis_points(points_multiplier)
+    discount_basis_points = to_basis_points(discount_rate)
 
     def return_membership_type(self) -> str:
         """Return the membership type of the member.
@@ -82,8 +129,11 @@ class SilverMember(Member):
 
 class GoldMember(Member):
     """A gold member of the store."""
+    __slots__ = ()
     points_multiplier = 1.5
     discount_rate = 0.05
+    points_multiplier_basis_points = to_basis_points(points_multiplier)
+    discount_basis_points = to_basis_points(discount_rate)
 
     def return_membership_type(self) -> str:
         """Return the membership type of the member.
@@ -96,8 +146,11 @@ class GoldMember(Member):
 
 class PlatinumMember(Member):
     """A platinum member of the store."""
+    __slots__ = ()
     points_multiplier = 2.0
     discount_rate = 0.10  
+    points_multiplier_basis_points = to_basis_points(points_multiplier)
+    discount_basis_points = to_basis_points(discount_rate)
 
     def return_membership_type(self) -> str:
         """Return the membership type of the member.
@@ -0,0 +1,162 @@
+import mmap
+import struct
+import sys
+import threading
+
+from product import Product
+from money import to_cents, format_cents
+from locking import LockStripes
+from csv_ingest import read_rows, writer
+
+
+class MmapProductDatabase:
+    """Product database backed by a fixed-width binary record file opened with mmap.
+
+    The file is a header (magic, record count) followed by one record per
+    product: barcode, UTF-8 name (NUL padded), price in cents and quantity.
+    Startup only reads the barcodes to build a barcode -> slot index; a
+    Product is materialized the first time it is looked up, and
+    decrement_inventory writes the new quantity straight into its record.
+    Use import_csv/export_csv to convert from/to the inventory.csv format.
+    """
+
+    MAGIC = b"POSINV01"
+    HEADER = struct.Struct("<8sQ")
+    RECORD = struct.Struct("<12s64sqq")
+    QUANTITY = struct.Struct("<q")
+    QUANTITY_OFFSET = 12 + 64 + 8
+
+    def __init__(self, store_path: str):
+        self.store_path = store_path
+        self._file = open(store_path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, count = self.HEADER.unpack_from(self._map, 0)
+        if magic != self.MAGIC:
+            raise ValueError("Not an inventory store")
+        self.slots = {}
+        for slot in range(count):
+            offset = self._record_offset(slot)
+            self.slots[self._map[offset:offset + 12].decode()] = slot
+        self.products = {}
+        self._dirty_pages = set()
+        # Guards _dirty_pages, which every lane adds to and a save swaps out
+        self._dirty_lock = threading.Lock()
+        self._locks = LockStripes()
+
+    def _record_offset(self, slot: int) -> int:
+        """Given a slot, return the byte offset of its record."""
+        return self.HEADER.size + slot * self.RECORD.size
+
+    def get_product(self, numeric_barcode: str) -> Product:
+        """Given a barcode, return the Product object associated with that\
+        barcode.
+
+        Args:
+            numeric_barcode (str): 12 digit numeric barcode
+        Returns:
+            Product with barcode (None if not found)
+        """
+        product = self.products.get(numeric_barcode)
+        if product is not None:
+            return product
+        slot = self.slots.get(numeric_barcode)
+        if slot is None:
+            return None
+        _, name, price_cents, quantity = self.RECORD.unpack_from(self._map, self._record_offset(slot))
+        product = Product(numeric_barcode, name.rstrip(b"\0").decode(), format_cents(price_cents), quantity)
+        # setdefault keeps a single Product per barcode when lanes race to materialize it
+        return self.products.setdefault(numeric_barcode, product)
+
+    def decrement_inventory(self, numeric_barcode: str, quantity: int):
+        """Given a barcode and a quantity to decrease by, decrement the inventory
+        of the product and update its record in place.
+
+        Args:
+            numeric_barcode (str): 12 digit numeric barcode
+            quantity (int): The quantity to decrease by.
+        """
+        product = self.get_product(numeric_barcode)
+        if product is None:
+            return
+        offset = self._record_offset(self.slots[numeric_barcode]) + self.QUANTITY_OFFSET
+        with self._locks.lock_for(numeric_barcode):
+            product.decrease_quantity(quantity)
+            self.QUANTITY.pack_into(self._map, offset, product.get_quantity())
+        with self._dirty_lock:
+            self._dirty_pages.add(offset // mmap.PAGESIZE)
+            self._dirty_pages.add((offset + self.QUANTITY.size - 1) // mmap.PAGESIZE)
+
+    def save_inventory(self, fsync: bool = False):
+        """Flush the pages touched since the last save to the store file. The
+        flush is synchronous, so the pages are durable either way.
+
+        Args:
+            fsync (bool, optional): Accepted for compatibility with ProductDatabase. Defaults to False.
+        """
+        # Pages dirtied while flushing go to the new set and are flushed by the next save
+        with self._dirty_lock:
+            pages, self._dirty_pages = self._dirty_pages, set()
+        for page in sorted(pages):
+            start = page * mmap.PAGESIZE
+            self._map.flush(start, min(mmap.PAGESIZE, len(self._map) - start))
+
+    def close(self):
+        """Flush pending changes and close the store file."""
+        self.save_inventory()
+        self._map.close()
+        self._file.close()
+
+
+def import_csv(csv_path: str, store_path: str):
+    """Convert an inventory CSV (numeric_barcode,name,price,quantity) into a binary store file.
+
+    Args:
+        csv_path (str): The inventory CSV to read.
+        store_path (str): The store file to write.
+
+    Raises:
+        ValueError: A barcode is not 12 characters, a name does not fit its field or a line is not valid UTF-8.
+    """
+    count = 0
+    with open(store_path, "wb") as store:
+        store.write(MmapProductDatabase.HEADER.pack(MmapProductDatabase.MAGIC, 0))
+        for line_number, row in read_rows(csv_path):
+            if len(row) != 4:
+                raise ValueError(f"Line {line_number}: expected 4 fields, got {len(row)}")
+            barcode, name, price, quantity = row
+            if len(barcode.encode()) != 12:
+                raise ValueError(f"Invalid barcode: {barcode}")
+            if len(name.encode()) > 64:
+                raise ValueError(f"Name too long: {name}")
+            store.write(MmapProductDatabase.RECORD.pack(barcode.encode(), name.encode(), to_cents(price), int(quantity)))
+            count += 1
+        store.seek(0)
+        store.write(MmapProductDatabase.HEADER.pack(MmapProductDatabase.MAGIC, count))
+
+
+def export_csv(store_path: str, csv_path: str):
+    """Convert a binary store file back into the inventory CSV format.
+
+    Args:
+        store_path (str): The store file to read.
+        csv_path (str): The inventory CSV to write.
+    """
+    with open(store_path, "rb") as store, open(csv_path, "w") as target:
+        magic, count = MmapProductDatabase.HEADER.unpack(store.read(MmapProductDatabase.HEADER.size))
+        if magic != MmapProductDatabase.MAGIC:
+            raise ValueError("Not an inventory store")
+        rows = writer(target)
+        rows.writerow(("numeric_barcode", "name", "price", "quantity"))
+        for _ in range(count):
+            barcode, name, price_cents, quantity = MmapProductDatabase.RECORD.unpack(store.read(MmapProductDatabase.RECORD.size))
+            rows.writerow((barcode.decode(), name.rstrip(b"\0").decode(), format_cents(price_cents), quantity))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("import", "export"):
+        sys.exit("usage: python mmap_store.py import <inventory.csv> <store.bin>\n"
+                 "       python mmap_store.py export <store.bin> <inventory.csv>")
+    if sys.argv[1] == "import":
+        import_csv(sys.argv[2], sys.argv[3])
+    else:
+        export_csv(sys.argv[2], sys.argv[3])
@@ -0,0 +1,127 @@
+"""Fixed-point money helpers.
+
+Amounts (prices, coupon values, member points) are plain ints counting cents,
+and rates (discounts, points multipliers) are plain ints counting basis points
+(1/100 of a percent). Keeping them as ints makes the pricing math exact and
+much cheaper than decimal.Decimal.
+"""
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+CENTS_PER_DOLLAR = 100
+BASIS_POINTS_PER_UNIT = 10000
+
+
+def _to_fixed(value, places: int) -> int:
+    """Given a number as a string, int or float, scale it by 10 ** places and
+    round half up to an int. Strings are parsed exactly; floats are parsed
+    through their shortest repr, so 2.675 is treated as the decimal 2.675.
+
+    Args:
+        value (str | int | float): The number to convert.
+        places (int): The number of decimal places to keep.
+    Raises:
+        ValueError: If the value is not a number.
+    Returns:
+        int: The fixed-point value.
+    """
+
+    if isinstance(value, int):
+        return value * 10 ** places
+    text = value.strip() if isinstance(value, str) else repr(float(value))
+    negative = text.startswith("-")
+    digits = text[1:] if text[:1] in "+-" else text
+    whole, _, fraction = digits.partition(".")
+    if not (whole + fraction).isascii() or not (whole + fraction).isdigit():
+        if "e" not in digits.lower():
+            raise ValueError(f"Invalid amount: {value!r}")
+        # Scientific notation (e.g. repr(0.00001)) is rare enough to hand to decimal
+        try:
+            scaled = Decimal(text).scaleb(places).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+        except InvalidOperation:
+            raise ValueError(f"Invalid amount: {value!r}")
+        return int(scaled)
+    fixed = int(whole or "0") * 10 ** places + int((fraction + "0" * places)[:places])
+    if len(fraction) > places and fraction[places] >= "5":
+        fixed += 1
+    return -fixed if negative else fixed
+
+
+def to_cents(amount) -> int:
+    """Given an amount in dollars (or points), return it in integer cents.
+
+    Args:
+        amount (str | int | float): The amount, e.g. "4.50", 4 or 4.5.
+    Returns:
+        int: The amount in cents, rounded half up.
+    """
+
+    return _to_fixed(amount, 2)
+
+
+def from_cents(cents: int) -> float:
+    """Given an amount in cents, return it in dollars (or points).
+
+    Args:
+        cents (int): The amount in cents.
+    Returns:
+        float: The amount in dollars.
+    """
+
+    return cents / CENTS_PER_DOLLAR
+
+
+def format_cents(cents: int) -> str:
+    """Given an amount in cents, format it with exactly two decimals.
+
+    Args:
+        cents (int): The amount in cents.
+    Returns:
+        str: The amount, e.g. "4.50".
+    """
+
+    sign = "-" if cents < 0 else ""
+    dollars, remainder = divmod(abs(cents), CENTS_PER_DOLLAR)
+    return f"{sign}{dollars}.{remainder:02d}"
+
+
+def to_basis_points(rate) -> int:
+    """Given a rate as a fraction (0.05 for 5%), return it in basis points.
+
+    Args:
+        rate (str | int | float): The rate.
+    Returns:
+        int: The rate in basis points, e.g. 500.
+    """
+
+    return _to_fixed(rate, 4)
+
+
+def percent_to_basis_points(percent) -> int:
+    """Given a rate in percent (15.5 for 15.5%), return it in basis points.
+
+    Args:
+        percent (str | int | float): The rate in percent.
+    Returns:
+        int: The rate in basis points, e.g. 1550.
+    """
+
+    return _to_fixed(percent, 2)
+
+
+def apply_rate(cents: int, basis_points: int) -> int:
+    """Given an amount in cents and a rate in basis points, return the
+    amount times the rate, rounded half up to the cent.
+
+    Args:
+        cents (int): The amount in cents.
+        basis_points (int): The rate in basis points.
+    Returns:
+        int: The scaled amount in cents.
+    """
+
+    product = cents * basis_points
+    quotient, remainder = divmod(abs(product), BASIS_POINTS_PER_UNIT)
+    if remainder * 2 >= BASIS_POINTS_PER_UNIT:
+        quotient += 1
+    return -quotient if product < 0 else quotient
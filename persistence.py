@@ -0,0 +1,108 @@
+import threading
+import time
+
+
+class GroupCommitter:
+    """Background flusher that merges every save requested within a time or
+    count window into a single flush.
+
+    Callers mutate the in-memory databases, then submit() a ticket. The flusher
+    thread waits up to max_delay seconds (or until max_batch tickets are
+    pending), calls flush once for all of them, and marks those tickets
+    durable. wait() blocks until a ticket is durable, for callers that only
+    acknowledge a checkout once it is on disk.
+    """
+
+    def __init__(self, flush, max_delay: float = 0.01, max_batch: int = 64):
+        """
+        Args:
+            flush: Callable writing (and fsyncing) everything pending.
+            max_delay (float, optional): Seconds to collect saves before flushing. Defaults to 0.01.
+            max_batch (int, optional): Flush early once this many saves are pending. Defaults to 64.
+        """
+        self._flush = flush
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.flush_count = 0
+        self._condition = threading.Condition()
+        self._requested = 0
+        self._durable = 0
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+        self._thread.start()
+
+    def submit(self) -> int:
+        """Request a flush of the changes made so far.
+
+        Returns:
+            int: A ticket to pass to wait().
+        Raises:
+            RuntimeError: The committer is closed, or an earlier flush failed
+                (the flusher has stopped, so nothing more would be written).
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Group committer is closed")
+            if self._error is not None:
+                raise RuntimeError("Group commit flush failed") from self._error
+            self._requested += 1
+            self._condition.notify_all()
+            return self._requested
+
+    def last_ticket(self) -> int:
+        """Get the most recently issued ticket.
+
+        Returns:
+            int: The latest ticket (0 if none).
+        """
+        with self._condition:
+            return self._requested
+
+    def wait(self, ticket: int, timeout: float = None):
+        """Block until the flush covering the ticket has completed.
+
+        Args:
+            ticket (int): A ticket returned by submit().
+            timeout (float, optional): Seconds to wait at most. Defaults to None.
+        Raises:
+            TimeoutError: The flush did not complete in time.
+            RuntimeError: The flush failed.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._durable >= ticket or self._error, timeout):
+                raise TimeoutError("Flush did not complete in time")
+            if self._error is not None:
+                raise RuntimeError("Group commit flush failed") from self._error
+
+    def close(self):
+        """Flush whatever is pending and stop the flusher thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._requested > self._durable or self._closed)
+                if self._requested == self._durable:
+                    return
+                deadline = time.monotonic() + self.max_delay
+                while self._requested - self._durable < self.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                target = self._requested
+            try:
+                self._flush()
+            except Exception as error:
+                with self._condition:
+                    self._error = error
+                    self._condition.notify_all()
+                return
+            with self._condition:
+                self._durable = target
+                self.flush_count += 1
+                self._condition.notify_all()
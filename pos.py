@@ -1,69 +1,203 @@
+import threading
+
 from store_backend import StoreBackend
+from scan_feed import iter_scans, follow_scans
 from barcode import BarcodeProcessor
 from cart import ShoppingCart
+from decode_cache import DecodeCache
+from latency import LatencyRecorder, NULL_STAGE_TIMER
+from sales_ledger import SalesLedger, Sale
+from scan_telemetry import (
+    ScanTelemetry, DECODE_REASONS, CHECK_DIGIT, UNKNOWN_PREFIX, UNKNOWN_PRODUCT, OUT_OF_STOCK, INVALID_COUPON,
+    UNKNOWN_MEMBER,
+)
+from money import from_cents, apply_rate
 
 
 class POSSystem:
     def __init__(
         self,
-        inventory_path: str,
-        membership_path: str,
-        coupon_path: str,
+        inventory_path: str = None,
+        membership_path: str = None,
+        coupon_path: str = None,
+        store_backend: StoreBackend = None,
+        snapshot_dir: str = None,
+        clock=None,
+        coupon_stacking: str = "all",
+        max_coupons: int = None,
+        decode_cache: DecodeCache = None,
+        lane: str = "lane-0",
+        telemetry: ScanTelemetry = None,
+        latency: LatencyRecorder = None,
+        ledger: SalesLedger = None,
     ):
+        """Set up a lane.
 
-        self.store_backend = StoreBackend(inventory_path, membership_path, coupon_path)
+        Args:
+            inventory_path (str, optional): The inventory CSV.
+            membership_path (str, optional): The membership CSV.
+            coupon_path (str, optional): The coupon CSV.
+            store_backend (StoreBackend, optional): A backend shared with other
+                lanes (threads) instead of loading the CSVs. Defaults to None.
+            snapshot_dir (str, optional): Directory of cached binary snapshots
+                of the CSVs, for fast restarts (see StoreBackend). Defaults to None.
+            clock (optional): Callable returning the current datetime; each cart
+                reads it once per transaction. Defaults to datetime.now.
+            coupon_stacking (str, optional): Coupon stacking rule, see CouponEngine. Defaults to "all".
+            max_coupons (int, optional): Most coupons applied per cart. Defaults to None (no limit).
+            decode_cache (DecodeCache, optional): Cache of decoded scans, which
+                may be shared with other lanes. Defaults to None (decode every scan).
+            lane (str, optional): The lane's name in the telemetry. Defaults to "lane-0".
+            telemetry (ScanTelemetry, optional): Where rejected scans are
+                counted, which may be shared with other lanes. Defaults to a
+                new ScanTelemetry for this lane.
+            latency (LatencyRecorder, optional): Record the time spent in each
+                stage of process_scan and checkout, which may be shared with
+                other lanes. Defaults to None (no timing).
+            ledger (SalesLedger, optional): Record every checkout in this sales
+                ledger, which may be shared with other lanes. It is attached to
+                the store backend, so each sale is saved with the checkout's
+                inventory and points. Defaults to None.
+        """
+
+        if store_backend is None:
+            store_backend = StoreBackend(inventory_path, membership_path, coupon_path, snapshot_dir=snapshot_dir, clock=clock)
+        self.store_backend = store_backend
         self.barcode_processor = BarcodeProcessor()
-        self.shopping_cart = ShoppingCart()
-
-    def process_barcodes(self, barcode_file_path: str) -> None:
-        """For each line in the barcode file (length 95 strings), we:
-        1. Validate the barcode
-        2. If it doesn't work, flip the barcode and try again
-        3.1 If it doesn't work, just skip the barcode
-        3.2 If it does work, convert the barcode to 12 digits (and continue to step 4)
+        self.clock = clock
+        self.coupon_stacking = coupon_stacking
+        self.max_coupons = max_coupons
+        self.decode_cache = decode_cache
+        self.lane = lane
+        self.telemetry = telemetry or ScanTelemetry()
+        self.latency = latency
+        self.ledger = ledger
+        if ledger is not None:
+            store_backend.attach_ledger(ledger)
+        self.shopping_cart = ShoppingCart(clock, coupon_stacking, max_coupons)
+
+    def process_barcodes(
+        self,
+        barcodes,
+        follow: bool = False,
+        poll_interval: float = 0.1,
+        stop_event: threading.Event = None,
+    ) -> None:
+        """Lazily process every scan from the source, one at a time, so the cart
+        is updated as soon as each line arrives (see process_scan).
+
+        Args:
+            barcodes: A path to a barcode file (length 95 strings, one per line),
+                an open file-like object, or any iterable of lines.
+            follow (bool, optional): Keep tailing the barcode file as the scanner
+                appends to it. Requires a path. Defaults to False.
+            poll_interval (float, optional): Seconds between polls in follow mode.
+                Defaults to 0.1.
+            stop_event (threading.Event, optional): In follow mode, stop once the
+                file is drained after this is set. Defaults to None.
+        """
+
+        if follow:
+            scans = follow_scans(barcodes, poll_interval, stop_event)
+        else:
+            scans = iter_scans(barcodes)
+        for barcode in scans:
+            self.process_scan(barcode)
+
+    def process_scan(self, barcode: str) -> None:
+        """For a single scan (length 95 string), we:
+        1. Decode the barcode in whichever orientation it was scanned
+        2. If it doesn't decode, just skip the barcode
+        3. If the check digit fails, just skip the barcode
         4. Identify the type of the barcode (item, coupon, or membership)
         5. Process the barcode based on its type (update the shopping cart instance
+        Steps 1-4 are skipped for scans found in the decode cache. Every skipped
+        scan is recorded in the telemetry with the reason it was rejected.
+        """
+
+        timer = NULL_STAGE_TIMER if self.latency is None else self.latency.timer()
+        # Wrong-length scans are rejected at once; caching them would only crowd out real scans
+        if self.decode_cache is not None and len(barcode) == BarcodeProcessor.BARCODE_LENGTH:
+            # With a decode cache, scan.decode covers the whole cache lookup
+            digit_barcode, type_of_barcode, reason = self.decode_cache.lookup(barcode, self._decode_scan)
+            timer.lap("scan.decode")
+        else:
+            digit_barcode, status = self.barcode_processor.decode(barcode)
+            timer.lap("scan.decode")
+            if status == BarcodeProcessor.DECODE_OK:
+                digit_barcode, type_of_barcode, reason = self._classify(digit_barcode)
+                timer.lap("scan.check_digit")
+            else:
+                digit_barcode, type_of_barcode, reason = None, None, DECODE_REASONS[status]
+        if type_of_barcode is not None:
+            record, reason = self._lookup_barcode(digit_barcode, type_of_barcode)
+            timer.lap("scan.lookup")
+            if record is not None:
+                reason = self._add_to_cart(digit_barcode, type_of_barcode, record)
+                timer.lap("scan.cart")
+        if reason is not None:
+            self.telemetry.record(self.lane, reason, barcode)
+
+    def _decode_scan(self, barcode: str) -> tuple[str, str, str]:
+        """Given a single scan, run steps 1-4 of process_scan.
+
+        Args:
+            barcode (str): The scan (length 95 string).
+        Returns:
+            tuple[str, str, str]: The 12 digits, the type of the barcode and
+            None; or None, None and the rejection reason (see scan_telemetry).
         """
 
-        with open(barcode_file_path, 'r') as f:
-            barcodes = [line.strip() for line in f if line.strip()]
-            for barcode in barcodes:
-                try:
-                    if self.barcode_processor.validate_barcode(barcode):
-                        digit_barcode = self.barcode_processor.convert_to_12_digits(barcode)
-                    else:
-                        raise ValueError
-                except ValueError:
-                    inverted_barcode = self.barcode_processor.invert_barcode(barcode)
-                    try:
-                        if self.barcode_processor.validate_barcode(inverted_barcode):
-                            digit_barcode = self.barcode_processor.convert_to_12_digits(inverted_barcode)
-                        else:
-                            continue
-                    except ValueError:
-                        continue
-                try:
-                    self.barcode_processor.modulo_check(digit_barcode)
-                except ValueError:
-                        continue
-                try:
-                    type_of_barcode = self._identify_barcode_type(digit_barcode)
-                except ValueError:
-                        continue
-                if type_of_barcode == "product":
-                    product = self.store_backend.get_product(digit_barcode)
-                    if product and product.is_in_stock() :
-                        num_in_cart = sum([1 for p in self.shopping_cart.get_items() if p.get_barcode()])
-                        if num_in_cart < product.get_quantity():
-                            self.shopping_cart.add_item(product)
-                elif type_of_barcode == "coupon":
-                    coupon = self.store_backend.get_coupon(digit_barcode)
-                    if coupon:
-                        self.shopping_cart.add_coupon(coupon)
-                elif type_of_barcode == "membership":
-                    membership = self.store_backend.get_member(digit_barcode)
-                    if membership:
-                        self.shopping_cart.add_membership(membership)
+        digit_barcode, status = self.barcode_processor.decode(barcode)
+        if status != BarcodeProcessor.DECODE_OK:
+            return None, None, DECODE_REASONS[status]
+        return self._classify(digit_barcode)
+
+    def _classify(self, digit_barcode: str) -> tuple[str, str, str]:
+        """Steps 3-4 of process_scan on the decoded digits; returns as _decode_scan."""
+
+        if not self.barcode_processor.is_valid_check_digit(digit_barcode):
+            return None, None, CHECK_DIGIT
+        try:
+            type_of_barcode = self._identify_barcode_type(digit_barcode)
+        except ValueError:
+            return None, None, UNKNOWN_PREFIX
+        if type_of_barcode is None:
+            return None, None, UNKNOWN_PREFIX
+        return digit_barcode, type_of_barcode, None
+
+    def _lookup_barcode(self, digit_barcode: str, type_of_barcode: str) -> tuple[object, str]:
+        """Given a classified barcode, look up its product, coupon or member.
+
+        Returns:
+            tuple[object, str]: The record and None, or None and the rejection reason.
+        """
+
+        if type_of_barcode == "product":
+            product = self.store_backend.get_product(digit_barcode)
+            return (product, None) if product else (None, UNKNOWN_PRODUCT)
+        if type_of_barcode == "coupon":
+            coupon = self.store_backend.get_coupon(digit_barcode, self.shopping_cart.get_transaction_time())
+            return (coupon, None) if coupon else (None, INVALID_COUPON)
+        membership = self.store_backend.get_member(digit_barcode)
+        return (membership, None) if membership else (None, UNKNOWN_MEMBER)
+
+    def _add_to_cart(self, digit_barcode: str, type_of_barcode: str, record) -> str:
+        """Given a looked up record, add it to the cart.
+
+        Returns:
+            str: None, or the rejection reason.
+        """
+
+        if type_of_barcode == "product":
+            if not (record.is_in_stock() and self.shopping_cart.get_quantity(digit_barcode) < record.get_quantity()):
+                return OUT_OF_STOCK
+            self.shopping_cart.add_item(record)
+        elif type_of_barcode == "coupon":
+            self.shopping_cart.add_coupon(record)
+        else:
+            self.shopping_cart.add_membership(record)
+        return None
 
     def _identify_barcode_type(self, numeric_barcode: str) -> str:
         """Given a barcode (length 12 string), identify the type of the barcode.
@@ -97,20 +231,43 @@ class POSSystem:
             float: The total price of the cart.
         """
 
-        total_cost = self.shopping_cart.calculate_total()
-        for product in self.shopping_cart.get_items():
-            self.store_backend.decrease_product_quantity(product, 1)
-        membership = self.shopping_cart.get_membership()
-        if membership:
-            points_add = float(total_cost * membership.get_points_multiplier())
-            self.store_backend.add_member_points(membership, points_add)
-        self.store_backend.save_inventory()
-        self.store_backend.save_memberships()
-        return total_cost
+        timer = NULL_STAGE_TIMER if self.latency is None else self.latency.timer()
+        total_cents = self.shopping_cart.calculate_total_cents()
+        timer.lap("checkout.total")
+        # sync() waits for the group-commit flusher, so it stays outside the transaction
+        with self.store_backend.transaction():
+            for line_item in self.shopping_cart.get_line_items():
+                self.store_backend.decrease_product_quantity(line_item.get_product(), line_item.get_quantity())
+            timer.lap("checkout.inventory")
+            membership = self.shopping_cart.get_membership()
+            if membership:
+                points_cents = apply_rate(total_cents, membership.get_points_multiplier_basis_points())
+                self.store_backend.add_member_points_cents(membership, points_cents)
+            timer.lap("checkout.points")
+            self.store_backend.save_inventory()
+            timer.lap("checkout.save_inventory")
+            self.store_backend.save_memberships()
+            timer.lap("checkout.save_memberships")
+        if self.ledger is not None:
+            self.ledger.append(Sale.from_cart(self.shopping_cart, self.lane))
+            self.store_backend.save_sales()
+            timer.lap("checkout.ledger")
+        self.store_backend.sync()
+        timer.lap("checkout.sync")
+        return from_cents(total_cents)
 
     def get_current_cart(self) -> ShoppingCart:
         return self.shopping_cart
 
+    def start_new_cart(self) -> ShoppingCart:
+        """Replace the current cart with an empty one, e.g. after a checkout.
+
+        Returns:
+            ShoppingCart: The new cart.
+        """
+        self.shopping_cart = ShoppingCart(self.clock, self.coupon_stacking, self.max_coupons)
+        return self.shopping_cart
+
 
 
 def pos_doctests(self):
@@ -122,10 +279,12 @@ def pos_doctests(self):
     It's recommended that you add additional doctests
     or test using by creating scripts like main.py
 
+    >>> from datetime import datetime
     >>> pos = POSSystem(
     ...     'db-data/inventory.csv',
     ...     'db-data/memberships.csv',
-    ...     'db-data/coupons.csv'
+    ...     'db-data/coupons.csv',
+    ...     clock=lambda: datetime(2026, 1, 1)
     ... )
     >>> pos.process_barcodes('cart-data/scan_1_binary.txt')
     >>> cart = pos.get_current_cart()
@@ -139,8 +298,7 @@ def pos_doctests(self):
     True
     >>> cart.get_membership().return_membership_type() == 'Gold'
     True
-    >>> import math
-    >>> math.isclose(pos.checkout(), 0.415, abs_tol=0.001)
+    >>> pos.checkout() == 0.41
     True
     >>> updated_memerships_exists = False
     >>> try:
@@ -1,13 +1,24 @@
+from money import to_cents, from_cents
+
+
 class Product:
+    __slots__ = ("numeric_barcode", "name", "price_cents", "quantity")
+
     def __init__(
         self, numeric_barcode: str, name: str, price: float, quantity: int
     ):
 
         self.numeric_barcode = numeric_barcode
         self.name = name
-        self.price = price
+        # Prices are kept in integer cents; strings such as "4.50" are parsed exactly
+        self.price_cents = to_cents(price)
         self.quantity = quantity
 
+    @property
+    def price(self) -> float:
+        """The price of the product in dollars, derived from price_cents."""
+        return from_cents(self.price_cents)
+
     def decrease_quantity(self, quantity: int):
         """Decrease the quantity of the product by the specified quantity.
 
@@ -49,7 +60,15 @@ class Product:
         Returns:
             float: The price of the product.
         """
-        return self.price
+        return from_cents(self.price_cents)
+
+    def get_price_cents(self) -> int:
+        """Get the price of the product in cents.
+
+        Returns:
+            int: The price of the product in cents.
+        """
+        return self.price_cents
 
     def get_quantity(self) -> int:
         """Get the quantity of the product.
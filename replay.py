@@ -0,0 +1,140 @@
+import argparse
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from pos import POSSystem
+from store_backend import StoreBackend
+from decode_cache import DecodeCache
+from database import ProductDatabase, MemberDatabase
+from money import apply_rate, format_cents
+
+# Read-only snapshot of the databases and a decode cache, set up once per worker process
+_store_backend = None
+_decode_cache = None
+
+
+def _load_snapshot(inventory_path: str, membership_path: str, coupon_path: str, earliest: datetime):
+    global _store_backend, _decode_cache
+    # Coupons are only evicted once expired for every archived cart, not by the wall clock
+    _store_backend = StoreBackend(inventory_path, membership_path, coupon_path, clock=lambda: earliest)
+    _decode_cache = DecodeCache()
+
+
+def _price_scan_file(scan_path: str, transaction_time: datetime) -> tuple[dict, dict, int]:
+    """Given an archived scan file (one cart), price it against the snapshot
+    without mutating it.
+
+    Args:
+        scan_path (str): The binary scan file.
+        transaction_time (datetime): When the cart was checked out; coupons are checked against it.
+    Returns:
+        tuple[dict, dict, int]: The inventory deltas by product barcode, the
+        points deltas (hundredths of a point) by member barcode, and the total in cents.
+    """
+    pos = POSSystem(store_backend=_store_backend, decode_cache=_decode_cache, clock=lambda: transaction_time)
+    pos.process_barcodes(scan_path)
+    cart = pos.get_current_cart()
+    total_cents = cart.calculate_total_cents()
+    inventory_deltas = {barcode: -line_item.get_quantity() for barcode, line_item in cart.line_items.items()}
+    points_deltas = {}
+    membership = cart.get_membership()
+    if membership:
+        points_deltas[membership.get_barcode()] = apply_rate(total_cents, membership.get_points_multiplier_basis_points())
+    return inventory_deltas, points_deltas, total_cents
+
+
+def _price_scan_files(carts: list[tuple[str, datetime]]) -> tuple[dict, dict, int, int]:
+    """Price a batch of (scan file, transaction time) pairs and merge their
+    deltas, so each task sends back one small result."""
+    inventory_deltas, points_deltas, total_cents = {}, {}, 0
+    for scan_path, transaction_time in carts:
+        cart_inventory, cart_points, cart_total = _price_scan_file(scan_path, transaction_time)
+        _merge(inventory_deltas, cart_inventory)
+        _merge(points_deltas, cart_points)
+        total_cents += cart_total
+    return inventory_deltas, points_deltas, total_cents, len(carts)
+
+
+def _merge(target: dict, deltas: dict):
+    for barcode, delta in deltas.items():
+        target[barcode] = target.get(barcode, 0) + delta
+
+
+def replay_scan_files(
+    scan_paths: list[str],
+    inventory_path: str,
+    membership_path: str,
+    coupon_path: str,
+    processes: int = None,
+    batch_size: int = None,
+    now: datetime = None,
+) -> dict:
+    """Re-price archived scan files in parallel and reconcile the databases.
+
+    Each worker process loads a read-only snapshot of the three databases and
+    prices its share of the files; the per-worker inventory and points deltas
+    are merged and applied once to a fresh copy of the snapshot, which is then
+    saved to ProductDatabase.SAVE_PATH and MemberDatabase.SAVE_PATH.
+
+    Args:
+        scan_paths (list[str]): The scan files, one cart each.
+        inventory_path (str): The inventory CSV.
+        membership_path (str): The membership CSV.
+        coupon_path (str): The coupon CSV.
+        processes (int, optional): Worker processes. Defaults to one per core.
+        batch_size (int, optional): Scan files per task. Defaults to about four tasks per worker.
+        now (datetime, optional): The transaction time of every cart, which
+            coupons are checked against. Defaults to each scan file's
+            modification time, i.e. when it was archived.
+    Returns:
+        dict: The number of carts, the total in cents, and the merged
+        inventory and points deltas.
+    """
+    if batch_size is None:
+        batch_size = max(1, -(-len(scan_paths) // ((processes or os.cpu_count() or 1) * 4)))
+    transaction_times = [now or datetime.fromtimestamp(os.path.getmtime(scan_path)) for scan_path in scan_paths]
+    archived = list(zip(scan_paths, transaction_times))
+    batches = [archived[i:i + batch_size] for i in range(0, len(archived), batch_size)]
+    inventory_deltas, points_deltas, total_cents, carts = {}, {}, 0, 0
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_load_snapshot,
+        initargs=(inventory_path, membership_path, coupon_path, min(transaction_times, default=now)),
+    ) as executor:
+        for batch_inventory, batch_points, batch_total, batch_carts in executor.map(_price_scan_files, batches):
+            _merge(inventory_deltas, batch_inventory)
+            _merge(points_deltas, batch_points)
+            total_cents += batch_total
+            carts += batch_carts
+
+    product_database = ProductDatabase(inventory_path)
+    for barcode, delta in inventory_deltas.items():
+        product_database.decrement_inventory(barcode, -delta)
+    product_database.save_inventory()
+    member_database = MemberDatabase(membership_path)
+    for barcode, delta in points_deltas.items():
+        member_database.add_points_cents(barcode, delta)
+    member_database.save_memberships()
+    return {
+        "carts": carts,
+        "total_cents": total_cents,
+        "inventory_deltas": inventory_deltas,
+        "points_deltas": points_deltas,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-price archived scan files and reconcile inventory and points.")
+    parser.add_argument("scan_files", nargs="+", help="Scan files or glob patterns, e.g. 'cart-data/scan_*_binary.txt'")
+    parser.add_argument("--inventory", default="db-data/inventory.csv")
+    parser.add_argument("--memberships", default="db-data/memberships.csv")
+    parser.add_argument("--coupons", default="db-data/coupons.csv")
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--now", type=datetime.fromisoformat,
+                        help="Transaction time of every cart, e.g. 2026-01-01T12:00 (default: each file's modification time)")
+    args = parser.parse_args()
+    scan_paths = sorted(path for pattern in args.scan_files for path in (glob.glob(pattern) or [pattern]))
+    result = replay_scan_files(scan_paths, args.inventory, args.memberships, args.coupons, args.processes, now=args.now)
+    print(f"Replayed {result['carts']} carts, total {format_cents(result['total_cents'])}")
@@ -0,0 +1,391 @@
+import argparse
+import glob
+import json
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from money import format_cents
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+NO_MEMBER = -1
+
+# magic, payload length, CRC-32 of the payload, first and last sale time (microseconds since EPOCH),
+# and the number of the pending log whose sales the block holds
+BLOCK_HEADER = struct.Struct("<4sIIqqq")
+BLOCK_MAGIC = b"SLB2"
+PENDING_LOG = "pending.log"
+LOG_MAGIC = "SALES-LOG"
+# sales, item rows and coupon rows in the block
+COUNTS = struct.Struct("<III")
+SALE_COLUMNS = ("timestamps", "subtotals", "totals", "membership_discounts", "members", "item_counts", "coupon_counts")
+ITEM_COLUMNS = ("item_barcodes", "item_quantities", "item_prices")
+COUPON_COLUMNS = ("coupon_barcodes", "coupon_discounts")
+
+
+class Sale:
+    """One checkout, as recorded in the sales ledger. All amounts are in cents."""
+
+    __slots__ = ("timestamp", "lane", "member", "items", "coupons", "membership_discount_cents", "subtotal_cents",
+                 "total_cents")
+
+    def __init__(
+        self,
+        timestamp: datetime,
+        lane: str,
+        member: str,
+        items: list[tuple[str, int, int]],
+        coupons: list[tuple[str, int]],
+        membership_discount_cents: int,
+        subtotal_cents: int,
+        total_cents: int,
+    ):
+        """
+        Args:
+            timestamp (datetime): The transaction time.
+            lane (str): The lane that checked out.
+            member (str): The member's barcode (None without a membership).
+            items (list[tuple[str, int, int]]): (barcode, quantity, unit price) per product.
+            coupons (list[tuple[str, int]]): (barcode, discount) per coupon scanned.
+            membership_discount_cents (int): The membership discount.
+            subtotal_cents (int): The subtotal before discounts.
+            total_cents (int): The total paid.
+        """
+        self.timestamp = timestamp
+        self.lane = lane
+        self.member = member
+        self.items = items
+        self.coupons = coupons
+        self.membership_discount_cents = membership_discount_cents
+        self.subtotal_cents = subtotal_cents
+        self.total_cents = total_cents
+
+    @classmethod
+    def from_cart(cls, cart, lane: str) -> "Sale":
+        """Given a cart being checked out, return its Sale.
+
+        Args:
+            cart (ShoppingCart): The cart.
+            lane (str): The lane that checked out.
+        Returns:
+            Sale: The sale.
+        """
+        discounts = dict(cart.get_discount_breakdown())
+        membership = cart.get_membership()
+        return cls(
+            cart.get_transaction_time(),
+            lane,
+            membership.get_barcode() if membership else None,
+            [(line_item.get_product().get_barcode(), line_item.get_quantity(), line_item.get_product().get_price_cents())
+             for line_item in cart.get_line_items()],
+            [(coupon.numeric_barcode, discounts.get(coupon.numeric_barcode, 0)) for coupon in cart.get_coupons()],
+            discounts.get("membership", 0),
+            cart.calculate_subtotal_cents(),
+            cart.calculate_total_cents(),
+        )
+
+
+def _columns() -> dict[str, array]:
+    return {name: array("q") for name in SALE_COLUMNS + ITEM_COLUMNS + COUPON_COLUMNS}
+
+
+def _column_bytes(column: array) -> bytes:
+    if sys.byteorder == "big":
+        column = array("q", column)
+        column.byteswap()
+    return column.tobytes()
+
+
+class SalesLedger:
+    """Append-only ledger of every checkout, stored as columnar segment files.
+
+    Sales are buffered in memory as columns (one array per field, with the
+    items and coupons of all sales flattened into their own columns) and
+    written as one compressed block per block_sales sales. Blocks are appended
+    to the current segment file (sales-<n>.ledger) until it passes
+    segment_bytes, then a new segment is started. Each SalesLedger starts a new
+    segment, so written segments are never modified, even after a crash left
+    one torn.
+
+    Until its block is written, each sale is also appended as one JSON line to
+    a row-oriented pending log (pending.log), which flush() makes durable
+    cheaply; a POSSystem has its store backend flush the ledger with every
+    checkout's save (see StoreBackend.attach_ledger). Each pending log is
+    numbered, and the number is stored in the header of the block its sales
+    end up in, so a SalesLedger opened after a crash writes the sales of a
+    pending log that never made it into a block, and only those. A directory
+    holds one SalesLedger at a time.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 64 << 20, block_sales: int = 256):
+        """
+        Args:
+            directory (str): The directory holding the segments (created if missing).
+            segment_bytes (int, optional): Start a new segment once the current
+                one is this large. Defaults to 64 MiB.
+            block_sales (int, optional): Sales per block. Defaults to 256.
+
+        Raises:
+            ValueError: If segment_bytes or block_sales is not positive.
+        """
+        if segment_bytes < 1 or block_sales < 1:
+            raise ValueError("segment_bytes and block_sales must be at least 1")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.block_sales = block_sales
+        self._lock = threading.Lock()
+        self._columns = _columns()
+        self._lanes = []
+        segments = segment_paths(directory)
+        self._segment = int(os.path.basename(segments[-1])[len("sales-"):-len(".ledger")]) + 1 if segments else 1
+        self._log_path = os.path.join(directory, PENDING_LOG)
+        self._log_number = _last_log_number(segments) + 1
+        log_number, sales = _read_log(self._log_path)
+        if sales and log_number >= self._log_number:
+            # Left by a crash before its block was written
+            self._log_number = log_number
+            for sale in sales:
+                self._buffer(sale)
+            self._write_block()
+        self._log = open(self._log_path, "w")
+        self._start_log()
+
+    def append(self, sale: Sale):
+        """Record a sale: it is logged at once (durable after the next flush())
+        and written with the next full block.
+
+        Args:
+            sale (Sale): The sale.
+        """
+        line = json.dumps(_sale_row(sale)) + "\n"
+        with self._lock:
+            self._log.write(line)
+            self._buffer(sale)
+            if len(self._lanes) >= self.block_sales:
+                self._write_block()
+                self._start_log()
+
+    def flush(self, fsync: bool = False):
+        """Write the logged sales to the pending log.
+
+        Args:
+            fsync (bool, optional): Force the log to disk before returning. Defaults to False.
+        """
+        with self._lock:
+            self._log.flush()
+            if fsync:
+                os.fsync(self._log.fileno())
+
+    def close(self):
+        """Write the buffered sales as a (possibly short) block and close the pending log."""
+        with self._lock:
+            if self._lanes:
+                self._write_block()
+                self._start_log()
+            self._log.close()
+
+    def segment_path(self, segment: int) -> str:
+        """Given a segment number, return its file."""
+        return os.path.join(self.directory, f"sales-{segment:06d}.ledger")
+
+    def _buffer(self, sale: Sale):
+        """Add a sale to the columns of the next block, with the lock held."""
+        columns = self._columns
+        columns["timestamps"].append((sale.timestamp - EPOCH) // MICROSECOND)
+        columns["subtotals"].append(sale.subtotal_cents)
+        columns["totals"].append(sale.total_cents)
+        columns["membership_discounts"].append(sale.membership_discount_cents)
+        columns["members"].append(NO_MEMBER if sale.member is None else int(sale.member))
+        columns["item_counts"].append(len(sale.items))
+        columns["coupon_counts"].append(len(sale.coupons))
+        for barcode, quantity, price_cents in sale.items:
+            columns["item_barcodes"].append(int(barcode))
+            columns["item_quantities"].append(quantity)
+            columns["item_prices"].append(price_cents)
+        for barcode, discount_cents in sale.coupons:
+            columns["coupon_barcodes"].append(int(barcode))
+            columns["coupon_discounts"].append(discount_cents)
+        self._lanes.append(sale.lane)
+
+    def _write_block(self):
+        """Write the buffer as one block and force it to disk, with the lock
+        held; the pending log may only be discarded once the block is durable."""
+        columns, lanes = self._columns, self._lanes
+        body = [COUNTS.pack(len(lanes), len(columns["item_barcodes"]), len(columns["coupon_barcodes"]))]
+        body.extend(_column_bytes(columns[name]) for name in SALE_COLUMNS + ITEM_COLUMNS + COUPON_COLUMNS)
+        body.append("\n".join(lanes).encode())
+        payload = zlib.compress(b"".join(body), 1)
+        timestamps = columns["timestamps"]
+        header = BLOCK_HEADER.pack(BLOCK_MAGIC, len(payload), zlib.crc32(payload), min(timestamps), max(timestamps),
+                                   self._log_number)
+
+        path = self.segment_path(self._segment)
+        with open(path, "ab") as f:
+            f.write(header + payload)
+            f.flush()
+            os.fsync(f.fileno())
+            if f.tell() >= self.segment_bytes:
+                self._segment += 1
+        self._columns = _columns()
+        self._lanes = []
+        self._log_number += 1
+
+    def _start_log(self):
+        """Empty the pending log and number it for the next block, with the lock held."""
+        self._log.seek(0)
+        self._log.truncate()
+        self._log.write(f"{LOG_MAGIC} {self._log_number}\n")
+        self._log.flush()
+
+
+def _sale_row(sale: Sale) -> list:
+    return [(sale.timestamp - EPOCH) // MICROSECOND, sale.lane, sale.member, sale.items, sale.coupons,
+            sale.membership_discount_cents, sale.subtotal_cents, sale.total_cents]
+
+
+def _read_log(path: str) -> tuple[int, list[Sale]]:
+    """Given a pending log, return its number and its sales, stopping at a torn
+    last line (-1 and no sales if there is no log)."""
+    try:
+        with open(path) as f:
+            lines = f.read().split("\n")
+    except FileNotFoundError:
+        return -1, []
+    magic, _, number = lines[0].partition(" ")
+    if magic != LOG_MAGIC or not number.isdigit():
+        return -1, []
+    sales = []
+    # The last element is empty, or a line torn by a crash
+    for line in lines[1:-1]:
+        try:
+            timestamp, lane, member, items, coupons, membership_discount_cents, subtotal_cents, total_cents = \
+                json.loads(line)
+        except ValueError:
+            break
+        sales.append(Sale(EPOCH + timestamp * MICROSECOND, lane, member, [tuple(item) for item in items],
+                          [tuple(coupon) for coupon in coupons], membership_discount_cents, subtotal_cents,
+                          total_cents))
+    return int(number), sales
+
+
+def _blocks(f) -> Iterator[tuple]:
+    """Given an open segment, yield the header fields of each complete block,
+    leaving the file at its payload; stops at a torn or foreign block."""
+    size = os.fstat(f.fileno()).st_size
+    while True:
+        header = f.read(BLOCK_HEADER.size)
+        if len(header) < BLOCK_HEADER.size:
+            return
+        fields = BLOCK_HEADER.unpack(header)
+        if fields[0] != BLOCK_MAGIC or f.tell() + fields[1] > size:
+            return
+        payload_start = f.tell()
+        yield fields
+        f.seek(payload_start + fields[1])
+
+
+def _last_log_number(segments: list[str]) -> int:
+    """Given the segment files, return the pending log number of the last block written (-1 if none)."""
+    for path in reversed(segments):
+        with open(path, "rb") as f:
+            numbers = [fields[5] for fields in _blocks(f)]
+        if numbers:
+            return numbers[-1]
+    return -1
+
+
+def segment_paths(directory: str) -> list[str]:
+    """Given a ledger directory, return its segment files, oldest first."""
+    return sorted(glob.glob(os.path.join(directory, "sales-*.ledger")))
+
+
+def _decode_block(payload: bytes) -> Iterator[Sale]:
+    body = zlib.decompress(payload)
+    sales, items, coupons = COUNTS.unpack_from(body)
+    position = COUNTS.size
+    columns = {}
+    for names, count in ((SALE_COLUMNS, sales), (ITEM_COLUMNS, items), (COUPON_COLUMNS, coupons)):
+        for name in names:
+            column = array("q")
+            column.frombytes(body[position:position + 8 * count])
+            if sys.byteorder == "big":
+                column.byteswap()
+            columns[name] = column
+            position += 8 * count
+    lanes = body[position:].decode().split("\n")
+
+    item, coupon = 0, 0
+    for row in range(sales):
+        item_end = item + columns["item_counts"][row]
+        coupon_end = coupon + columns["coupon_counts"][row]
+        member = columns["members"][row]
+        yield Sale(
+            EPOCH + columns["timestamps"][row] * MICROSECOND,
+            lanes[row],
+            None if member == NO_MEMBER else f"{member:012d}",
+            [(f"{columns['item_barcodes'][i]:012d}", columns["item_quantities"][i], columns["item_prices"][i])
+             for i in range(item, item_end)],
+            [(f"{columns['coupon_barcodes'][i]:012d}", columns["coupon_discounts"][i]) for i in range(coupon, coupon_end)],
+            columns["membership_discounts"][row],
+            columns["subtotals"][row],
+            columns["totals"][row],
+        )
+        item, coupon = item_end, coupon_end
+
+
+def read_sales(directory: str, start: datetime = None, end: datetime = None) -> Iterator[Sale]:
+    """Stream the sales in a ledger directory, one block in memory at a time,
+    followed by the sales still in the pending log.
+
+    Blocks whose time range lies outside [start, end) are skipped without
+    being decompressed. A segment's reading stops at a torn or corrupt block
+    (e.g. from a crash mid-write).
+
+    Args:
+        directory (str): The ledger directory.
+        start (datetime, optional): Earliest transaction time. Defaults to None.
+        end (datetime, optional): Transaction times before this only. Defaults to None.
+    Yields:
+        Sale: Each sale, in the order they were recorded.
+    """
+    def in_range(sale):
+        return (start is None or sale.timestamp >= start) and (end is None or sale.timestamp < end)
+
+    first = None if start is None else (start - EPOCH) // MICROSECOND
+    last = None if end is None else (end - EPOCH) // MICROSECOND
+    last_log_number = -1
+    for path in segment_paths(directory):
+        with open(path, "rb") as f:
+            for _, length, checksum, block_first, block_last, log_number in _blocks(f):
+                last_log_number = log_number
+                if (first is not None and block_last < first) or (last is not None and block_first >= last):
+                    continue
+                payload = f.read(length)
+                if zlib.crc32(payload) != checksum:
+                    break
+                yield from filter(in_range, _decode_block(payload))
+    log_number, sales = _read_log(os.path.join(directory, PENDING_LOG))
+    # A pending log already written as a block (the crash came before it was emptied) is not read twice
+    if log_number > last_log_number:
+        yield from filter(in_range, sales)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize the sales in a ledger directory.")
+    parser.add_argument("directory")
+    parser.add_argument("--start", type=datetime.fromisoformat)
+    parser.add_argument("--end", type=datetime.fromisoformat)
+    args = parser.parse_args()
+    sales, units, total_cents = 0, 0, 0
+    for sale in read_sales(args.directory, args.start, args.end):
+        sales += 1
+        units += sum(quantity for _, quantity, _ in sale.items)
+        total_cents += sale.total_cents
+    print(f"{sales} sales, {units} units, total {format_cents(total_cents)}")
@@ -0,0 +1,61 @@
+import os
+import time
+import threading
+from typing import Iterator
+
+
+def iter_scans(source) -> Iterator[str]:
+    """Given a scan source, lazily yield its scans one at a time.
+
+    Args:
+        source: A path to a barcode file, an open file-like object, or any
+            iterable of lines (length 95 strings).
+    Yields:
+        str: Each non-empty line, stripped of whitespace.
+    """
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "r") as f:
+            yield from iter_scans(f)
+        return
+    for line in source:
+        line = line.strip()
+        if line:
+            yield line
+
+
+def follow_scans(
+    barcode_file_path: str,
+    poll_interval: float = 0.1,
+    stop_event: threading.Event = None,
+) -> Iterator[str]:
+    """Tail a scanner feed file that is still being written to, yielding each
+    scan as soon as its line is complete.
+
+    Args:
+        barcode_file_path (str): The feed file to follow.
+        poll_interval (float, optional): Seconds to wait at the end of the file
+            before polling again. Defaults to 0.1.
+        stop_event (threading.Event, optional): When set, stop once the file has
+            been drained. Defaults to None (follow forever).
+    Yields:
+        str: Each non-empty line, stripped of whitespace.
+    """
+
+    pending = ""
+    with open(barcode_file_path, "r") as f:
+        while True:
+            chunk = f.readline()
+            if chunk.endswith("\n"):
+                line = (pending + chunk).strip()
+                pending = ""
+                if line:
+                    yield line
+                continue
+            # End of file, possibly in the middle of a line the scanner is still writing
+            pending += chunk
+            if stop_event is not None and stop_event.is_set():
+                if pending.strip():
+                    yield pending.strip()
+                return
+            time.sleep(poll_interval)
@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import deque
+
+from barcode import BarcodeProcessor
+
+# Rejection reason codes
+WRONG_LENGTH = "wrong_length"
+WRONG_GUARD = "wrong_guard"
+WRONG_PARITY = "wrong_parity"
+WRONG_MODULE = "wrong_module"
+CHECK_DIGIT = "check_digit"
+UNKNOWN_PREFIX = "unknown_prefix"
+UNKNOWN_PRODUCT = "unknown_product"
+OUT_OF_STOCK = "out_of_stock"
+INVALID_COUPON = "invalid_coupon"
+UNKNOWN_MEMBER = "unknown_member"
+
+REASONS = (
+    WRONG_LENGTH, WRONG_GUARD, WRONG_PARITY, WRONG_MODULE, CHECK_DIGIT,
+    UNKNOWN_PREFIX, UNKNOWN_PRODUCT, OUT_OF_STOCK, INVALID_COUPON, UNKNOWN_MEMBER,
+)
+
+# The reason for each BarcodeProcessor.decode failure status
+DECODE_REASONS = {
+    BarcodeProcessor.DECODE_WRONG_LENGTH: WRONG_LENGTH,
+    BarcodeProcessor.DECODE_WRONG_GUARD: WRONG_GUARD,
+    BarcodeProcessor.DECODE_WRONG_PARITY: WRONG_PARITY,
+    BarcodeProcessor.DECODE_WRONG_MODULE: WRONG_MODULE,
+}
+
+
+class ScanTelemetry:
+    """Counts rejected scans per lane and per reason, and keeps a sample of
+    the most recent rejected raw scans.
+
+    One instance may be shared by every lane of a store. Lanes may share a
+    name (every POSSystem defaults to "lane-0"), so recording and reading
+    take a lock; readers get copies, so they can be queried from another
+    thread while the lanes keep scanning.
+    """
+
+    def __init__(self, sample_every: int = 1, buffer_size: int = 256):
+        """
+        Args:
+            sample_every (int, optional): Keep one in this many rejected scans of
+                each lane in the ring buffer. Defaults to 1 (every one).
+            buffer_size (int, optional): Rejected scans kept at most. Defaults to 256.
+
+        Raises:
+            ValueError: If sample_every or buffer_size is not positive.
+        """
+        if sample_every < 1 or buffer_size < 1:
+            raise ValueError("sample_every and buffer_size must be at least 1")
+        self.sample_every = sample_every
+        self.counts = {}
+        self.samples = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+
+    def record(self, lane: str, reason: str, scan: str):
+        """Count a rejected scan, sampling it into the ring buffer.
+
+        Args:
+            lane (str): The lane the scan was rejected on.
+            reason (str): One of REASONS.
+            scan (str): The raw scan.
+        """
+        with self._lock:
+            counts = self.counts.get(lane)
+            if counts is None:
+                counts = self.counts[lane] = dict.fromkeys(REASONS, 0)
+            counts[reason] += 1
+            if self.sample_every == 1 or sum(counts.values()) % self.sample_every == 0:
+                self.samples.append((time.time(), lane, reason, scan))
+
+    def get_counts(self, lane: str = None) -> dict[str, int]:
+        """Get the rejections by reason.
+
+        Args:
+            lane (str, optional): Only count this lane. Defaults to None (every lane).
+        Returns:
+            dict[str, int]: The number of rejections for each reason.
+        """
+        with self._lock:
+            if lane is not None:
+                return dict(self.counts.get(lane) or dict.fromkeys(REASONS, 0))
+            totals = dict.fromkeys(REASONS, 0)
+            for counts in self.counts.values():
+                for reason, count in counts.items():
+                    totals[reason] += count
+            return totals
+
+    def get_lane_counts(self) -> dict[str, dict[str, int]]:
+        """Get the rejections by reason for each lane.
+
+        Returns:
+            dict[str, dict[str, int]]: The counts of each lane, keyed by lane.
+        """
+        with self._lock:
+            return {lane: dict(counts) for lane, counts in self.counts.items()}
+
+    def get_recent(self, lane: str = None, reason: str = None) -> list[tuple]:
+        """Get the sampled rejected scans, oldest first.
+
+        Args:
+            lane (str, optional): Only this lane's scans. Defaults to None.
+            reason (str, optional): Only scans rejected for this reason. Defaults to None.
+        Returns:
+            list[tuple]: (time, lane, reason, raw scan) per sampled rejection.
+        """
+        with self._lock:
+            samples = list(self.samples)
+        return [
+            sample for sample in samples
+            if (lane is None or sample[1] == lane) and (reason is None or sample[2] == reason)
+        ]
@@ -0,0 +1,161 @@
+import gc
+import os
+import pickle
+from array import array
+from collections.abc import Mapping
+
+from journal import file_checksum
+from columnar import _BarcodeIndex, _NamePool
+from csv_ingest import PACKERS
+
+SNAPSHOT_VERSION = 5
+# Type of each packed field after the barcode (see csv_ingest.PACKERS); strings are pooled
+FIELD_TYPES = {"inventory": (str, int, int), "memberships": (str, int, str)}
+NO_BARCODE = -1
+
+
+class RecordColumns(Mapping):
+    """Read-only barcode -> record mapping stored as flat columns, so it
+    pickles and unpickles as a few arrays instead of millions of objects.
+
+    Each record is packed (see csv_ingest.PACKERS) into one int column per
+    numeric field and one name pool id column per string field, as in
+    columnar.py. A record object is only built the first time its barcode is
+    looked up, and is kept, so every lookup of a barcode returns the same
+    object. Iteration follows the order of the records it was built from.
+    """
+
+    def __init__(self, kind: str, records: dict):
+        """
+        Args:
+            kind (str): inventory or memberships.
+            records (dict): The records by barcode, e.g. from csv_ingest.ingest.
+        """
+        self.kind = kind
+        pack = PACKERS[kind][0]
+        field_types = FIELD_TYPES[kind]
+        self.pool = _NamePool()
+        self.barcodes = array("q")
+        self.columns = [array("I" if field_type is str else "q") for field_type in field_types]
+        # Barcodes that are not 12 digit numbers do not fit the integer column
+        self.other_barcodes = {}
+        for fields in map(pack, records.values()):
+            barcode = fields[0]
+            if len(barcode) == 12 and barcode.isascii() and barcode.isdigit():
+                self.barcodes.append(int(barcode))
+            else:
+                self.other_barcodes[barcode] = len(self.barcodes)
+                self.barcodes.append(NO_BARCODE)
+            for column, field_type, value in zip(self.columns, field_types, fields[1:]):
+                column.append(self.pool.add(value) if field_type is str else value)
+        self.pool.freeze()
+        self.index = _BarcodeIndex(self.barcodes)
+        self._records = {}
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        del state["_records"]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._records = {}
+
+    def _row_of(self, barcode: str) -> int:
+        if len(barcode) == 12 and barcode.isascii() and barcode.isdigit():
+            return self.index.row_of(barcode)
+        return self.other_barcodes.get(barcode)
+
+    def __getitem__(self, barcode: str):
+        record = self._records.get(barcode)
+        if record is not None:
+            return record
+        row = self._row_of(barcode)
+        if row is None:
+            raise KeyError(barcode)
+        fields = [barcode]
+        for column, field_type in zip(self.columns, FIELD_TYPES[self.kind]):
+            fields.append(self.pool.get(column[row]) if field_type is str else column[row])
+        # setdefault keeps a single record per barcode when lanes race to build it
+        return self._records.setdefault(barcode, PACKERS[self.kind][1](tuple(fields)))
+
+    def __contains__(self, barcode) -> bool:
+        return isinstance(barcode, str) and self._row_of(barcode) is not None
+
+    def __len__(self) -> int:
+        return len(self.barcodes)
+
+    def __iter__(self):
+        other_rows = {row: barcode for barcode, row in self.other_barcodes.items()}
+        for row, barcode in enumerate(self.barcodes):
+            yield other_rows[row] if barcode == NO_BARCODE else f"{barcode:012d}"
+
+
+def source_key(source_path: str) -> dict:
+    """Given a source file, return the key its snapshot is stored under.
+
+    Take the key before parsing the source, so a write that lands while it is
+    being parsed leaves the snapshot stale rather than silently outdated.
+
+    Args:
+        source_path (str): The CSV the snapshot is parsed from.
+    Returns:
+        dict: The snapshot version and the file's size, mtime and CRC-32.
+    """
+    stat = os.stat(source_path)
+    return {
+        "version": SNAPSHOT_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "checksum": file_checksum(source_path),
+    }
+
+
+def load_snapshot(snapshot_path: str, source_path: str):
+    """Given a snapshot file and the CSV it was parsed from, return the cached
+    object if the CSV has not changed since.
+
+    The size and mtime are compared first; the CRC-32 is only computed when
+    the size matches but the mtime moved (e.g. the file was copied or touched).
+
+    Args:
+        snapshot_path (str): The snapshot file.
+        source_path (str): The CSV the snapshot was parsed from.
+    Returns:
+        The cached object (None if missing, stale, or unreadable). Records
+        saved as RecordColumns are returned as RecordColumns.
+    """
+    try:
+        with open(snapshot_path, "rb") as f:
+            key = pickle.load(f)
+            stat = os.stat(source_path)
+            if key.get("version") != SNAPSHOT_VERSION or key.get("size") != stat.st_size:
+                return None
+            if key.get("mtime_ns") != stat.st_mtime_ns and key.get("checksum") != file_checksum(source_path):
+                return None
+            # Snapshots of records other than RecordColumns may hold many
+            # objects, which would otherwise trigger pointless cyclic collections
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                return pickle.load(f)
+            finally:
+                if gc_enabled:
+                    gc.enable()
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, TypeError, ValueError):
+        return None
+
+
+def save_snapshot(snapshot_path: str, key: dict, data):
+    """Atomically write a snapshot of parsed data.
+
+    Args:
+        snapshot_path (str): The snapshot file.
+        key (dict): The source_key taken before the source was parsed.
+        data: The parsed object to cache.
+    """
+    temporary_path = snapshot_path + ".tmp"
+    with open(temporary_path, "wb") as f:
+        pickle.dump(key, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_path, snapshot_path)
@@ -0,0 +1,287 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from product import Product
+from member import Member, SilverMember, GoldMember, PlatinumMember
+from coupon import Coupon, PercentDiscountCoupon, FixedDiscountCoupon
+from database import ProductDatabase, MemberDatabase, CouponDatabase
+from money import to_cents, format_cents
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    numeric_barcode TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    price_cents INTEGER NOT NULL,
+    quantity INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS members (
+    numeric_barcode TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    tier TEXT NOT NULL,
+    points_cents INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coupons (
+    numeric_barcode TEXT PRIMARY KEY,
+    expiration_date TEXT NOT NULL,
+    discount_type TEXT NOT NULL,
+    discount_value TEXT NOT NULL,
+    min_purchase_cents INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    activation_date TEXT
+) WITHOUT ROWID;
+"""
+
+MEMBER_TIERS = {"Silver": SilverMember, "Gold": GoldMember, "Platinum": PlatinumMember}
+
+
+class StoreConnection(sqlite3.Connection):
+    """A connection usable from any thread (lanes, and the group-commit
+    flusher, which commits the lanes' open transaction). Hold lock around
+    every use, so statements from different threads never interleave.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.RLock()
+
+    @contextmanager
+    def transaction(self):
+        """Run the block as one transaction, holding the lock throughout, so
+        no other lane's commit can land in the middle of it. Commits on exit,
+        rolls back on an exception.
+        """
+        with self.lock:
+            if not self.in_transaction:
+                self.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self.rollback()
+                raise
+            self.commit()
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """Open (and create if needed) a store database in WAL mode.
+
+    Barcodes are the primary keys, so every lookup is an index lookup, and the
+    queries below are parameterized so sqlite3 reuses their prepared statements.
+
+    Args:
+        db_path (str): The SQLite database file.
+    Returns:
+        StoreConnection: The connection, shared by the three databases.
+    """
+    connection = sqlite3.connect(db_path, factory=StoreConnection, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    # Databases created before coupons had activation dates
+    if "activation_date" not in [column[1] for column in connection.execute("PRAGMA table_info(coupons)")]:
+        connection.execute("ALTER TABLE coupons ADD COLUMN activation_date TEXT")
+    return connection
+
+
+class SQLiteProductDatabase:
+    """ProductDatabase stored in SQLite.
+
+    Updates run in the connection's open transaction and are committed by
+    save_inventory (or save_memberships). Lanes share the connection, so a
+    checkout runs inside transaction(), which keeps other lanes from
+    committing it halfway (stock taken, points not yet added).
+    """
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+        self.products = {}
+
+    def transaction(self):
+        """Return a context manager running one checkout as a single transaction, see StoreConnection."""
+        return self.connection.transaction()
+
+    def get_product(self, numeric_barcode: str) -> Product:
+        """Given a barcode, return the Product object associated with that\
+        barcode, refreshed from the database.
+
+        Args:
+            numeric_barcode (str): 12 digit numeric barcode
+        Returns:
+            Product with barcode (None if not found)
+        """
+        with self.connection.lock:
+            row = self.connection.execute(
+                "SELECT name, price_cents, quantity FROM products WHERE numeric_barcode = ?", (numeric_barcode,)
+            ).fetchone()
+            if row is None:
+                return None
+            name, price_cents, quantity = row
+            product = self.products.get(numeric_barcode)
+            if product is None:
+                product = self.products[numeric_barcode] = Product(numeric_barcode, name, format_cents(price_cents), quantity)
+            product.quantity = quantity
+            return product
+
+    def decrement_inventory(self, numeric_barcode: str, quantity: int):
+        """Given a barcode and a quantity to decrease by, decrement the inventory of the product associated with that barcode by the quantity.
+
+        Args:
+            numeric_barcode (str): 12 digit numeric barcode
+            quantity (int): The quantity to decrease by.
+        """
+        with self.connection.lock:
+            row = self.connection.execute(
+                "UPDATE products SET quantity = quantity - ? WHERE numeric_barcode = ? RETURNING quantity",
+                (quantity, numeric_barcode),
+            ).fetchone()
+            if row is not None and numeric_barcode in self.products:
+                self.products[numeric_barcode].quantity = row[0]
+
+    def save_inventory(self, fsync: bool = False):
+        """Commit the pending inventory changes.
+
+        Args:
+            fsync (bool, optional): Also checkpoint the WAL into the database file. Defaults to False.
+        """
+        with self.connection.lock:
+            self.connection.commit()
+            if fsync:
+                self.connection.execute("PRAGMA wal_checkpoint(FULL)")
+
+
+class SQLiteMemberDatabase:
+    """MemberDatabase stored in SQLite. See SQLiteProductDatabase for the transaction handling."""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+        self.membership = {}
+
+    def get_member(self, numeric_barcode: str) -> Member:
+        """Given a barcode, return the Member object associated with that barcode, refreshed from the database.
+
+        Args:
+            numeric_barcode (str): The barcode of the member to check.
+        Returns:
+            Member: The Member object associated with the barcode. (None if not associated with a member)
+        """
+        with self.connection.lock:
+            row = self.connection.execute(
+                "SELECT name, tier, points_cents FROM members WHERE numeric_barcode = ?", (numeric_barcode,)
+            ).fetchone()
+            if row is None or row[1] not in MEMBER_TIERS:
+                return None
+            name, tier, points_cents = row
+            member = self.membership.get(numeric_barcode)
+            if member is None:
+                member = self.membership[numeric_barcode] = MEMBER_TIERS[tier](numeric_barcode, name, 0)
+            member.points_cents = points_cents
+            return member
+
+    def add_points(self, numeric_barcode: str, points: float):
+        """Given a barcode, add the specified number of points to the member associated with that barcode.
+
+        Args:
+            numeric_barcode (str): The barcode of the member to add points to.
+            points (int): The number of points to add.
+        """
+        self.add_points_cents(numeric_barcode, to_cents(points))
+
+    def add_points_cents(self, numeric_barcode: str, points_cents: int):
+        """Given a barcode, add the specified number of hundredths of a point to the member associated with that barcode.
+
+        Args:
+            numeric_barcode (str): The barcode of the member to add points to.
+            points_cents (int): The number of hundredths of a point to add.
+        """
+        with self.connection.lock:
+            row = self.connection.execute(
+                "UPDATE members SET points_cents = points_cents + ? WHERE numeric_barcode = ? RETURNING points_cents",
+                (points_cents, numeric_barcode),
+            ).fetchone()
+            if row is not None and numeric_barcode in self.membership:
+                self.membership[numeric_barcode].points_cents = row[0]
+
+    def save_memberships(self, fsync: bool = False):
+        """Commit the pending membership changes.
+
+        Args:
+            fsync (bool, optional): Also checkpoint the WAL into the database file. Defaults to False.
+        """
+        with self.connection.lock:
+            self.connection.commit()
+            if fsync:
+                self.connection.execute("PRAGMA wal_checkpoint(FULL)")
+
+
+class SQLiteCouponDatabase:
+    """CouponDatabase stored in SQLite."""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def get_coupon(self, numeric_barcode: str, now: datetime = None) -> Coupon:
+        """Given a barcode, return the Coupon object associated with that barcode
+        (None if it is not active at now, which defaults to datetime.now(); see
+        CouponDatabase.get_coupon)."""
+        with self.connection.lock:
+            row = self.connection.execute(
+                "SELECT expiration_date, discount_type, discount_value, min_purchase_cents, description, activation_date "
+                "FROM coupons WHERE numeric_barcode = ?",
+                (numeric_barcode,),
+            ).fetchone()
+        if row is None:
+            return None
+        expiration_date, discount_type, discount_value, min_purchase_cents, description, activation_date = row
+        expiration_date = datetime.fromisoformat(expiration_date)
+        activation_date = datetime.fromisoformat(activation_date) if activation_date else None
+        if discount_type == "percent":
+            coupon = PercentDiscountCoupon(numeric_barcode, expiration_date, format_cents(min_purchase_cents),
+                                           description, discount_value, activation_date)
+        elif discount_type == "fixed":
+            coupon = FixedDiscountCoupon(numeric_barcode, expiration_date, format_cents(min_purchase_cents),
+                                         description, discount_value, activation_date)
+        else:
+            return None
+        if not coupon.is_active(now or datetime.now()):
+            return None
+        return coupon
+
+
+def import_csv(db_path: str, inventory_path: str, membership_path: str, coupon_path: str):
+    """Load the three CSV databases into a SQLite store database, replacing rows with the same barcode.
+
+    Args:
+        db_path (str): The SQLite database file.
+        inventory_path (str): The inventory CSV.
+        membership_path (str): The membership CSV.
+        coupon_path (str): The coupon CSV.
+    """
+    connection = connect(db_path)
+    with connection:
+        connection.executemany(
+            "INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?)",
+            [(p.get_barcode(), p.get_name(), p.get_price_cents(), p.get_quantity())
+             for p in ProductDatabase(inventory_path).products.values()],
+        )
+        connection.executemany(
+            "INSERT OR REPLACE INTO members VALUES (?, ?, ?, ?)",
+            [(m.get_barcode(), m.get_name(), m.return_membership_type(), m.get_points_cents())
+             for m in MemberDatabase(membership_path).membership.values()],
+        )
+        coupons = []
+        # A clock at the start of time keeps coupons that have already expired
+        for c in CouponDatabase(coupon_path, clock=lambda: datetime.min).coupon.values():
+            if isinstance(c, PercentDiscountCoupon):
+                discount_type, discount_value = "percent", format_cents(c.percent_basis_points)
+            else:
+                discount_type, discount_value = "fixed", format_cents(c.fixed_value_cents)
+            activation_date = c.activation_date.isoformat() if c.activation_date else None
+            coupons.append((c.numeric_barcode, c.expiration_date.isoformat(), discount_type, discount_value,
+                            c.min_purchase_cents, c.description, activation_date))
+        connection.executemany(
+            "INSERT OR REPLACE INTO coupons (numeric_barcode, expiration_date, discount_type, discount_value, "
+            "min_purchase_cents, description, activation_date) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            coupons,
+        )
+    connection.close()
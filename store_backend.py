@@ -1,15 +1,90 @@
+import os
+from contextlib import nullcontext
+from datetime import datetime
+
 from database import ProductDatabase, MemberDatabase, CouponDatabase
 from product import Product
 from member import Member
 from coupon import Coupon
+import sqlite_database
+from persistence import GroupCommitter
 
 
 class StoreBackend:
 
-    def __init__(self, inventory_path: str, membership_path: str, coupon_path: str):
-        self.product_database = ProductDatabase(inventory_path)
-        self.member_database = MemberDatabase(membership_path)
-        self.coupon_database = CouponDatabase(coupon_path)
+    def __init__(
+        self,
+        inventory_path: str,
+        membership_path: str,
+        coupon_path: str,
+        inventory_journal_path: str = None,
+        snapshot_dir: str = None,
+        clock=None,
+    ):
+        """Load the three CSV databases.
+
+        Args:
+            inventory_path (str): The inventory CSV.
+            membership_path (str): The membership CSV.
+            coupon_path (str): The coupon CSV.
+            inventory_journal_path (str, optional): Run the inventory in journal mode. Defaults to None.
+            snapshot_dir (str, optional): Keep a binary snapshot of each parsed
+                CSV here (<csv name>.snapshot), so a restart skips parsing any
+                CSV that has not changed. Defaults to None.
+            clock (optional): Callable returning the current datetime, used to
+                expire coupons. Defaults to datetime.now.
+        """
+        def snapshot_path(source_path):
+            if snapshot_dir is None:
+                return None
+            return os.path.join(snapshot_dir, os.path.basename(source_path) + ".snapshot")
+
+        self._set_databases(
+            ProductDatabase(inventory_path, journal_path=inventory_journal_path, snapshot_path=snapshot_path(inventory_path)),
+            MemberDatabase(membership_path, snapshot_path=snapshot_path(membership_path)),
+            CouponDatabase(coupon_path, snapshot_path=snapshot_path(coupon_path), clock=clock),
+        )
+
+    @classmethod
+    def from_databases(cls, product_database, member_database, coupon_database) -> "StoreBackend":
+        """Build a backend around already constructed databases, e.g. alternative
+        implementations such as MmapProductDatabase.
+
+        Args:
+            product_database: Any object with the ProductDatabase methods.
+            member_database: Any object with the MemberDatabase methods.
+            coupon_database: Any object with the CouponDatabase methods.
+        Returns:
+            StoreBackend: The backend.
+        """
+        store_backend = cls.__new__(cls)
+        store_backend._set_databases(product_database, member_database, coupon_database)
+        return store_backend
+
+    @classmethod
+    def from_sqlite(cls, db_path: str) -> "StoreBackend":
+        """Build a backend whose three databases live in one SQLite file (see
+        sqlite_database.import_csv to create it from the CSVs).
+
+        Args:
+            db_path (str): The SQLite database file.
+        Returns:
+            StoreBackend: The backend.
+        """
+        connection = sqlite_database.connect(db_path)
+        return cls.from_databases(
+            sqlite_database.SQLiteProductDatabase(connection),
+            sqlite_database.SQLiteMemberDatabase(connection),
+            sqlite_database.SQLiteCouponDatabase(connection),
+        )
+
+    def _set_databases(self, product_database, member_database, coupon_database):
+        self.product_database = product_database
+        self.member_database = member_database
+        self.coupon_database = coupon_database
+        self.group_committer = None
+        self.ack_durable = True
+        self.ledgers = []
 
     def get_product(self, numeric_barcode: str) -> Product:
         return self.product_database.get_product(numeric_barcode)
@@ -35,11 +110,87 @@ class StoreBackend:
         """
         self.member_database.add_points(member.get_barcode(), points)
 
-    def get_coupon(self, numeric_barcode: str) -> Coupon:
-        return self.coupon_database.get_coupon(numeric_barcode)
+    def add_member_points_cents(self, member: Member, points_cents: int):
+        """Given a member and a number of hundredths of a point, increment the points of the member.
+
+        Args:
+            member (Member): The member to update the points of.
+            points_cents (int): The hundredths of a point to increase by.
+        """
+        self.member_database.add_points_cents(member.get_barcode(), points_cents)
+
+    def get_coupon(self, numeric_barcode: str, now: datetime = None) -> Coupon:
+        """Given a barcode, return the coupon if it is active at now (None otherwise)."""
+        return self.coupon_database.get_coupon(numeric_barcode, now)
+
+    def enable_group_commit(self, max_delay: float = 0.01, max_batch: int = 64, ack_durable: bool = True):
+        """Hand saves to a background flusher that merges all saves within the
+        window into one write and one fsync per database.
+
+        Args:
+            max_delay (float, optional): Seconds to collect saves before flushing. Defaults to 0.01.
+            max_batch (int, optional): Flush early once this many saves are pending. Defaults to 64.
+            ack_durable (bool, optional): If True, sync() blocks until the saves are
+                on disk ("ack after durable"); if False it returns immediately
+                ("ack immediately"). Defaults to True.
+        """
+        self.close()
+        self.group_committer = GroupCommitter(self._flush, max_delay, max_batch)
+        self.ack_durable = ack_durable
+
+    def transaction(self):
+        """Return a context manager around one checkout's updates and saves.
+        With a product database that supports transactions (SQLite), the
+        checkout is one transaction that no other lane can commit halfway;
+        otherwise it does nothing.
+        """
+        transaction = getattr(self.product_database, "transaction", None)
+        return transaction() if transaction is not None else nullcontext()
+
+    def attach_ledger(self, ledger):
+        """Persist a sales ledger with the databases: save_sales() flushes its
+        pending log the way save_inventory() saves the inventory, through
+        group commit when it is enabled.
+
+        Args:
+            ledger (SalesLedger): The ledger; attaching it again does nothing.
+        """
+        if not any(attached is ledger for attached in self.ledgers):
+            self.ledgers.append(ledger)
+
+    def _flush(self):
+        self.product_database.save_inventory(fsync=True)
+        self.member_database.save_memberships(fsync=True)
+        for ledger in self.ledgers:
+            ledger.flush(fsync=True)
 
     def save_inventory(self):
+        if self.group_committer is not None:
+            self.group_committer.submit()
+            return
         self.product_database.save_inventory()
 
     def save_memberships(self):
-        self.member_database.save_memberships()
\ No newline at end of file
+        if self.group_committer is not None:
+            self.group_committer.submit()
+            return
+        self.member_database.save_memberships()
+
+    def save_sales(self):
+        if self.group_committer is not None:
+            self.group_committer.submit()
+            return
+        for ledger in self.ledgers:
+            ledger.flush()
+
+    def sync(self):
+        """Block until everything saved so far is durable. Does nothing unless
+        group commit is enabled with ack_durable."""
+        if self.group_committer is not None and self.ack_durable:
+            self.group_committer.wait(self.group_committer.last_ticket())
+
+    def close(self):
+        """Flush pending group commits and stop the flusher."""
+        if self.group_committer is not None:
+            self.group_committer.close()
+            self.group_committer = None
\ No newline at end of file
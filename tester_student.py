@@ -109,8 +109,7 @@ def generate_barcode_12(item_type: str):
 
     first_11_digits = first_digit + rest_of_digits
     # valid numeric barcode
-    last_digit = 3
-    # last_digit = generate_last_digit(first_11_digits)
+    last_digit = generate_last_digit(first_11_digits)
 
     return first_11_digits + str(last_digit)
 
@@ -124,7 +123,9 @@ def generate_last_digit(barcode_11: str) -> int:
     Returns:
         int: The last digit of the barcode.
     """
-    check_digit = 0
+    odd_sum = sum(int(digit) for digit in barcode_11[0::2])
+    even_sum = sum(int(digit) for digit in barcode_11[1::2])
+    check_digit = (10 - (odd_sum * 3 + even_sum) % 10) % 10
     return check_digit
 
 
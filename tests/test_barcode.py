@@ -88,3 +88,62 @@ def test_scan_files_all_valid():
         if numeric_barcode:
             checks.append(scanner.modulo_check(numeric_barcode))
     assert all(checks)
+
+
+def test_decode_both_orientations():
+    scanner = BarcodeProcessor()
+    valid_numeric = "252109613999"
+    valid_binary = barcode_digits2binary(valid_numeric)
+    assert scanner.decode(valid_binary) == (valid_numeric, BarcodeProcessor.DECODE_OK)
+    assert scanner.decode(valid_binary[::-1]) == (valid_numeric, BarcodeProcessor.DECODE_OK)
+
+
+def test_decode_failure_codes():
+    scanner = BarcodeProcessor()
+    valid_binary = barcode_digits2binary("252109613999")
+
+    assert scanner.decode("")[1] == BarcodeProcessor.DECODE_WRONG_LENGTH
+    assert scanner.decode("0" + valid_binary[1:])[1] == BarcodeProcessor.DECODE_WRONG_GUARD
+    assert scanner.decode("2" + valid_binary[1:])[1] == BarcodeProcessor.DECODE_WRONG_MODULE
+
+    # Flipping one bit of a left module breaks its parity
+    flipped = valid_binary[:10] + ("1" if valid_binary[10] == "0" else "0") + valid_binary[11:]
+    assert scanner.decode(flipped) == (None, BarcodeProcessor.DECODE_WRONG_PARITY)
+
+    # Odd parity but not a UPC-A pattern
+    unknown = valid_binary[:3] + "0000001" + valid_binary[10:]
+    assert scanner.decode(unknown) == (None, BarcodeProcessor.DECODE_WRONG_MODULE)
+
+
+def test_is_valid_check_digit_does_not_raise():
+    scanner = BarcodeProcessor()
+    assert scanner.is_valid_check_digit("252109613999") is True
+    assert scanner.is_valid_check_digit("036000291439") is False
+
+
+def test_decode_batch_matches_scan_file():
+    np = pytest.importorskip("numpy")
+    scanner = BarcodeProcessor()
+
+    repo_root = Path(__file__).resolve().parents[1]
+    scan_bin = (repo_root / "cart-data" / "scan_1_binary.txt").read_bytes()
+    expected = (repo_root / "cart-data" / "scan_1.txt").read_text().split()
+
+    digits, valid = scanner.decode_batch(scan_bin)
+    assert valid.all()
+    assert ["".join(map(str, row)) for row in digits] == expected
+
+    bits = np.array([[int(c) for c in line] for line in scan_bin.decode().split()], dtype=np.uint8)
+    bits[1] = bits[1][::-1]
+    bits[2, 10] ^= 1
+    digits, valid = scanner.decode_batch(bits)
+    assert valid.tolist() == [True, True, False, True]
+    assert "".join(map(str, digits[1])) == expected[1]
+    assert not digits[2].any()
+
+
+def test_decode_batch_rejects_ragged_input():
+    pytest.importorskip("numpy")
+    scanner = BarcodeProcessor()
+    with pytest.raises(ValueError, match="Wrong length"):
+        scanner.decode_batch(b"101")
@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+import json
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+import bench_pos
+from database import ProductDatabase, MemberDatabase
+from datagen import generate
+
+
+def test_run_and_compare(tmp_path):
+    report = bench_pos.run([10], [1], repeats=1)
+    names = {result["name"] for result in report["results"]}
+    assert {"decode", "ProductDatabase", "process_barcodes", "calculate_total", "checkout"} <= names
+    assert all(result["best_seconds"] > 0 for result in report["results"])
+
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(report))
+    assert bench_pos.compare(report["results"], str(baseline), 1.2) == []
+    slower = [dict(result, best_seconds=result["best_seconds"] * 2) for result in report["results"]]
+    assert len(bench_pos.compare(slower, str(baseline), 1.2)) == len(slower)
+
+
+def test_lanes_restock_between_checkouts_and_skip_oversized_carts(tmp_path):
+    paths = generate(str(tmp_path), 10, 10, 10, seed=0)
+    save_path = ProductDatabase.SAVE_PATH
+    ProductDatabase.SAVE_PATH = str(tmp_path / "updated_inventory.csv")
+    MemberDatabase.SAVE_PATH, member_save_path = str(tmp_path / "updated_memberships.csv"), MemberDatabase.SAVE_PATH
+    try:
+        results = bench_pos.bench_lanes(paths["inventory"], paths["memberships"], paths["coupons"], str(tmp_path),
+                                        10, [5, 20], repeats=3, seed=0)
+    finally:
+        ProductDatabase.SAVE_PATH, MemberDatabase.SAVE_PATH = save_path, member_save_path
+    assert {result["cart_size"] for result in results} == {5}
+
+    # However many checkouts ran, the saved stock is down by exactly one cart
+    original = ProductDatabase(paths["inventory"]).products
+    saved = ProductDatabase(str(tmp_path / "updated_inventory.csv")).products
+    assert sum(product.get_quantity() for product in original.values()) - \
+        sum(product.get_quantity() for product in saved.values()) == 5
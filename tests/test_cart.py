@@ -7,7 +7,7 @@ sys.path.append(str(Path(__file__).resolve().parents[1]))
 from cart import ShoppingCart
 from product import Product
 from member import PlatinumMember
-from coupon import FixedDiscountCoupon
+from coupon import FixedDiscountCoupon, PercentDiscountCoupon
 
 
 def test_cart_subtotal_equals_total_without_discounts():
@@ -47,3 +47,97 @@ def test_fixed_discount_coupon_applies_and_does_not_duplicate():
     assert len(cart.get_coupons()) == 1
 
     assert len(cart.get_items()) == 2
+
+
+def test_line_items_track_quantity_per_barcode():
+    cart = ShoppingCart()
+    milk = Product("random_barcode", "Milk", 2, 150)
+    bread = Product("random_barcode2", "Bread", 3, 80)
+    cart.add_item(milk)
+    cart.add_item(milk)
+    cart.add_item(bread, quantity=3)
+
+    assert cart.get_quantity("random_barcode") == 2
+    assert cart.get_quantity("random_barcode2") == 3
+    assert cart.get_quantity("missing") == 0
+    assert cart.get_item_count() == 5
+    assert len(cart.get_line_items()) == 2
+    assert len(cart.get_items()) == 5
+    assert cart.calculate_subtotal() == 13
+
+
+def test_remove_item_voids_units_and_drops_empty_lines():
+    cart = ShoppingCart()
+    milk = Product("random_barcode", "Milk", 2, 150)
+    cart.add_item(milk, quantity=2)
+
+    cart.remove_item("random_barcode")
+    assert cart.get_quantity("random_barcode") == 1
+    assert cart.calculate_subtotal() == 2
+
+    cart.remove_item("random_barcode", quantity=5)
+    cart.remove_item("missing")
+    assert cart.get_line_items() == []
+    assert cart.get_item_count() == 0
+    assert cart.calculate_total() == 0
+
+
+def test_discount_breakdown_is_cached_until_cart_changes():
+    cart = ShoppingCart()
+    cart.add_item(Product("random_barcode", "Milk", 2, 150))
+    fc = FixedDiscountCoupon("b4", datetime(2030, 1, 1), 1, "desc", 1)
+    cart.add_coupon(fc)
+    cart.add_membership(PlatinumMember("random_barcode3", "John", 0))
+
+    breakdown = cart.get_discount_breakdown()
+    assert breakdown == {"b4": 100, "membership": 20}
+    assert cart.get_discount_breakdown() is breakdown
+
+    cart.add_item(Product("random_barcode2", "Bread", 3, 80))
+    assert cart.get_discount_breakdown() == {"b4": 100, "membership": 50}
+    assert cart.calculate_total() == 3.5
+
+    cart.remove_item("random_barcode2")
+    assert cart.calculate_subtotal() == 2
+    assert cart.get_discount_breakdown()["membership"] == 20
+
+
+def test_cart_totals_are_exact_in_cents():
+    cart = ShoppingCart()
+    cart.add_item(Product("random_barcode", "Gum", "0.10", 150), quantity=3)
+    cart.add_membership(PlatinumMember("random_barcode3", "John", 0))
+
+    assert cart.calculate_subtotal_cents() == 30
+    assert cart.calculate_subtotal() == 0.3
+    # 10% of 30 cents
+    assert cart.calculate_total_cents() == 27
+
+
+def test_coupon_engine_transaction_clock_and_stacking():
+    coupons = [
+        FixedDiscountCoupon("f1", datetime(2030, 1, 1), 0, "desc", 1),
+        FixedDiscountCoupon("f3", datetime(2030, 1, 1), 5, "desc", 3),
+        PercentDiscountCoupon("p10", datetime(2030, 1, 1), 8, "desc", 10),
+        PercentDiscountCoupon("p50", datetime(2030, 1, 1), 50, "desc", 50),
+        FixedDiscountCoupon("old", datetime(2025, 1, 1), 0, "desc", 9),
+    ]
+    times = iter([datetime(2026, 1, 1), datetime(2031, 1, 1)])
+    cart = ShoppingCart(clock=lambda: next(times))
+    cart.add_item(Product("random_barcode", "Milk", 20, 150))
+    for coupon in coupons:
+        cart.add_coupon(coupon)
+
+    # The clock is read once; later pricing keeps the transaction time
+    assert cart.get_transaction_time() == datetime(2026, 1, 1)
+    assert cart.get_discount_breakdown() == {"f1": 100, "f3": 300, "p10": 200, "p50": 0, "old": 0}
+    cart.add_item(Product("random_barcode2", "Bread", 40, 80))
+    assert cart.get_discount_breakdown() == {"f1": 100, "f3": 300, "p10": 600, "p50": 3000, "old": 0}
+
+    best = ShoppingCart(clock=lambda: datetime(2026, 1, 1), stacking="best")
+    per_type = ShoppingCart(clock=lambda: datetime(2026, 1, 1), stacking="best_per_type", max_coupons=1)
+    for other in (best, per_type):
+        other.add_item(Product("random_barcode", "Milk", 20, 150))
+        for coupon in coupons:
+            other.add_coupon(coupon)
+    assert best.calculate_total_cents() == 2000 - 300
+    assert per_type.get_discount_breakdown() == {"f1": 0, "f3": 300, "p10": 0, "p50": 0, "old": 0}
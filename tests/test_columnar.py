@@ -0,0 +1,84 @@
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from columnar import ColumnarProductDatabase, ColumnarMemberDatabase
+from database import ProductDatabase, MemberDatabase
+from datagen import write_inventory, write_memberships
+
+
+def test_columnar_products_match_and_save(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    inventory_csv = str(repo_root / "db-data" / "inventory.csv")
+    ColumnarProductDatabase.SAVE_PATH = str(tmp_path / "updated_inventory.csv")
+
+    eager = ProductDatabase(inventory_csv)
+    columnar = ColumnarProductDatabase(inventory_csv)
+    assert len(columnar) == len(eager.products)
+    for barcode, product in eager.products.items():
+        view = columnar.get_product(barcode)
+        assert (view.get_barcode(), view.get_name(), view.get_price(), view.get_quantity()) == \
+            (product.get_barcode(), product.get_name(), product.get_price(), product.get_quantity())
+    assert columnar.get_product("000000000000") is None
+
+    milk = columnar.get_product("012345678905")
+    columnar.decrement_inventory("012345678905", 10)
+    assert milk.get_quantity() == 140 and milk.is_in_stock()
+    columnar.save_inventory()
+    assert ProductDatabase(ColumnarProductDatabase.SAVE_PATH).get_product("012345678905").get_quantity() == 140
+
+
+def test_columnar_members_keep_tier_behaviour(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    memberships_csv = str(repo_root / "db-data" / "memberships.csv")
+    ColumnarMemberDatabase.SAVE_PATH = str(tmp_path / "updated_memberships.csv")
+
+    eager = MemberDatabase(memberships_csv)
+    columnar = ColumnarMemberDatabase(memberships_csv)
+    for barcode, member in eager.membership.items():
+        view = columnar.get_member(barcode)
+        assert view.return_membership_type() == member.return_membership_type()
+        assert view.get_points() == member.get_points()
+        assert view.get_discount_basis_points() == member.get_discount_basis_points()
+        assert view.get_points_multiplier_basis_points() == member.get_points_multiplier_basis_points()
+
+    columnar.add_points("297458184493", 0.6225)
+    columnar.save_memberships()
+    saved = MemberDatabase(ColumnarMemberDatabase.SAVE_PATH)
+    assert saved.get_member("297458184493").get_points_cents() == eager.get_member("297458184493").get_points_cents() + 62
+
+
+def test_columnar_memory_per_record(tmp_path):
+    inventory_csv, memberships_csv = str(tmp_path / "inventory.csv"), str(tmp_path / "memberships.csv")
+    write_inventory(inventory_csv, 20000)
+    write_memberships(memberships_csv, 20000)
+
+    def retained(load):
+        tracemalloc.start()
+        database = load()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del database
+        return size
+
+    assert retained(lambda: ColumnarProductDatabase(inventory_csv)) * 3 < retained(lambda: ProductDatabase(inventory_csv))
+    assert retained(lambda: ColumnarMemberDatabase(memberships_csv)) * 3 < retained(lambda: MemberDatabase(memberships_csv))
+
+
+def test_columnar_save_drops_shadowed_rows(tmp_path):
+    inventory_csv = tmp_path / "inventory.csv"
+    inventory_csv.write_text(
+        "numeric_barcode,name,price,quantity\n"
+        "012345678905,Milk,2.99,150\n"
+        "034149633942,Bread,1.99,80\n"
+        "012345678905,Milk,3.49,20\n"
+    )
+    ColumnarProductDatabase.SAVE_PATH = str(tmp_path / "updated_inventory.csv")
+    columnar = ColumnarProductDatabase(str(inventory_csv))
+    columnar.decrement_inventory("012345678905", 5)
+    columnar.save_inventory()
+
+    lines = Path(ColumnarProductDatabase.SAVE_PATH).read_text().splitlines()
+    assert lines[1:] == ["034149633942,Bread,1.99,80", "012345678905,Milk,3.49,15"]
@@ -4,6 +4,7 @@ from datetime import datetime
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
+import pytest
 from coupon import PercentDiscountCoupon, FixedDiscountCoupon
 
 
@@ -30,7 +31,8 @@ def test_is_expired_false_for_future_date():
     c = PercentDiscountCoupon(
         barcode, expiration_date_not_expired, min_purchase, description, percent_value
     )
-    assert c._is_expired() is False
+    # Pinned to a transaction time before the expiration date
+    assert c._is_expired(datetime(2025, 6, 1)) is False
 
 
 def test_percent_discount_amount_matches_doctest():
@@ -44,11 +46,16 @@ def test_percent_discount_amount_matches_doctest():
         barcode, expiration_date_not_expired, min_purchase, description, percent_value
     )
 
+    now = datetime(2025, 6, 1)
+
     # 15.5% of 200.0 = 31.0
-    assert c.discount_amount(200.0) == 31.0
+    assert c.discount_amount(200.0, now) == 31.0
 
     # Below min_purchase => 0
-    assert c.discount_amount(15.0) == 0
+    assert c.discount_amount(15.0, now) == 0
+
+    # Expired at the transaction time => 0
+    assert c.discount_amount(200.0, datetime(2026, 1, 1)) == 0
 
 
 def test_fixed_discount_amount_matches_doctest():
@@ -62,8 +69,21 @@ def test_fixed_discount_amount_matches_doctest():
         barcode, expiration_date_not_expired, min_purchase, description, fixed_value
     )
 
-    assert c.discount_amount(200.0) == 30.0
+    now = datetime(2025, 6, 1)
+
+    assert c.discount_amount(200.0, now) == 30.0
+
+    assert c.discount_amount(20.0, now) == 20.0
+
+    assert c.discount_amount(10.0, now) == 0
+
 
-    assert c.discount_amount(20.0) == 20.0
+def test_coupon_value_attributes_are_read_only():
+    expiration_date = datetime(2025, 12, 31, 11, 59, 59)
+    percent = PercentDiscountCoupon("012345678925", expiration_date, 20.0, "15.5% off", 15.5)
+    fixed = FixedDiscountCoupon("012345678925", expiration_date, "20.00", "$30 off", "30.00")
 
-    assert c.discount_amount(10.0) == 0
+    assert (percent.min_purchase, percent.percent_value) == (20.0, 15.5)
+    assert (fixed.min_purchase, fixed.fixed_value) == (20.0, 30.0)
+    with pytest.raises(AttributeError):
+        fixed.fixed_value = 40.0
@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import csv_ingest
+from csv_ingest import ingest, read_rows
+from database import ProductDatabase, MemberDatabase
+from datagen import write_inventory
+
+
+def test_quoted_names_round_trip(tmp_path):
+    inventory_csv = tmp_path / "inventory.csv"
+    inventory_csv.write_text(
+        'numeric_barcode,name,price,quantity\n'
+        '012345678905,"Milk, 2% ""Organic""",2.99,150\n'
+        '034149633942,Bread,1.99,80\n'
+    )
+    ProductDatabase.SAVE_PATH = str(tmp_path / "updated_inventory.csv")
+    pdb = ProductDatabase(str(inventory_csv))
+    assert pdb.get_product("012345678905").get_name() == 'Milk, 2% "Organic"'
+    assert pdb.malformed_rows == []
+
+    pdb.save_inventory()
+    saved = ProductDatabase(ProductDatabase.SAVE_PATH)
+    assert saved.get_product("012345678905").get_name() == 'Milk, 2% "Organic"'
+    assert saved.get_product("034149633942").get_price_cents() == 199
+
+
+def test_malformed_rows_reported(tmp_path):
+    memberships_csv = tmp_path / "memberships.csv"
+    memberships_csv.write_text(
+        "numeric_barcode,name,tier,points\n"
+        "257274767454,Jane Doe,Silver,1200\n"
+        "\n"
+        '297458184493,"John Smith,Gold,5400\n'
+        "212345678901,Ann Lee,Bronze,10\n"
+        "223456789012,Bo Li,Gold,lots\n"
+        "234567890123,Cy Ng,Platinum,7\n"
+    )
+    mdb = MemberDatabase(str(memberships_csv))
+    assert sorted(mdb.membership) == ["234567890123", "257274767454"]
+    assert [(line, reason) for line, _, reason in mdb.malformed_rows] == [
+        (4, "Expected 4 fields, got 2"),
+        (5, "Unknown tier: Bronze"),
+        (6, "Invalid amount: 'lots'"),
+    ]
+
+
+def test_parallel_chunks_match_serial(tmp_path, monkeypatch):
+    monkeypatch.setattr(csv_ingest, "PARALLEL_MIN_BYTES", 0)
+    inventory_csv = str(tmp_path / "inventory.csv")
+    write_inventory(inventory_csv, 3000)
+    with open(inventory_csv, "a") as f:
+        f.write("012345678905,Broken row\n")
+
+    serial, serial_malformed = ingest(inventory_csv, "inventory")
+    chunked, chunked_malformed = ingest(inventory_csv, "inventory", processes=2, chunk_bytes=10_000)
+    assert list(chunked) == list(serial)
+    assert [product.get_quantity() for product in chunked.values()] == \
+        [product.get_quantity() for product in serial.values()]
+    assert chunked_malformed == serial_malformed == [(3002, ["012345678905", "Broken row"], "Expected 4 fields, got 2")]
+    assert sum(1 for _ in read_rows(inventory_csv, 0, 10_000)) + sum(1 for _ in read_rows(inventory_csv, 10_000)) == 3001
+
+
+def test_invalid_utf8_rows_reported(tmp_path, monkeypatch):
+    memberships_csv = tmp_path / "memberships.csv"
+    memberships_csv.write_bytes(
+        b"numeric_barcode,name,tier,points\n"
+        b"257274767454,Jane Doe,Silver,1200\n"
+        b"297458184493,Jos\xe9 Ruiz,Gold,5400\n"
+        b"234567890123,Cy Ng,Platinum,7\n"
+    )
+    expected = [(3, ["297458184493", "Jos\ufffd Ruiz", "Gold", "5400"], "Invalid UTF-8: invalid continuation byte")]
+    serial, serial_malformed = ingest(str(memberships_csv), "memberships")
+    monkeypatch.setattr(csv_ingest, "PARALLEL_MIN_BYTES", 0)
+    chunked, chunked_malformed = ingest(str(memberships_csv), "memberships", processes=2, chunk_bytes=40)
+    assert serial_malformed == chunked_malformed == expected
+    assert list(serial) == list(chunked) == ["257274767454", "234567890123"]
+    assert [(type(member), member.get_points_cents()) for member in chunked.values()] == \
+        [(type(member), member.get_points_cents()) for member in serial.values()]
@@ -1,4 +1,5 @@
 import sys
+from datetime import datetime
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
@@ -58,8 +59,35 @@ def test_coupon_database_loads_percent_coupon():
     repo_root = Path(__file__).resolve().parents[1]
     coupons_csv = repo_root / "db-data" / "coupons.csv"
 
-    cdb = CouponDatabase(str(coupons_csv))
+    cdb = CouponDatabase(str(coupons_csv), clock=lambda: datetime(2026, 1, 1))
     sample_coupon_barcode = "149234073227"
     coupon = cdb.get_coupon(sample_coupon_barcode)
 
     assert isinstance(coupon, PercentDiscountCoupon)
+
+
+def test_coupon_database_evicts_expired_coupons(tmp_path):
+    coupons_csv = tmp_path / "coupons.csv"
+    coupons_csv.write_text(
+        "numeric_barcode,expiration_date,discount_type,discount_value,min_purchase,description\n"
+        "111111111111,2024-01-31,fixed,1.00,0,$1 off\n"
+        "122222222222,2025-06-30,percent,10,0,10% off\n"
+        "133333333333,2026-12-31,fixed,2.00,0,$2 off,2026-06-01\n"
+    )
+    now = datetime(2025, 1, 1)
+    cdb = CouponDatabase(str(coupons_csv), clock=lambda: now)
+
+    # Already expired at load, so never kept
+    assert cdb.get_coupon("111111111111") is None
+    assert sorted(cdb.coupon) == ["122222222222", "133333333333"]
+    assert cdb.get_coupon("122222222222") is not None
+    # Not active yet
+    assert cdb.get_coupon("133333333333") is None
+    # A later transaction time rejects the coupon but leaves eviction to the clock
+    assert cdb.get_coupon("122222222222", datetime(2025, 7, 1)) is None
+    assert "122222222222" in cdb.coupon and cdb.evicted == 1
+
+    now = datetime(2026, 7, 1)
+    assert cdb.get_coupon("122222222222") is None
+    assert "122222222222" not in cdb.coupon and cdb.evicted == 2
+    assert cdb.get_coupon("133333333333").activation_date == datetime(2026, 6, 1)
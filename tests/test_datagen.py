@@ -0,0 +1,80 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from barcode import BarcodeProcessor
+from database import ProductDatabase, MemberDatabase, CouponDatabase
+from datagen import BarcodeSequence, barcode_to_binary, parse_basket_sizes, generate
+from tester_student import barcode_digits2binary, generate_last_digit, generate_barcode_12
+
+
+def test_generate_last_digit():
+    # Milk and Bread from db-data/inventory.csv
+    assert generate_last_digit("01234567890") == 5
+    assert generate_last_digit("03414963394") == 2
+    assert BarcodeProcessor().is_valid_check_digit(generate_barcode_12("coupon"))
+
+
+def test_barcode_sequence_unique_valid_and_seeded():
+    scanner = BarcodeProcessor()
+    sequence = BarcodeSequence("membership", seed=7)
+    barcodes = [sequence[i] for i in range(20000)]
+    assert len(set(barcodes)) == len(barcodes)
+    assert all(barcode[0] == "2" and scanner.is_valid_check_digit(barcode) for barcode in barcodes)
+    assert barcode_to_binary(barcodes[0]) == barcode_digits2binary(barcodes[0])
+    assert BarcodeSequence("membership", seed=7)[123] == barcodes[123]
+    assert BarcodeSequence("membership", seed=8)[123] != barcodes[123]
+    with pytest.raises(ValueError):
+        BarcodeSequence("gift card")
+
+
+def test_parse_basket_sizes():
+    import random
+
+    rng = random.Random(0)
+    assert parse_basket_sizes("fixed:3")(rng) == 3
+    assert all(2 <= parse_basket_sizes("uniform:2:5")(rng) <= 5 for _ in range(100))
+    sizes = [parse_basket_sizes("geometric:10")(rng) for _ in range(20000)]
+    assert min(sizes) >= 1 and 9 < sum(sizes) / len(sizes) < 11
+    with pytest.raises(ValueError):
+        parse_basket_sizes("poisson:4")
+
+
+def test_generate_store_loads_and_scans(tmp_path):
+    paths = generate(str(tmp_path / "a"), 500, 50, 20, carts=30, seed=1,
+                     basket_sizes="uniform:1:8", reversed_ratio=0.5, member_ratio=1.0, coupon_ratio=1.0)
+    again = generate(str(tmp_path / "b"), 500, 50, 20, carts=30, seed=1,
+                     basket_sizes="uniform:1:8", reversed_ratio=0.5, member_ratio=1.0, coupon_ratio=1.0)
+    for key in ("inventory", "memberships", "coupons"):
+        assert Path(paths[key]).read_text() == Path(again[key]).read_text()
+    assert [Path(p).read_text() for p in paths["scans"]] == [Path(p).read_text() for p in again["scans"]]
+
+    products = ProductDatabase(paths["inventory"])
+    members = MemberDatabase(paths["memberships"])
+    coupons = CouponDatabase(paths["coupons"], clock=lambda: datetime(2025, 1, 1))
+    assert len(products.products) == 500 and len(members.membership) == 50 and len(coupons.coupon) == 20
+
+    scanner = BarcodeProcessor()
+    reversed_scans = 0
+    for scan_path in paths["scans"]:
+        scans = Path(scan_path).read_text().split("\n")
+        assert 3 <= len(scans) <= 10
+        for scan in scans:
+            digits, status = scanner.decode(scan)
+            assert status == BarcodeProcessor.DECODE_OK
+            assert products.get_product(digits) or members.get_member(digits) or coupons.get_coupon(digits)
+            reversed_scans += scan != barcode_to_binary(digits)
+    assert reversed_scans > 0
+
+
+def test_noise_ratio_corrupts_scans(tmp_path):
+    scan_paths = generate(str(tmp_path), 100, 0, 0, carts=5, basket_sizes="fixed:20", noise_ratio=1.0)["scans"]
+    scanner = BarcodeProcessor()
+    for scan_path in scan_paths:
+        for scan in Path(scan_path).read_text().split("\n"):
+            # One flipped bit always breaks a guard or the parity of a module
+            assert scanner.decode(scan)[1] != BarcodeProcessor.DECODE_OK
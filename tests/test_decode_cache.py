@@ -0,0 +1,73 @@
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from decode_cache import DecodeCache
+from pos import POSSystem
+from store_backend import StoreBackend
+
+
+def test_lru_eviction_and_stats():
+    cache = DecodeCache(capacity=2)
+    decoded = []
+
+    def decode(scan):
+        decoded.append(scan)
+        return scan.upper(), "product"
+
+    assert cache.lookup("a", decode) == ("A", "product")
+    cache.lookup("b", decode)
+    cache.lookup("a", decode)
+    # "b" is now the least recently used
+    cache.lookup("c", decode)
+    cache.lookup("a", decode)
+    cache.lookup("b", decode)
+
+    assert decoded == ["a", "b", "c", "b"]
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (2, 4, 2, 2)
+    assert stats["hit_rate"] == pytest.approx(2 / 6)
+
+    with pytest.raises(ValueError):
+        DecodeCache(capacity=0)
+
+
+def test_cache_is_shared_across_lanes():
+    repo_root = Path(__file__).resolve().parents[1]
+    store_backend = StoreBackend(
+        str(repo_root / "db-data" / "inventory.csv"),
+        str(repo_root / "db-data" / "memberships.csv"),
+        str(repo_root / "db-data" / "coupons.csv"),
+        clock=lambda: datetime(2026, 1, 1),
+    )
+    scans = (repo_root / "cart-data" / "scan_1_binary.txt").read_text().split()
+    cache = DecodeCache()
+    uncached = POSSystem(store_backend=store_backend, clock=lambda: datetime(2026, 1, 1))
+    uncached.process_barcodes(scans)
+
+    totals = []
+
+    def run_lane():
+        pos = POSSystem(store_backend=store_backend, clock=lambda: datetime(2026, 1, 1), decode_cache=cache)
+        pos.process_barcodes(scans + ["1" * 95, "101"])
+        totals.append(pos.get_current_cart().calculate_total_cents())
+
+    # The first lane fills the cache; the other lanes then only hit it
+    run_lane()
+    lanes = [threading.Thread(target=run_lane) for _ in range(3)]
+    for lane in lanes:
+        lane.start()
+    for lane in lanes:
+        lane.join()
+
+    assert totals == [uncached.get_current_cart().calculate_total_cents()] * 4
+    # The rejected 95-bit scan is cached too; the 3-bit one is not
+    distinct = len(set(scans)) + 1
+    stats = cache.get_stats()
+    assert stats["size"] == stats["misses"] == distinct
+    assert stats["hits"] == 4 * (len(scans) + 1) - distinct
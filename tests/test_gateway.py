@@ -0,0 +1,103 @@
+import sys
+import asyncio
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from gateway import ScannerGateway
+from store_backend import StoreBackend
+from database import ProductDatabase, MemberDatabase
+
+
+def _store_backend(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    ProductDatabase.SAVE_PATH = str(tmp_path / "updated_inventory.csv")
+    MemberDatabase.SAVE_PATH = str(tmp_path / "updated_memberships.csv")
+    return StoreBackend(
+        str(repo_root / "db-data" / "inventory.csv"),
+        str(repo_root / "db-data" / "memberships.csv"),
+        str(repo_root / "db-data" / "coupons.csv"),
+    )
+
+
+def _scans():
+    repo_root = Path(__file__).resolve().parents[1]
+    # coupon, membership, cheddar cheese, apple
+    return (repo_root / "cart-data" / "scan_1_binary.txt").read_text().split()
+
+
+def test_gateway_serves_independent_lanes(tmp_path):
+    store_backend = _store_backend(tmp_path)
+    scans = _scans()
+
+    async def lane(port, lines):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        replies = []
+        for line in lines:
+            writer.write(f"{line}\n".encode())
+            await writer.drain()
+            replies.append((await reader.readline()).decode().strip())
+        writer.close()
+        await writer.wait_closed()
+        return replies
+
+    async def scenario():
+        server = await ScannerGateway(store_backend).start_tcp()
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await asyncio.gather(
+                lane(port, [scans[2], scans[3], "CHECKOUT", scans[3]]),
+                lane(port, [scans[3][::-1], "not a barcode", "CHECKOUT"]),
+            )
+
+    first, second = asyncio.run(scenario())
+    assert first == ["TOTAL 4.50", "TOTAL 5.70", "PAID 5.70", "TOTAL 1.20"]
+    assert second == ["TOTAL 1.20", "TOTAL 1.20", "PAID 1.20"]
+    assert store_backend.get_product("027222235225").get_quantity() == 198
+    assert store_backend.get_product("075741757551").get_quantity() == 59
+
+
+def test_gateway_backpressure_processes_every_flooded_scan(tmp_path):
+    store_backend = _store_backend(tmp_path)
+    apple = _scans()[3]
+
+    async def scenario():
+        server = await ScannerGateway(store_backend, queue_size=2).start_tcp()
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(f"{apple}\n".encode() * 50)
+            await writer.drain()
+            replies = [(await reader.readline()).decode().strip() for _ in range(50)]
+            writer.close()
+            return replies
+
+    replies = asyncio.run(scenario())
+    assert replies[-1] == "TOTAL 60.00"
+
+
+def test_gateway_reports_a_failed_checkout_and_keeps_serving(tmp_path):
+    store_backend = _store_backend(tmp_path)
+    apple = _scans()[3]
+    store_backend.enable_group_commit()
+
+    def fail(fsync=False):
+        raise OSError("disk full")
+
+    store_backend.product_database.save_inventory = fail
+
+    async def scenario():
+        server = await ScannerGateway(store_backend).start_tcp()
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            replies = []
+            for line in [apple, "CHECKOUT", "CHECKOUT", apple]:
+                writer.write(f"{line}\n".encode())
+                await writer.drain()
+                replies.append((await reader.readline()).decode().strip())
+            writer.close()
+            return replies
+
+    replies = asyncio.run(scenario())
+    assert replies == ["TOTAL 1.20", "ERROR Group commit flush failed", "ERROR Group commit flush failed", "TOTAL 1.20"]
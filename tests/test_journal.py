@@ -0,0 +1,94 @@
+import sys
+import shutil
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from journal import InventoryJournal, file_checksum
+from database import ProductDatabase
+
+
+def _snapshot(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    snapshot = tmp_path / "inventory.csv"
+    shutil.copy(repo_root / "db-data" / "inventory.csv", snapshot)
+    return str(snapshot)
+
+
+def test_journal_round_trip_and_torn_tail(tmp_path):
+    journal_path = str(tmp_path / "inventory.journal")
+    journal = InventoryJournal(journal_path, 0xABC)
+    journal.append({"012345678905": -2, "034149633942": -1})
+    journal.append({"012345678905": -1}, fsync=True)
+
+    with open(journal_path, "a") as f:
+        f.write("0123456")
+
+    reopened = InventoryJournal(journal_path, 0xABC)
+    assert list(reopened.replay()) == [("012345678905", -2), ("034149633942", -1), ("012345678905", -1)]
+    assert Path(journal_path).read_text().endswith("-1\n")
+
+    # A journal written against another snapshot is discarded
+    assert InventoryJournal(journal_path, 0xDEF).record_count() == 0
+
+
+def test_product_database_journal_mode_replays_on_startup(tmp_path):
+    inventory_path = _snapshot(tmp_path)
+    journal_path = str(tmp_path / "inventory.journal")
+    ProductDatabase.SAVE_PATH = str(tmp_path / "updated_inventory.csv")
+    original = Path(inventory_path).read_text()
+
+    pdb = ProductDatabase(inventory_path, journal_path=journal_path)
+    pdb.decrement_inventory("012345678905", 3)
+    pdb.decrement_inventory("012345678905", 2)
+    pdb.save_inventory()
+
+    assert Path(inventory_path).read_text() == original
+    assert not Path(ProductDatabase.SAVE_PATH).exists()
+    assert Path(journal_path).read_text().splitlines()[1:] == ["012345678905,-5"]
+
+    restarted = ProductDatabase(inventory_path, journal_path=journal_path)
+    assert restarted.get_product("012345678905").get_quantity() == 145
+
+
+def test_product_database_compaction_writes_new_snapshot(tmp_path):
+    inventory_path = _snapshot(tmp_path)
+    journal_path = str(tmp_path / "inventory.journal")
+
+    pdb = ProductDatabase(inventory_path, journal_path=journal_path, compact_every=2)
+    pdb.decrement_inventory("012345678905", 1)
+    pdb.save_inventory()
+    pdb.decrement_inventory("034149633942", 1)
+    pdb.save_inventory()
+
+    assert pdb.journal.record_count() == 0
+    assert "012345678905,Milk,2.99,149" in Path(inventory_path).read_text()
+    assert InventoryJournal(journal_path, file_checksum(inventory_path)).record_count() == 0
+
+    restarted = ProductDatabase(inventory_path, journal_path=journal_path)
+    assert restarted.get_product("012345678905").get_quantity() == 149
+    assert restarted.get_product("034149633942").get_quantity() == 79
+
+
+def test_compaction_keeps_malformed_rows(tmp_path):
+    inventory_path = tmp_path / "inventory.csv"
+    inventory_path.write_bytes(
+        b"numeric_barcode,name,price,quantity\n"
+        b"012345678905,Milk,2.99,150\n"
+        b"034149633942,Bread,1.x9,80\n"
+        b"075741757551,Cheddar Cheese,4.50,60\n"
+        b"027222235225,Caf\xe9,1.20,200"
+    )
+    journal_path = str(tmp_path / "inventory.journal")
+    pdb = ProductDatabase(str(inventory_path), journal_path=journal_path)
+    pdb.decrement_inventory("012345678905", 1)
+    pdb.compact()
+    pdb.compact()
+
+    lines = inventory_path.read_bytes().split(b"\n")
+    assert lines[3:] == [b"034149633942,Bread,1.x9,80", b"027222235225,Caf\xe9,1.20,200", b""]
+    restarted = ProductDatabase(str(inventory_path), journal_path=journal_path)
+    assert restarted.get_product("012345678905").get_quantity() == 149
+    assert [(line, fields[0]) for line, fields, _ in restarted.malformed_rows] == \
+        [(4, "034149633942"), (5, "027222235225")]
+    assert [row[0] for row in pdb.malformed_rows] == [4, 5]
@@ -0,0 +1,57 @@
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from latency import LatencyHistogram, LatencyRecorder, SCAN_STAGES, CHECKOUT_STAGES
+from pos import POSSystem
+from database import ProductDatabase, MemberDatabase
+from sales_ledger import SalesLedger
+
+
+def test_histogram_percentiles_within_bucket_error():
+    histogram = LatencyHistogram()
+    assert histogram.get_summary()["p99_ns"] == 0
+    for value in range(1, 10_001):
+        histogram.record(value * 1000)
+
+    summary = histogram.get_summary()
+    assert summary["count"] == 10_000 and summary["max_ns"] == 10_000_000
+    assert summary["mean_ns"] == 5_000_500
+    assert 5_000_000 <= summary["p50_ns"] <= 5_000_000 * 17 / 16
+    assert 9_900_000 <= summary["p99_ns"] <= 10_000_000
+    # Durations past the last bucket still report the exact maximum
+    histogram.record(1 << 45)
+    assert histogram.percentile(1.0) == 1 << 45
+    assert len(histogram.counts) == LatencyHistogram.BUCKETS
+
+
+def test_pos_records_each_stage_and_dumps(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    ProductDatabase.SAVE_PATH = str(tmp_path / "updated_inventory.csv")
+    MemberDatabase.SAVE_PATH = str(tmp_path / "updated_memberships.csv")
+    latency = LatencyRecorder()
+    pos = POSSystem(
+        str(repo_root / "db-data" / "inventory.csv"),
+        str(repo_root / "db-data" / "memberships.csv"),
+        str(repo_root / "db-data" / "coupons.csv"),
+        clock=lambda: datetime(2026, 1, 1),
+        latency=latency,
+        ledger=SalesLedger(str(tmp_path / "ledger")),
+    )
+    dump_path = str(tmp_path / "latency.json")
+    latency.start_dump(dump_path, interval=0.01)
+    pos.process_barcodes(str(repo_root / "cart-data" / "scan_1_binary.txt"))
+    assert pos.checkout() == 0.41
+    time.sleep(0.05)
+    latency.stop_dump()
+
+    summary = latency.get_summary()
+    assert set(summary) == set(SCAN_STAGES) | set(CHECKOUT_STAGES)
+    assert summary["scan.cart"]["count"] == 4
+    assert all(stage["max_ns"] >= stage["p99_ns"] >= stage["p50_ns"] > 0 for stage in summary.values())
+    assert json.loads(Path(dump_path).read_text())["stages"] == summary
+
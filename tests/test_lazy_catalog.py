@@ -0,0 +1,115 @@
+import sys
+import shutil
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from database import ProductDatabase
+from lazy_catalog import LazyProductDatabase
+from datagen import BarcodeSequence, write_inventory
+
+
+def test_lazy_lookups_and_lru_stats(tmp_path):
+    inventory_csv = str(tmp_path / "inventory.csv")
+    write_inventory(inventory_csv, 1000, seed=2)
+    barcodes = BarcodeSequence("product", seed=2)
+    eager = ProductDatabase(inventory_csv)
+    lazy = LazyProductDatabase(inventory_csv, cache_size=10)
+
+    for i in (5, 500, 999, 5):
+        product = lazy.get_product(barcodes[i])
+        expected = eager.get_product(barcodes[i])
+        assert (product.get_name(), product.get_price_cents(), product.get_quantity()) == \
+            (expected.get_name(), expected.get_price_cents(), expected.get_quantity())
+    assert lazy.get_product("000000000000") is None
+    assert lazy.get_product("not a barcode") is None
+
+    for i in range(100):
+        lazy.get_product(barcodes[i])
+    stats = lazy.get_cache_stats()
+    assert stats["hits"] == 1 + 1
+    assert stats["misses"] == 3 + 99
+    assert stats["cached"] == 10
+    assert stats["evictions"] == stats["misses"] - 10
+    assert stats["catalog"] == 1000
+
+
+def test_modified_rows_pinned_until_saved(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    inventory_csv = tmp_path / "inventory.csv"
+    shutil.copy(repo_root / "db-data" / "inventory.csv", inventory_csv)
+    LazyProductDatabase.SAVE_PATH = str(tmp_path / "updated_inventory.csv")
+    lazy = LazyProductDatabase(str(inventory_csv), cache_size=1)
+
+    milk_barcode = "012345678905"
+    lazy.decrement_inventory(milk_barcode, 10)
+    for barcode in ProductDatabase(str(inventory_csv)).products:
+        lazy.get_product(barcode)
+    assert lazy.get_cache_stats()["pinned"] == 1
+    assert lazy.get_product(milk_barcode).get_quantity() == 140
+
+    lazy.save_inventory()
+    assert lazy.get_cache_stats()["pinned"] == 0
+    saved = ProductDatabase(LazyProductDatabase.SAVE_PATH)
+    original = ProductDatabase(str(inventory_csv))
+    assert saved.get_product(milk_barcode).get_quantity() == 140
+    assert saved.products.keys() == original.products.keys()
+    for barcode, product in original.products.items():
+        if barcode != milk_barcode:
+            assert saved.get_product(barcode).get_quantity() == product.get_quantity()
+
+    # Reads now come from the saved file, so the change survives eviction
+    for barcode in original.products:
+        lazy.get_product(barcode)
+    assert lazy.get_product(milk_barcode).get_quantity() == 140
+    lazy.close()
+
+
+def test_malformed_rows_recorded_and_not_served(tmp_path):
+    inventory_csv = tmp_path / "inventory.csv"
+    inventory_csv.write_text(
+        "numeric_barcode,name,price,quantity\n"
+        "012345678905,Milk,2.99,150\n"
+        "ABC123,Gum,0.99,10\n"
+        "034149633942,Bread,cheap,10\n"
+        "075741757551,Cheddar Cheese,4.50,90\n"
+        "075741757551,Cheddar Cheese\n"
+    )
+    LazyProductDatabase.SAVE_PATH = str(tmp_path / "updated_inventory.csv")
+    lazy = LazyProductDatabase(str(inventory_csv))
+    assert [(line, reason) for line, _, reason in lazy.malformed_rows] == [(3, "Invalid barcode: ABC123")]
+
+    assert lazy.get_product("034149633942") is None
+    assert lazy.get_product("034149633942") is None
+    # The earlier, well-formed row of a barcode is served, as ProductDatabase keeps it
+    assert lazy.get_product("075741757551").get_quantity() == 90
+    expected = [(3, "Invalid barcode: ABC123"), (4, "Invalid amount: 'cheap'"), (6, "Expected 4 fields, got 2")]
+    assert sorted((line, reason) for line, _, reason in lazy.malformed_rows) == expected
+    assert [(line, reason) for line, _, reason in ProductDatabase(str(inventory_csv)).malformed_rows] == expected[1:]
+
+    lazy.decrement_inventory("012345678905", 10)
+    lazy.save_inventory()
+    assert [(line, reason) for line, _, reason in lazy.malformed_rows] == expected
+    assert lazy.get_product("034149633942") is None
+    assert lazy.get_product("012345678905").get_quantity() == 140
+    lazy.close()
+
+
+def test_only_twelve_digit_barcodes_indexed(tmp_path):
+    inventory_csv = tmp_path / "inventory.csv"
+    inventory_csv.write_text(
+        "numeric_barcode,name,price,quantity\n"
+        "012345678905,Milk,2.99,150\n"
+        "12345678905,Short Milk,1.99,5\n"
+        "123456789012345678901234567890,Long Milk,1.99,5\n"
+    )
+    lazy = LazyProductDatabase(str(inventory_csv))
+    assert [(line, reason) for line, _, reason in lazy.malformed_rows] == \
+        [(3, "Invalid barcode: 12345678905"), (4, "Invalid barcode: 123456789012345678901234567890")]
+
+    assert lazy.get_product("012345678905").get_name() == "Milk"
+    assert lazy.get_product("12345678905") is None
+    assert lazy.get_product("0012345678905") is None
+    assert lazy.get_product("123456789012345678901234567890") is None
+    assert lazy.get_cache_stats()["catalog"] == 1
+    lazy.close()
@@ -0,0 +1,113 @@
+import sys
+import random
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from locking import LockStripes
+from pos import POSSystem
+from store_backend import StoreBackend
+from database import ProductDatabase, MemberDatabase, CouponDatabase
+
+
+def test_lock_stripes_map_keys_to_stable_locks():
+    stripes = LockStripes(count=4)
+    assert stripes.lock_for("012345678905") is stripes.lock_for("012345678905")
+    with stripes.all():
+        assert not stripes.lock_for("anything").acquire(blocking=False)
+    assert stripes.lock_for("anything").acquire(blocking=False)
+
+
+@pytest.mark.parametrize("compact_every", [1000, 3])
+def test_concurrent_lanes_lose_no_updates(tmp_path, compact_every):
+    repo_root = Path(__file__).resolve().parents[1]
+    inventory_csv = tmp_path / "inventory.csv"
+    inventory_csv.write_text(
+        "numeric_barcode,name,price,quantity\n"
+        "012345678905,Milk,2.99,1000000\n"
+        "034149633942,Bread,1.99,1000000\n"
+        "075741757551,Cheddar Cheese,4.50,1000000\n"
+    )
+    ProductDatabase.SAVE_PATH = str(tmp_path / "updated_inventory.csv")
+    MemberDatabase.SAVE_PATH = str(tmp_path / "updated_memberships.csv")
+
+    journal_path = str(tmp_path / "inventory.journal")
+    # A small compact_every compacts while other lanes keep decrementing
+    store_backend = StoreBackend.from_databases(
+        ProductDatabase(str(inventory_csv), journal_path=journal_path, compact_every=compact_every),
+        MemberDatabase(str(repo_root / "db-data" / "memberships.csv")),
+        CouponDatabase(str(repo_root / "db-data" / "coupons.csv")),
+    )
+    # Keep file writes off the lanes so they spend their time contending on updates
+    store_backend.enable_group_commit(max_delay=0.01, ack_durable=False)
+    barcodes = ["012345678905", "034149633942", "075741757551"]
+    member = store_backend.get_member("223052518921")
+    starting_points = member.get_points_cents()
+
+    lanes, checkouts = 16, 300
+    sold = [dict.fromkeys(barcodes, 0) for _ in range(lanes)]
+    earned = [0] * lanes
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    def lane(index):
+        pos = POSSystem(store_backend=store_backend)
+        rng = random.Random(index)
+        for _ in range(checkouts):
+            cart = pos.start_new_cart()
+            cart.add_membership(member)
+            for barcode in barcodes:
+                quantity = rng.randint(1, 5)
+                cart.add_item(store_backend.get_product(barcode), quantity)
+                sold[index][barcode] += quantity
+            total_cents = cart.calculate_total_cents()
+            pos.checkout()
+            # Platinum earns 2 points per dollar
+            earned[index] += total_cents * 2
+
+    try:
+        threads = [threading.Thread(target=lane, args=(i,)) for i in range(lanes)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+        store_backend.close()
+
+    for barcode in barcodes:
+        total_sold = sum(lane_sold[barcode] for lane_sold in sold)
+        assert store_backend.get_product(barcode).get_quantity() == 1000000 - total_sold
+    assert member.get_points_cents() == starting_points + sum(earned)
+
+    # Every delta made it into the journal exactly once
+    saved = ProductDatabase(str(inventory_csv), journal_path=journal_path)
+    for barcode in barcodes:
+        assert saved.get_product(barcode).get_quantity() == store_backend.get_product(barcode).get_quantity()
+
+
+def test_decrements_during_compaction_are_journaled_once(tmp_path):
+    inventory_csv = tmp_path / "inventory.csv"
+    inventory_csv.write_text("numeric_barcode,name,price,quantity\n012345678905,Milk,2.99,100\n")
+    journal_path = str(tmp_path / "inventory.journal")
+    product_database = ProductDatabase(str(inventory_csv), journal_path=journal_path, compact_every=1)
+    write_inventory = product_database._write_inventory
+
+    def write_while_a_lane_decrements(*args):
+        product_database.decrement_inventory("012345678905", 5)
+        write_inventory(*args)
+
+    product_database.decrement_inventory("012345678905", 10)
+    product_database._write_inventory = write_while_a_lane_decrements
+    product_database.save_inventory()
+    product_database._write_inventory = write_inventory
+    product_database.compact_every = 1000
+    # Journals the decrement made while the snapshot was written
+    product_database.save_inventory()
+
+    assert product_database.get_product("012345678905").get_quantity() == 85
+    saved = ProductDatabase(str(inventory_csv), journal_path=journal_path)
+    assert saved.get_product("012345678905").get_quantity() == 85
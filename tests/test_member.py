@@ -3,6 +3,7 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
+import pytest
 from member import SilverMember, GoldMember, PlatinumMember
 
 
@@ -58,3 +59,15 @@ def test_platinum_member_properties():
     assert m.return_membership_type() == "Platinum"
     assert m.get_points_multiplier() == 2
     assert m.get_discount_rate() == 0.1
+
+
+def test_member_points_attribute_and_basis_point_constants():
+    m = GoldMember("012345678912", "David", 10.25)
+
+    assert m.points == 10.25
+    with pytest.raises(AttributeError):
+        m.points = 20
+    assert m.get_points_multiplier_basis_points() == GoldMember.points_multiplier_basis_points == 15000
+    assert m.get_discount_basis_points() == GoldMember.discount_basis_points == 500
+    assert SilverMember.points_multiplier_basis_points == 11000
+    assert PlatinumMember.discount_basis_points == 1000
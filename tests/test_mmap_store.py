@@ -0,0 +1,89 @@
+import sys
+import mmap
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+from mmap_store import MmapProductDatabase, import_csv, export_csv
+from store_backend import StoreBackend
+from database import ProductDatabase, MemberDatabase, CouponDatabase
+
+
+def _store(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    store_path = str(tmp_path / "inventory.bin")
+    import_csv(str(repo_root / "db-data" / "inventory.csv"), store_path)
+    return store_path
+
+
+def test_mmap_store_lookup_and_in_place_decrement(tmp_path):
+    store_path = _store(tmp_path)
+
+    pdb = MmapProductDatabase(store_path)
+    milk = pdb.get_product("012345678905")
+    assert milk.get_name() == "Milk"
+    assert milk.get_price_cents() == 299
+    assert pdb.get_product("012345678905") is milk
+    assert pdb.get_product("") is None
+
+    size = Path(store_path).stat().st_size
+    pdb.decrement_inventory("012345678905", 10)
+    pdb.save_inventory()
+    assert milk.get_quantity() == 140
+    assert Path(store_path).stat().st_size == size
+    pdb.close()
+
+    reopened = MmapProductDatabase(store_path)
+    assert reopened.get_product("012345678905").get_quantity() == 140
+    reopened.close()
+
+
+def test_pages_dirtied_during_a_save_are_kept_for_the_next(tmp_path):
+    pdb = MmapProductDatabase(_store(tmp_path))
+
+    class DecrementWhileFlushing(set):
+        def __iter__(self):
+            # Another lane decrements while the save walks the pages
+            pdb.decrement_inventory("012345678905", 1)
+            return super().__iter__()
+
+    pdb.decrement_inventory("012345678905", 1)
+    pdb._dirty_pages = DecrementWhileFlushing(pdb._dirty_pages)
+    pdb.save_inventory()
+    assert pdb._dirty_pages == {pdb._record_offset(pdb.slots["012345678905"]) // mmap.PAGESIZE}
+    pdb.close()
+
+
+def test_mmap_store_csv_round_trip(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    inventory_csv = repo_root / "db-data" / "inventory.csv"
+    store_path = _store(tmp_path)
+
+    exported = tmp_path / "exported.csv"
+    export_csv(store_path, str(exported))
+    original = ProductDatabase(str(inventory_csv)).products.values()
+    round_trip = ProductDatabase(str(exported)).products.values()
+    assert [(p.get_barcode(), p.get_name(), p.get_price_cents(), p.get_quantity()) for p in original] == \
+        [(p.get_barcode(), p.get_name(), p.get_price_cents(), p.get_quantity()) for p in round_trip]
+
+    bad_csv = tmp_path / "bad.csv"
+    bad_csv.write_text("numeric_barcode,name,price,quantity\n123,Milk,2.99,1\n")
+    with pytest.raises(ValueError, match="Invalid barcode"):
+        import_csv(str(bad_csv), str(tmp_path / "bad.bin"))
+
+
+def test_store_backend_from_databases(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    pdb = MmapProductDatabase(_store(tmp_path))
+    store_backend = StoreBackend.from_databases(
+        pdb,
+        MemberDatabase(str(repo_root / "db-data" / "memberships.csv")),
+        CouponDatabase(str(repo_root / "db-data" / "coupons.csv")),
+    )
+
+    apple = store_backend.get_product("027222235225")
+    store_backend.decrease_product_quantity(apple, 1)
+    store_backend.save_inventory()
+    assert apple.get_quantity() == 199
+    pdb.close()
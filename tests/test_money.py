@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+from money import to_cents, from_cents, format_cents, to_basis_points, percent_to_basis_points, apply_rate
+
+
+def test_to_cents_parses_strings_exactly_and_rounds_half_up():
+    assert to_cents("4.50") == 450
+    assert to_cents("2.99") == 299
+    assert to_cents("5.") == 500
+    assert to_cents(".5") == 50
+    assert to_cents("5400.6225") == 540062
+    assert to_cents("1.005") == 101
+    assert to_cents(2.675) == 268
+    assert to_cents(0.1 + 0.2) == 30
+    assert to_cents(10) == 1000
+    assert to_cents("-1.005") == -101
+
+
+def test_to_cents_rejects_garbage():
+    for bad in ["", "-", "abc", "1,00"]:
+        with pytest.raises(ValueError, match="Invalid amount"):
+            to_cents(bad)
+
+
+def test_rates_and_formatting():
+    assert to_basis_points(0.05) == 500
+    assert to_basis_points(1.1) == 11000
+    assert percent_to_basis_points("15.5") == 1550
+    assert apply_rate(570, 500) == 29
+    assert apply_rate(20000, 1550) == 3100
+    assert from_cents(299) == 2.99
+    assert format_cents(450) == "4.50"
+    assert format_cents(-5) == "-0.05"
@@ -0,0 +1,68 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+from persistence import GroupCommitter
+from store_backend import StoreBackend
+from database import ProductDatabase, MemberDatabase
+
+
+def test_group_committer_merges_saves_into_one_flush():
+    flushed = []
+    committer = GroupCommitter(lambda: flushed.append(time.monotonic()), max_delay=0.2, max_batch=3)
+
+    tickets = [committer.submit() for _ in range(3)]
+    committer.wait(tickets[-1], timeout=5)
+    assert len(flushed) == 1
+
+    # A lone save is flushed once the window closes
+    committer.wait(committer.submit(), timeout=5)
+    assert len(flushed) == 2
+    committer.close()
+
+
+def test_group_committer_reports_flush_failures():
+    def fail():
+        raise OSError("disk full")
+
+    committer = GroupCommitter(fail, max_delay=0)
+    with pytest.raises(RuntimeError, match="flush failed"):
+        committer.wait(committer.submit(), timeout=5)
+    # The flusher has stopped, so later saves (even ack-immediately ones) must not be accepted
+    with pytest.raises(RuntimeError, match="flush failed"):
+        committer.submit()
+    committer.close()
+
+
+def test_store_backend_group_commit_modes(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    ProductDatabase.SAVE_PATH = str(tmp_path / "updated_inventory.csv")
+    MemberDatabase.SAVE_PATH = str(tmp_path / "updated_memberships.csv")
+
+    store_backend = StoreBackend(
+        str(repo_root / "db-data" / "inventory.csv"),
+        str(repo_root / "db-data" / "memberships.csv"),
+        str(repo_root / "db-data" / "coupons.csv"),
+    )
+    store_backend.enable_group_commit(max_delay=0.05)
+    milk = store_backend.get_product("012345678905")
+    store_backend.decrease_product_quantity(milk, 10)
+    store_backend.save_inventory()
+    store_backend.save_memberships()
+    store_backend.sync()
+    assert "012345678905,Milk,2.99,140" in Path(ProductDatabase.SAVE_PATH).read_text()
+    assert Path(MemberDatabase.SAVE_PATH).exists()
+    assert store_backend.group_committer.flush_count == 1
+
+    store_backend.enable_group_commit(max_delay=10, ack_durable=False)
+    store_backend.decrease_product_quantity(milk, 10)
+    store_backend.save_inventory()
+    store_backend.sync()
+    assert "012345678905,Milk,2.99,140" in Path(ProductDatabase.SAVE_PATH).read_text()
+
+    # Closing flushes what is still pending
+    store_backend.close()
+    assert "012345678905,Milk,2.99,130" in Path(ProductDatabase.SAVE_PATH).read_text()
@@ -1,6 +1,6 @@
 import sys
 from pathlib import Path
-import math
+from datetime import datetime
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
@@ -19,7 +19,8 @@ def test_pos_process_barcodes_and_checkout_creates_updated_files(tmp_path):
     ProductDatabase.SAVE_PATH = str(tmp_path / "updated_inventory.csv")
     MemberDatabase.SAVE_PATH = str(tmp_path / "updated_memberships.csv")
 
-    pos = POSSystem(str(inventory_csv), str(memberships_csv), str(coupons_csv))
+    # The $5 coupon in the scan expires on 2026-06-15
+    pos = POSSystem(str(inventory_csv), str(memberships_csv), str(coupons_csv), clock=lambda: datetime(2026, 1, 1))
     pos.process_barcodes(str(scan_binary))
 
     cart = pos.get_current_cart()
@@ -32,8 +33,9 @@ def test_pos_process_barcodes_and_checkout_creates_updated_files(tmp_path):
     assert cart.get_membership().get_name() == "John Smith"
     assert cart.get_membership().return_membership_type() == "Gold"
 
+    # 5.70 - 5.00 coupon - 0.29 Gold discount (5% of 5.70, rounded half up)
     total = pos.checkout()
-    assert math.isclose(total, 0.415, abs_tol=0.001)
+    assert total == 0.41
 
     assert Path(MemberDatabase.SAVE_PATH).exists()
     assert Path(ProductDatabase.SAVE_PATH).exists()
@@ -75,3 +77,58 @@ def test_identify_barcode_type_rejects_invalid():
 
     with pytest.raises(ValueError, match="Invalid barcode"):
         pos._identify_barcode_type("123")  # wrong length
+
+
+def test_process_barcodes_follow_mode_updates_cart_per_line(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    scans = (repo_root / "cart-data" / "scan_1_binary.txt").read_text().split()
+
+    pos = POSSystem(
+        str(repo_root / "db-data" / "inventory.csv"),
+        str(repo_root / "db-data" / "memberships.csv"),
+        str(repo_root / "db-data" / "coupons.csv"),
+    )
+
+    # Iterables are consumed lazily
+    pos.process_barcodes(iter(scans[1:2]))
+    assert pos.get_current_cart().get_membership().get_name() == "John Smith"
+
+    import threading
+
+    feed = tmp_path / "feed.txt"
+    feed.write_text(scans[2] + "\n")
+    stop = threading.Event()
+    lane = threading.Thread(
+        target=pos.process_barcodes,
+        args=(str(feed),),
+        kwargs={"follow": True, "poll_interval": 0.01, "stop_event": stop},
+    )
+    lane.start()
+    with open(feed, "a") as f:
+        f.write(scans[3] + "\n")
+    stop.set()
+    lane.join(timeout=5)
+
+    assert not lane.is_alive()
+    item_names = [item.get_name() for item in pos.get_current_cart().get_items()]
+    assert sorted(item_names) == ["Apple", "Cheddar Cheese"]
+
+
+def test_checkout_decrements_each_sku_by_its_quantity(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    ProductDatabase.SAVE_PATH = str(tmp_path / "updated_inventory.csv")
+    MemberDatabase.SAVE_PATH = str(tmp_path / "updated_memberships.csv")
+
+    pos = POSSystem(
+        str(repo_root / "db-data" / "inventory.csv"),
+        str(repo_root / "db-data" / "memberships.csv"),
+        str(repo_root / "db-data" / "coupons.csv"),
+    )
+    apple_scan = (repo_root / "cart-data" / "scan_1_binary.txt").read_text().split()[3]
+    pos.process_barcodes([apple_scan] * 3)
+
+    cart = pos.get_current_cart()
+    assert cart.get_quantity("027222235225") == 3
+
+    pos.checkout()
+    assert pos.store_backend.get_product("027222235225").get_quantity() == 197
@@ -3,6 +3,7 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
+import pytest
 from product import Product
 
 
@@ -20,3 +21,12 @@ def test_product_getters_and_stock_and_decrease_quantity():
     p.decrease_quantity(5)
     assert p.get_quantity() == 0
     assert p.is_in_stock() is False
+
+
+def test_product_price_attribute_is_read_only():
+    p = Product("012345678905", "Test", "4.50", 5)
+
+    assert p.price == 4.5
+    assert p.price_cents == 450
+    with pytest.raises(AttributeError):
+        p.price = 5.0
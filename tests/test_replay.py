@@ -0,0 +1,64 @@
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from replay import replay_scan_files
+from database import ProductDatabase, MemberDatabase
+from datagen import barcode_to_binary
+
+
+def test_replay_merges_deltas_from_all_workers(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    ProductDatabase.SAVE_PATH = str(tmp_path / "updated_inventory.csv")
+    MemberDatabase.SAVE_PATH = str(tmp_path / "updated_memberships.csv")
+
+    # membership, cheddar cheese, apple
+    scans = (repo_root / "cart-data" / "scan_1_binary.txt").read_text().split()[1:]
+    scan_paths = []
+    for i in range(6):
+        path = tmp_path / f"scan_{i}_binary.txt"
+        path.write_text("\n".join(scans if i % 2 else scans[1:]))
+        scan_paths.append(str(path))
+
+    result = replay_scan_files(
+        scan_paths,
+        str(repo_root / "db-data" / "inventory.csv"),
+        str(repo_root / "db-data" / "memberships.csv"),
+        str(repo_root / "db-data" / "coupons.csv"),
+        processes=2,
+        batch_size=2,
+    )
+
+    # 3 carts at 5.70 and 3 Gold carts at 5.70 - 0.29
+    assert result["carts"] == 6
+    assert result["total_cents"] == 3 * 570 + 3 * 541
+    assert result["inventory_deltas"] == {"075741757551": -6, "027222235225": -6}
+    # 1.5 points per dollar on 5.41
+    assert result["points_deltas"] == {"297458184493": 3 * 812}
+
+    saved_inventory = ProductDatabase(ProductDatabase.SAVE_PATH)
+    assert saved_inventory.get_product("075741757551").get_quantity() == 54
+    assert saved_inventory.get_product("027222235225").get_quantity() == 194
+    saved_members = MemberDatabase(MemberDatabase.SAVE_PATH)
+    assert saved_members.get_member("297458184493").get_points_cents() == 540000 + 3 * 812
+
+
+def test_replay_prices_coupons_at_the_archived_transaction_time(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    ProductDatabase.SAVE_PATH = str(tmp_path / "updated_inventory.csv")
+    MemberDatabase.SAVE_PATH = str(tmp_path / "updated_memberships.csv")
+    paths = [str(repo_root / "db-data" / name) for name in ("inventory.csv", "memberships.csv", "coupons.csv")]
+
+    # cheddar cheese, apple and the $5 off coupon that expires on 2026-06-15
+    scans = (repo_root / "cart-data" / "scan_1_binary.txt").read_text().split()[2:]
+    scan_path = tmp_path / "scan_binary.txt"
+    scan_path.write_text("\n".join(scans + [barcode_to_binary("167586463312")]))
+    archived_at = datetime(2026, 1, 1, 12, 0)
+    os.utime(scan_path, (archived_at.timestamp(), archived_at.timestamp()))
+
+    assert replay_scan_files([str(scan_path)], *paths, processes=1)["total_cents"] == 570 - 500
+    assert replay_scan_files([str(scan_path)], *paths, processes=1, now=datetime(2026, 6, 1))["total_cents"] == 70
+    assert replay_scan_files([str(scan_path)], *paths, processes=1, now=datetime(2026, 7, 1))["total_cents"] == 570
@@ -0,0 +1,121 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from pos import POSSystem
+from store_backend import StoreBackend
+from database import ProductDatabase, MemberDatabase
+from sales_ledger import Sale, SalesLedger, read_sales, segment_paths
+
+
+def _sale(day: int) -> Sale:
+    return Sale(
+        datetime(2026, 1, 1) + timedelta(days=day, microseconds=day),
+        f"lane-{day % 3}",
+        None if day % 2 else "257274767454",
+        [("012345678905", day + 1, 299), ("034149633942", 1, 199)][:1 + day % 2],
+        [("149234073227", day)] if day % 5 == 0 else [],
+        0,
+        299 * (day + 1),
+        299 * (day + 1) - day,
+    )
+
+
+def _fields(sale: Sale) -> tuple:
+    return tuple(getattr(sale, name) for name in Sale.__slots__)
+
+
+def test_segments_roll_and_stream_back(tmp_path):
+    ledger = SalesLedger(str(tmp_path), segment_bytes=300, block_sales=4)
+    sales = [_sale(day) for day in range(30)]
+    for sale in sales:
+        ledger.append(sale)
+    # Full blocks are written as they fill; the rest is read from the pending log once flushed
+    blocks = sum(path.stat().st_size for path in map(Path, segment_paths(str(tmp_path))))
+    ledger.flush()
+    assert [_fields(sale) for sale in read_sales(str(tmp_path))] == [_fields(sale) for sale in sales]
+    assert sum(path.stat().st_size for path in map(Path, segment_paths(str(tmp_path)))) == blocks
+    ledger.close()
+
+    assert len(segment_paths(str(tmp_path))) > 1
+    assert [_fields(sale) for sale in read_sales(str(tmp_path))] == [_fields(sale) for sale in sales]
+    window = list(read_sales(str(tmp_path), datetime(2026, 1, 11), datetime(2026, 1, 13)))
+    assert [sale.timestamp.day for sale in window] == [11, 12]
+
+    # A new ledger never appends to existing segments; a torn last block is skipped
+    segments = segment_paths(str(tmp_path))
+    Path(segments[-1]).write_bytes(Path(segments[-1]).read_bytes()[:-5])
+    ledger = SalesLedger(str(tmp_path), block_sales=1)
+    ledger.append(_sale(40))
+    assert segment_paths(str(tmp_path))[:-1] == segments
+    read_back = list(read_sales(str(tmp_path)))
+    assert len(read_back) < 31 and _fields(read_back[-1]) == _fields(_sale(40))
+
+
+def test_pending_log_recovered_once_after_a_crash(tmp_path):
+    ledger = SalesLedger(str(tmp_path), block_sales=3)
+    for day in range(5):
+        ledger.append(_sale(day))
+    ledger.flush(fsync=True)
+    pending_log = (tmp_path / "pending.log").read_bytes()
+    # Crash: the last sale's line is torn, and the ledger is never closed
+    (tmp_path / "pending.log").write_bytes(pending_log[:-3])
+
+    SalesLedger(str(tmp_path), block_sales=3).close()
+    assert [_fields(sale) for sale in read_sales(str(tmp_path))] == [_fields(_sale(day)) for day in range(4)]
+
+    # A crash after a block was written but before its pending log was emptied
+    (tmp_path / "pending.log").write_bytes(pending_log)
+    assert len(list(read_sales(str(tmp_path)))) == 4
+    SalesLedger(str(tmp_path)).close()
+    assert [_fields(sale) for sale in read_sales(str(tmp_path))] == [_fields(_sale(day)) for day in range(4)]
+
+
+def test_checkout_appends_sale(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    ProductDatabase.SAVE_PATH = str(tmp_path / "updated_inventory.csv")
+    MemberDatabase.SAVE_PATH = str(tmp_path / "updated_memberships.csv")
+    ledger = SalesLedger(str(tmp_path / "ledger"))
+    pos = POSSystem(
+        str(repo_root / "db-data" / "inventory.csv"),
+        str(repo_root / "db-data" / "memberships.csv"),
+        str(repo_root / "db-data" / "coupons.csv"),
+        clock=lambda: datetime(2026, 1, 1),
+        lane="lane-3",
+        ledger=ledger,
+    )
+    pos.process_barcodes(str(repo_root / "cart-data" / "scan_1_binary.txt"))
+    assert pos.checkout() == 0.41
+
+    # Saved with the checkout, not left in the buffer
+    sale, = read_sales(str(tmp_path / "ledger"))
+    assert sale.timestamp == datetime(2026, 1, 1) and sale.lane == "lane-3"
+    assert sale.member == "297458184493"
+    assert sale.items == [("075741757551", 1, 450), ("027222235225", 1, 120)]
+    assert sale.coupons == [("167586463312", 500)]
+    assert (sale.subtotal_cents, sale.membership_discount_cents, sale.total_cents) == (570, 29, 41)
+
+
+def test_group_commit_makes_sales_durable_with_the_checkout(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    ProductDatabase.SAVE_PATH = str(tmp_path / "updated_inventory.csv")
+    MemberDatabase.SAVE_PATH = str(tmp_path / "updated_memberships.csv")
+    store_backend = StoreBackend(
+        str(repo_root / "db-data" / "inventory.csv"),
+        str(repo_root / "db-data" / "memberships.csv"),
+        str(repo_root / "db-data" / "coupons.csv"),
+        clock=lambda: datetime(2026, 1, 1),
+    )
+    store_backend.enable_group_commit(max_delay=0.001)
+    ledger = SalesLedger(str(tmp_path / "ledger"))
+    lanes = [POSSystem(store_backend=store_backend, clock=lambda: datetime(2026, 1, 1), lane=f"lane-{i}", ledger=ledger)
+             for i in range(2)]
+    assert store_backend.ledgers == [ledger]
+    for count, pos in enumerate(lanes, 1):
+        pos.process_barcodes(str(repo_root / "cart-data" / "scan_1_binary.txt"))
+        pos.checkout()
+        # checkout() returned after the flusher fsynced the ledger with the databases
+        assert [sale.lane for sale in read_sales(str(tmp_path / "ledger"))] == [f"lane-{i}" for i in range(count)]
+    store_backend.close()
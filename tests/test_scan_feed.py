@@ -0,0 +1,41 @@
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scan_feed import iter_scans, follow_scans
+
+
+def test_iter_scans_accepts_paths_files_and_iterables(tmp_path):
+    feed = tmp_path / "feed.txt"
+    feed.write_text("101\n\n  010  \n")
+
+    assert list(iter_scans(str(feed))) == ["101", "010"]
+    assert list(iter_scans(feed)) == ["101", "010"]
+    with open(feed) as f:
+        assert list(iter_scans(f)) == ["101", "010"]
+    assert list(iter_scans(["101\n", " ", "010"])) == ["101", "010"]
+
+
+def test_iter_scans_is_lazy():
+    def source():
+        yield "101"
+        raise AssertionError("read past the first scan")
+
+    assert next(iter_scans(source())) == "101"
+
+
+def test_follow_scans_yields_lines_as_they_are_appended(tmp_path):
+    feed = tmp_path / "feed.txt"
+    feed.write_text("101\n01")
+    stop = threading.Event()
+    scans = follow_scans(str(feed), poll_interval=0.01, stop_event=stop)
+
+    assert next(scans) == "101"
+    with open(feed, "a") as f:
+        f.write("0\n111")
+    assert next(scans) == "010"
+
+    stop.set()
+    assert list(scans) == ["111"]
@@ -0,0 +1,90 @@
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from pos import POSSystem
+from store_backend import StoreBackend
+from datagen import barcode_to_binary
+from tester_student import generate_last_digit
+from scan_telemetry import ScanTelemetry, REASONS
+
+
+def _scan(barcode_11: str) -> str:
+    return barcode_to_binary(barcode_11 + str(generate_last_digit(barcode_11)))
+
+
+def _store_backend(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    inventory_csv = tmp_path / "inventory.csv"
+    inventory_csv.write_text("numeric_barcode,name,price,quantity\n012345678905,Milk,2.99,1\n")
+    return StoreBackend(
+        str(inventory_csv),
+        str(repo_root / "db-data" / "memberships.csv"),
+        str(repo_root / "db-data" / "coupons.csv"),
+        clock=lambda: datetime(2026, 1, 1),
+    )
+
+
+def test_every_rejection_is_classified(tmp_path):
+    milk = _scan("01234567890")
+    wrong_check_digit = barcode_to_binary("012345678906")
+    wrong_guard = "0" + milk[1:]
+    # A left module with even parity, the rest of the scan intact
+    wrong_parity = milk[:3] + "0000000" + milk[10:]
+    wrong_module = milk[:3] + "0000111" + milk[10:]
+    scans = [
+        milk, milk, milk[:94], wrong_guard, wrong_parity, wrong_module, wrong_check_digit,
+        _scan("50000000000"), _scan("09999999999"), barcode_to_binary("178201474446"), _scan("29999999999"),
+    ]
+    pos = POSSystem(store_backend=_store_backend(tmp_path), clock=lambda: datetime(2026, 1, 1), lane="lane-7")
+    pos.process_barcodes(scans)
+
+    assert pos.get_current_cart().get_quantity("012345678905") == 1
+    counts = pos.telemetry.get_counts("lane-7")
+    assert counts == dict.fromkeys(REASONS, 1)
+    assert pos.telemetry.get_counts() == counts
+    recent = pos.telemetry.get_recent(reason="out_of_stock")
+    assert [(lane, scan) for _, lane, _, scan in recent] == [("lane-7", milk)]
+
+
+def test_shared_telemetry_counts_per_lane_and_samples(tmp_path):
+    store_backend = _store_backend(tmp_path)
+    telemetry = ScanTelemetry(sample_every=2, buffer_size=3)
+    lanes = [POSSystem(store_backend=store_backend, lane=f"lane-{i}", telemetry=telemetry) for i in (1, 2)]
+    lanes[0].process_barcodes(["1" * 95] * 4)
+    lanes[1].process_barcodes(["101"] * 10)
+
+    assert telemetry.get_lane_counts()["lane-1"]["wrong_guard"] == 4
+    assert telemetry.get_counts("lane-2")["wrong_length"] == 10
+    assert telemetry.get_counts()["wrong_guard"] + telemetry.get_counts()["wrong_length"] == 14
+    assert telemetry.get_counts("lane-3") == dict.fromkeys(REASONS, 0)
+    # Every second rejection of each lane was sampled (7 in all); the buffer keeps the last 3
+    assert [sample[1:3] for sample in telemetry.get_recent()] == [("lane-2", "wrong_length")] * 3
+    assert telemetry.get_recent(lane="lane-1") == []
+
+    with pytest.raises(ValueError):
+        ScanTelemetry(sample_every=0)
+
+
+def test_lanes_sharing_a_name_do_not_lose_counts():
+    telemetry = ScanTelemetry(sample_every=3)
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [
+            threading.Thread(target=lambda: [telemetry.record("lane-0", "wrong_length", "101") for _ in range(20_000)])
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert telemetry.get_counts("lane-0")["wrong_length"] == 80_000
@@ -0,0 +1,86 @@
+import sys
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from database import ProductDatabase, MemberDatabase, CouponDatabase
+from member import SilverMember
+from snapshot import source_key, load_snapshot, save_snapshot, RecordColumns
+from store_backend import StoreBackend
+
+
+def test_snapshot_reused_until_source_changes(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    inventory_csv = tmp_path / "inventory.csv"
+    shutil.copy(repo_root / "db-data" / "inventory.csv", inventory_csv)
+    snapshot = str(tmp_path / "inventory.snapshot")
+
+    pdb = ProductDatabase(str(inventory_csv), snapshot_path=snapshot)
+    cached, malformed_rows = load_snapshot(snapshot, str(inventory_csv))
+    assert malformed_rows == []
+    assert cached.keys() == pdb.products.keys()
+    assert cached["012345678905"].get_price_cents() == 299
+
+    # Touching the file moves the mtime but the checksum still matches
+    stat = os.stat(inventory_csv)
+    os.utime(inventory_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert load_snapshot(snapshot, str(inventory_csv)) is not None
+
+    with open(inventory_csv, "a") as f:
+        f.write("\n099999999993,Tea,3.50,5\n")
+    assert load_snapshot(snapshot, str(inventory_csv)) is None
+    pdb = ProductDatabase(str(inventory_csv), snapshot_path=snapshot)
+    assert pdb.get_product("099999999993").get_price_cents() == 350
+    assert "099999999993" in load_snapshot(snapshot, str(inventory_csv))[0]
+
+
+def test_corrupt_snapshot_falls_back_to_csv(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    coupons_csv = str(repo_root / "db-data" / "coupons.csv")
+    snapshot = tmp_path / "coupons.snapshot"
+    save_snapshot(str(snapshot), source_key(coupons_csv), {})
+    snapshot.write_bytes(snapshot.read_bytes()[:-3])
+
+    cdb = CouponDatabase(coupons_csv, snapshot_path=str(snapshot), clock=lambda: datetime(2024, 1, 1))
+    assert cdb.get_coupon("149234073227") is not None
+    assert load_snapshot(str(snapshot), coupons_csv)[0].keys() == cdb.coupon.keys()
+
+
+def test_store_backend_snapshot_dir(tmp_path):
+    db = Path(__file__).resolve().parents[1] / "db-data"
+    paths = (str(db / "inventory.csv"), str(db / "memberships.csv"), str(db / "coupons.csv"))
+    StoreBackend(*paths, snapshot_dir=str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == ["coupons.csv.snapshot", "inventory.csv.snapshot", "memberships.csv.snapshot"]
+    store_backend = StoreBackend(*paths, snapshot_dir=str(tmp_path))
+    assert store_backend.get_member("257274767454").get_name() == "Jane Doe"
+
+
+def test_snapshot_stores_columns_and_builds_records_lazily(tmp_path):
+    inventory_csv = tmp_path / "inventory.csv"
+    inventory_csv.write_text(
+        "numeric_barcode,name,price,quantity\n"
+        "012345678905,Milk,2.99,150\n"
+        "SKU-7,Milk,1.25,3\n"
+        "034149633942,Bread,1.99,80\n"
+    )
+    memberships_csv = tmp_path / "memberships.csv"
+    memberships_csv.write_text("numeric_barcode,name,tier,points\n257274767454,Jane Doe,Silver,1200.5\n")
+    ProductDatabase(str(inventory_csv), snapshot_path=str(tmp_path / "inventory.snapshot"))
+    MemberDatabase(str(memberships_csv), snapshot_path=str(tmp_path / "memberships.snapshot"))
+
+    pdb = ProductDatabase(str(inventory_csv), snapshot_path=str(tmp_path / "inventory.snapshot"))
+    assert isinstance(pdb.products, RecordColumns)
+    assert list(pdb.products) == ["012345678905", "SKU-7", "034149633942"]
+    assert pdb.get_product("12345678905") is None and pdb.get_product("0" * 30) is None
+    milk = pdb.get_product("012345678905")
+    assert (milk.get_name(), milk.get_price_cents(), milk.get_quantity()) == ("Milk", 299, 150)
+    assert pdb.get_product("SKU-7").get_price_cents() == 125
+    pdb.decrement_inventory("012345678905", 10)
+    assert pdb.get_product("012345678905") is milk and milk.get_quantity() == 140
+
+    mdb = MemberDatabase(str(memberships_csv), snapshot_path=str(tmp_path / "memberships.snapshot"))
+    jane = mdb.get_member("257274767454")
+    assert (type(jane), jane.get_name(), jane.get_points_cents()) == (SilverMember, "Jane Doe", 120050)
@@ -0,0 +1,147 @@
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+from sqlite_database import import_csv, connect
+from store_backend import StoreBackend
+from coupon import PercentDiscountCoupon, FixedDiscountCoupon
+
+
+def _store_db(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    db_path = str(tmp_path / "store.db")
+    import_csv(
+        db_path,
+        str(repo_root / "db-data" / "inventory.csv"),
+        str(repo_root / "db-data" / "memberships.csv"),
+        str(repo_root / "db-data" / "coupons.csv"),
+    )
+    return db_path
+
+
+def test_sqlite_backend_lookups(tmp_path):
+    store_backend = StoreBackend.from_sqlite(_store_db(tmp_path))
+
+    milk = store_backend.get_product("012345678905")
+    assert milk.get_name() == "Milk"
+    assert milk.get_price() == 2.99
+    assert milk.get_quantity() == 150
+    assert store_backend.get_product("") is None
+
+    jane = store_backend.get_member("257274767454")
+    assert jane.return_membership_type() == "Silver"
+    assert jane.get_points() == 1200
+
+    now = datetime(2024, 1, 1)
+    percent = store_backend.get_coupon("149234073227", now)
+    assert isinstance(percent, PercentDiscountCoupon)
+    assert percent.percent_basis_points == 1500
+    fixed = store_backend.get_coupon("178201474446", now)
+    assert isinstance(fixed, FixedDiscountCoupon)
+    assert fixed.fixed_value_cents == 250 and fixed.min_purchase_cents == 1000
+    assert store_backend.get_coupon("178201474446", datetime(2025, 1, 1)) is None
+
+
+def test_sqlite_backend_commits_checkout_in_one_transaction(tmp_path):
+    db_path = _store_db(tmp_path)
+    store_backend = StoreBackend.from_sqlite(db_path)
+    assert store_backend.product_database.connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    milk = store_backend.get_product("012345678905")
+    jane = store_backend.get_member("257274767454")
+    store_backend.decrease_product_quantity(milk, 10)
+    store_backend.add_member_points(jane, 100)
+    assert milk.get_quantity() == 140
+    assert jane.get_points() == 1300
+
+    # Nothing is visible to other connections until the checkout is saved
+    reader = connect(db_path)
+    assert reader.execute("SELECT quantity FROM products WHERE numeric_barcode = '012345678905'").fetchone() == (150,)
+    store_backend.save_inventory()
+    assert reader.execute("SELECT quantity FROM products WHERE numeric_barcode = '012345678905'").fetchone() == (140,)
+    assert reader.execute("SELECT points_cents FROM members WHERE numeric_barcode = '257274767454'").fetchone() == (130000,)
+    store_backend.save_memberships()
+
+    reopened = StoreBackend.from_sqlite(db_path)
+    assert reopened.get_product("012345678905").get_quantity() == 140
+
+
+def test_sqlite_backend_group_commit_flushes_from_another_thread(tmp_path):
+    db_path = _store_db(tmp_path)
+    store_backend = StoreBackend.from_sqlite(db_path)
+    store_backend.enable_group_commit(max_delay=0.001)
+
+    milk = store_backend.get_product("012345678905")
+    store_backend.decrease_product_quantity(milk, 10)
+    store_backend.save_inventory()
+    # Blocks until the flusher thread has committed the lane's transaction
+    store_backend.sync()
+    store_backend.close()
+
+    reader = connect(db_path)
+    assert reader.execute("SELECT quantity FROM products WHERE numeric_barcode = '012345678905'").fetchone() == (140,)
+
+
+def test_sqlite_checkout_transaction_is_not_committed_by_another_lane(tmp_path):
+    db_path = _store_db(tmp_path)
+    store_backend = StoreBackend.from_sqlite(db_path)
+    reader = connect(db_path)
+    milk = store_backend.get_product("012345678905")
+    jane = store_backend.get_member("257274767454")
+
+    with store_backend.transaction():
+        store_backend.decrease_product_quantity(milk, 10)
+        # Another lane saving its own checkout waits instead of committing this one halfway
+        other_lane = threading.Thread(target=store_backend.save_inventory)
+        other_lane.start()
+        other_lane.join(0.2)
+        assert other_lane.is_alive()
+        assert reader.execute("SELECT quantity FROM products WHERE numeric_barcode = '012345678905'").fetchone() == (150,)
+        store_backend.add_member_points(jane, 100)
+    other_lane.join()
+
+    assert reader.execute("SELECT quantity FROM products WHERE numeric_barcode = '012345678905'").fetchone() == (140,)
+    assert reader.execute("SELECT points_cents FROM members WHERE numeric_barcode = '257274767454'").fetchone() == (130000,)
+
+
+def test_sqlite_checkout_transaction_rolls_back_on_error(tmp_path):
+    db_path = _store_db(tmp_path)
+    store_backend = StoreBackend.from_sqlite(db_path)
+    milk = store_backend.get_product("012345678905")
+
+    with pytest.raises(RuntimeError, match="card declined"):
+        with store_backend.transaction():
+            store_backend.decrease_product_quantity(milk, 10)
+            raise RuntimeError("card declined")
+
+    reader = connect(db_path)
+    assert reader.execute("SELECT quantity FROM products WHERE numeric_barcode = '012345678905'").fetchone() == (150,)
+
+
+def test_sqlite_coupons_match_coupon_database(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    coupons_csv = tmp_path / "coupons.csv"
+    coupons_csv.write_text(
+        "numeric_barcode,expiration_date,discount_type,discount_value,min_purchase,description\n"
+        "122222222222,2025-06-30,percent,10,0,10% off\n"
+        "133333333333,2026-12-31,fixed,2.00,0,$2 off,2026-06-01\n"
+    )
+    db_path = str(tmp_path / "store.db")
+    import_csv(db_path, str(repo_root / "db-data" / "inventory.csv"), str(repo_root / "db-data" / "memberships.csv"),
+               str(coupons_csv))
+    sqlite_backend = StoreBackend.from_sqlite(db_path)
+    csv_backend = StoreBackend(str(repo_root / "db-data" / "inventory.csv"), str(repo_root / "db-data" / "memberships.csv"),
+                               str(coupons_csv), clock=lambda: datetime(2025, 1, 1))
+
+    for now in (datetime(2025, 1, 1), datetime(2026, 5, 31), datetime(2026, 6, 1), datetime(2027, 1, 1)):
+        for barcode in ("122222222222", "133333333333"):
+            expected = csv_backend.get_coupon(barcode, now)
+            coupon = sqlite_backend.get_coupon(barcode, now)
+            assert (coupon is None) == (expected is None), (barcode, now)
+            if coupon is not None:
+                assert (type(coupon), coupon.activation_date) == (type(expected), expected.activation_date)
+    assert sqlite_backend.get_coupon("133333333333", datetime(2026, 5, 31)) is None